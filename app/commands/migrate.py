@@ -0,0 +1,91 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect
+from sqlalchemy.engine import Connection, Engine
+
+from app.database import Base, get_engine
+from app.utils.schema import current_revisions
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+def alembic_config() -> Config:
+    return Config(str(ALEMBIC_INI))
+
+def migration_heads() -> set[str]:
+    return set(ScriptDirectory.from_config(alembic_config()).get_heads())
+
+class UnknownSchema(RuntimeError):
+    pass
+
+# Databases that the app built with create_all before migrations were the only
+# way in have tables but no alembic_version. Each entry is the revision to
+# stamp and what only a schema at (or past) that revision has, newest first.
+KNOWN_SCHEMAS = [
+    (("b5c6d7e8f9a0",), ("table", "deletion_retention")),
+    (("a4b5c6d7e8f9",), ("table", "community_deletions")),
+    (("f3a4b5c6d7e8",), ("index", "reports", "ix_reports_pending_post_id_created_at")),
+    (("e2f3a4b5c6d7",), ("column", "posts", "version")),
+    (("d0e1f2a3b4c5",), ("index", "community_members", "ix_community_members_community_id_joined_at_id")),
+    (("c9d0e1f2a3b4",), ("column", "communities", "last_activity_at")),
+    (("b8c9d0e1f2a3",), ("column", "communities", "member_count")),
+    (("a7b8c9d0e1f2",), ("index", "votes", "uq_votes_post_id_user_id")),
+    (("f6a7b8c9d0e1",), ("index", "messages", "ix_messages_recipient_id_created_at")),
+    (("e5f6a7b8c9d0",), ("column", "posts", "is_hidden")),
+    (("d4e5f6a7b8c9",), ("index", "reports", "ix_reports_status_created_at")),
+    (("c3d4e5f6a7b8",), ("column", "comments", "path")),
+    (("10a36f762b2d", "b2c3d4e5f6a7"), ("column", "communities", "created_at")),
+]
+
+def detect_revisions(connection: Connection) -> tuple[str, ...] | None:
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+
+    def present(kind: str, table: str, name: str | None = None) -> bool:
+        if table not in tables:
+            return False
+        if kind == "column":
+            return name in {column["name"] for column in inspector.get_columns(table)}
+        if kind == "index":
+            return name in {index["name"] for index in inspector.get_indexes(table)}
+        return True
+
+    for revisions, marker in KNOWN_SCHEMAS:
+        if present(*marker):
+            return revisions
+    return None
+
+def migrate(bind: Engine | None = None) -> str:
+    # The revision chain starts from tables that predate Alembic, so an empty
+    # database is built from the models and stamped at head instead of replayed.
+    bind = bind or get_engine()
+    config = alembic_config()
+    with bind.connect() as connection:
+        current = current_revisions(connection)
+        has_tables = bool(inspect(connection).get_table_names())
+
+    if not current and not has_tables:
+        from app.models import comment, community, file, message, post, report, sync, user, vote  # noqa: F401
+
+        Base.metadata.create_all(bind=bind)
+        command.stamp(config, "head")
+        return "created"
+
+    if not current:
+        # Upgrading from base would replay onto tables that already exist.
+        with bind.connect() as connection:
+            revisions = detect_revisions(connection)
+        if revisions is None:
+            raise UnknownSchema(
+                "The database has tables but no alembic_version, and they do not match a known schema. "
+                "Find the revision it was built at, run `alembic stamp <revision>`, then migrate again."
+            )
+        command.stamp(config, list(revisions))
+
+    command.upgrade(config, "head")
+    return "upgraded"
+
+if __name__ == "__main__":
+    print(f"Database schema {migrate()} at head")
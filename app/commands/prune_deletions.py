@@ -0,0 +1,30 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.sync import Deletion, DeletionRetention
+
+def prune_deletions(db: Session, retention: timedelta) -> int:
+    cutoff = datetime.now(timezone.utc) - retention
+    pruned = delete(Deletion).where(Deletion.deleted_at < cutoff).returning(Deletion.version).cte("pruned")
+    count, through = db.execute(select(func.count(), func.max(pruned.c.version)).select_from(pruned)).one()
+    if through is not None:
+        stmt = insert(DeletionRetention).values(id=1, pruned_through=through)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[DeletionRetention.id],
+            set_={"pruned_through": func.greatest(DeletionRetention.pruned_through, stmt.excluded.pruned_through)},
+        ))
+    db.commit()
+    return count
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        pruned = prune_deletions(db, timedelta(days=settings.deletion_retention_days))
+        print(f"Pruned {pruned} deletion tombstones")
+    finally:
+        db.close()
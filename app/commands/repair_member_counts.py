@@ -0,0 +1,24 @@
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.community import Community, CommunityMember
+
+def repair_member_counts(db: Session) -> int:
+    actual = (
+        select(func.count(CommunityMember.id))
+        .where(CommunityMember.community_id == Community.id)
+        .scalar_subquery()
+    )
+    repaired = db.query(Community).filter(Community.member_count != actual).update(
+        {Community.member_count: actual}, synchronize_session=False
+    )
+    db.commit()
+    return repaired
+
+if __name__ == "__main__":
+    db = SessionLocal()
+    try:
+        print(f"Repaired member_count on {repair_member_counts(db)} communities")
+    finally:
+        db.close()
@@ -1,5 +1,27 @@
+import math
+from functools import lru_cache
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from pydantic import Field
+from pydantic import Field, field_validator
+
+@lru_cache(maxsize=8)
+def parse_limits(spec: str) -> dict[str, tuple[int, float]]:
+	# "login:10/60,vote:120/60" -> {"login": (10, 60.0), "vote": (120, 60.0)}:
+	# a bucket of 10 requests that refills completely over 60 seconds.
+	limits = {}
+	for entry in filter(None, (part.strip() for part in spec.split(","))):
+		scope, _, rate = entry.partition(":")
+		capacity, _, period = rate.partition("/")
+		try:
+			limit = (int(capacity), float(period))
+		except ValueError:
+			limit = None
+		if not scope.strip() or limit is None or limit[0] < 1 or not 0 < limit[1] < math.inf:
+			raise ValueError(
+				f"RATE_LIMITS entry {entry!r} must look like scope:requests/seconds, both above 0"
+			)
+		limits[scope.strip()] = limit
+	return limits
 
 class Settings(BaseSettings):
 	model_config = SettingsConfigDict(env_file=".env", extra="ignore")
@@ -13,4 +35,55 @@ class Settings(BaseSettings):
 	jwt_algorithm: str = Field(default="HS256", alias="JWT_ALGORITHM")
 	jwt_access_token_expire_minutes: int = Field(default=60, alias="JWT_ACCESS_TOKEN_EXPIRE_MINUTES")
 
+	rate_limit_store_path: str | None = Field(default=None, alias="RATE_LIMIT_STORE_PATH")
+	report_rate_limit: int = Field(default=10, alias="REPORT_RATE_LIMIT")
+	report_rate_window_seconds: int = Field(default=60, alias="REPORT_RATE_WINDOW_SECONDS")
+	report_hide_threshold: int = Field(default=5, alias="REPORT_HIDE_THRESHOLD")
+	rate_limits: str = Field(
+		default="login:10/60,register:5/60,post:20/60,comment:60/60,vote:120/60,message:60/60,upload:20/60",
+		alias="RATE_LIMITS",
+	)
+
+	unread_count_ttl_seconds: float = Field(default=5, alias="UNREAD_COUNT_TTL_SECONDS")
+
+	vote_buffer_enabled: bool = Field(default=False, alias="VOTE_BUFFER_ENABLED")
+	vote_buffer_flush_seconds: float = Field(default=0.5, alias="VOTE_BUFFER_FLUSH_SECONDS")
+	vote_buffer_max_pending: int = Field(default=10000, alias="VOTE_BUFFER_MAX_PENDING")
+
+	community_cache_ttl_seconds: float = Field(default=30, alias="COMMUNITY_CACHE_TTL_SECONDS")
+	community_cache_maxsize: int = Field(default=10000, alias="COMMUNITY_CACHE_MAXSIZE")
+	community_delete_batch_size: int = Field(default=1000, alias="COMMUNITY_DELETE_BATCH_SIZE")
+	deletion_retention_days: int = Field(default=30, alias="DELETION_RETENTION_DAYS")
+
+	read_replica_urls: str = Field(default="", alias="READ_REPLICA_URLS")
+	read_your_writes_seconds: float = Field(default=5, alias="READ_YOUR_WRITES_SECONDS")
+	replica_max_lag_seconds: float = Field(default=5, alias="REPLICA_MAX_LAG_SECONDS")
+	replica_health_check_seconds: float = Field(default=2, alias="REPLICA_HEALTH_CHECK_SECONDS")
+	replica_timeout_seconds: float = Field(default=2, alias="REPLICA_TIMEOUT_SECONDS")
+
+	response_cache_maxsize: int = Field(default=10000, alias="RESPONSE_CACHE_MAXSIZE")
+	response_cache_ttl_seconds: float = Field(default=10, alias="RESPONSE_CACHE_TTL_SECONDS")
+	response_cache_max_age_seconds: int = Field(default=0, alias="RESPONSE_CACHE_MAX_AGE_SECONDS")
+
+	profile_token: str = Field(default="", alias="PROFILE_TOKEN")
+	profile_sample_rate: float = Field(default=0, alias="PROFILE_SAMPLE_RATE")
+	profile_interval_seconds: float = Field(default=0.005, alias="PROFILE_INTERVAL_SECONDS")
+	profile_dir: str = Field(default="profiles", alias="PROFILE_DIR")
+
+	slow_query_ms: float = Field(default=200, alias="SLOW_QUERY_MS")
+	query_stats_maxsize: int = Field(default=2000, alias="QUERY_STATS_MAXSIZE")
+
+	log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+	log_queue_size: int = Field(default=10000, alias="LOG_QUEUE_SIZE")
+	access_log_sample_rate: float = Field(default=1.0, alias="ACCESS_LOG_SAMPLE_RATE")
+	ws_message_log_sample_rate: float = Field(default=0.1, alias="WS_MESSAGE_LOG_SAMPLE_RATE")
+
+	@field_validator("rate_limits")
+	@classmethod
+	def check_rate_limits(cls, value: str) -> str:
+		# A bad entry fails startup here instead of every request it applies
+		# to; the parsed result stays cached for enforce_limit.
+		parse_limits(value)
+		return value
+
 settings = Settings()
@@ -1,9 +1,14 @@
+from functools import lru_cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from dotenv import load_dotenv
 import os
 
+from app.utils import query_stats
+
 load_dotenv()
 
 USER = os.getenv("user")
@@ -14,8 +19,20 @@ DBNAME = os.getenv("dbname")
 
 DATABASE_URL = f"postgresql+psycopg2://{USER}:{PASSWORD}@{HOST}:{PORT}/{DBNAME}?sslmode=require"
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@lru_cache(maxsize=None)
+def get_engine() -> Engine:
+    # Built on first use (normally the lifespan hook) rather than at import, so
+    # importing the app or its models never loads the database driver.
+    engine = create_engine(DATABASE_URL)
+    query_stats.install(engine)
+    return engine
+
+class _SessionFactory(sessionmaker):
+    def __call__(self, **local_kw):
+        local_kw.setdefault("bind", get_engine())
+        return super().__call__(**local_kw)
+
+SessionLocal = _SessionFactory(autocommit=False, autoflush=False)
 Base = declarative_base()
 
 def get_db():
@@ -1,9 +1,12 @@
-from fastapi import FastAPI, Request, status
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
 from pydantic import ValidationError
 
-from app.database import Base, engine
+from app.database import get_engine
 from app import models
 from app.routers import (
     auth_router,
@@ -11,19 +14,40 @@ from app.routers import (
     users_router,
     votes_router_arpon,
     votes_router_emon,
+    reports_router,
     comments_router,
-    comments_router_emon,
     messages_router,
     files_router,
-    moderation_router,
     communities_router,
+    diagnostics_router,
 )
 from app.routers.websocket import router as websocket_router
 from app.config import settings
+from app.utils.profiling import profile_requests, profiling_enabled
+from app.utils.query_stats import track_request_queries
+from app.utils.replicas import replica_router, track_replica_writes
+from app.utils.schema import verify_schema
+from app.utils.structured_log import configure_logging, log_requests, shutdown_logging
+from app.utils.vote_buffer import vote_buffer
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    configure_logging()
+    verify_schema(get_engine())
+    if settings.vote_buffer_enabled:
+        vote_buffer.start()
+    replica_router.start()
+    yield
+    replica_router.stop()
+    vote_buffer.stop()
+    shutdown_logging()
 
-app = FastAPI(title=settings.app_name, version="1.0.0")
+app = FastAPI(
+    title=settings.app_name,
+    version="1.0.0",
+    lifespan=lifespan,
+    dependencies=[Depends(track_request_queries)],
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -31,8 +55,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+if replica_router.enabled:
+    app.add_middleware(BaseHTTPMiddleware, dispatch=track_replica_writes)
+
+if profiling_enabled():
+    app.add_middleware(BaseHTTPMiddleware, dispatch=profile_requests)
+
+if settings.access_log_sample_rate > 0:
+    app.add_middleware(BaseHTTPMiddleware, dispatch=log_requests)
+
 @app.exception_handler(ValidationError)
 async def validation_exception_handler(request: Request, exc: ValidationError):
     errors = exc.errors()
@@ -52,10 +86,10 @@ app.include_router(posts_router)
 app.include_router(users_router)
 app.include_router(votes_router_arpon)
 app.include_router(votes_router_emon)
+app.include_router(reports_router)
 app.include_router(comments_router)
-app.include_router(comments_router_emon)
 app.include_router(messages_router)
 app.include_router(files_router)
-app.include_router(moderation_router)
 app.include_router(communities_router)
+app.include_router(diagnostics_router)
 app.include_router(websocket_router)
\ No newline at end of file
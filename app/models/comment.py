@@ -1,9 +1,13 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Text, String
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Text, String
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.models.sync import updated_at_column, version_column
+
+PATH_SEGMENT_WIDTH = 10
+MAX_COMMENT_DEPTH = 20
 
 class Comment(Base):
     __tablename__ = "comments"
@@ -12,7 +16,25 @@ class Comment(Base):
     content = Column(Text, nullable=False)
     post_id = Column(Integer, ForeignKey("posts.id"), nullable=False, index=True)
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    parent_id = Column(Integer, ForeignKey("comments.id"), nullable=True, index=True)
+    # Materialized path of zero-padded ancestor ids ("0000000012/0000000045/"),
+    # byte-ordered so a subtree is one contiguous range of the index.
+    path = Column(
+        String(255).with_variant(String(255, collation="C"), "postgresql"),
+        nullable=False,
+        default="",
+    )
+    depth = Column(Integer, nullable=False, default=0)
+    reply_count = Column(Integer, nullable=False, default=0)
+    is_hidden = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    updated_at = updated_at_column()
+    version = version_column()
+
+    __table_args__ = (
+        Index("ix_comments_post_id_path", "post_id", "path"),
+        Index("ix_comments_post_id_version", "post_id", "version"),
+    )
 
     owner = relationship("User")
     post = relationship("Post")
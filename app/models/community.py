@@ -1,10 +1,11 @@
 import enum
 from datetime import datetime, timezone
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text, UniqueConstraint
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text, UniqueConstraint, func
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.models.sync import updated_at_column, version_column
 
 
 class MemberRole(str, enum.Enum):
@@ -19,7 +20,23 @@ class Community(Base):
     name = Column(String(100), unique=True, nullable=False, index=True)
     description = Column(Text, nullable=True)
     captain_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    member_count = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+    last_activity_at = Column(
+        DateTime, default=lambda: datetime.now(timezone.utc), server_default=func.now(), nullable=False
+    )
+    updated_at = updated_at_column()
+    version = version_column()
+
+    __table_args__ = (
+        Index("ix_communities_member_count_id", "member_count", "id"),
+        Index("ix_communities_last_activity_at_id", "last_activity_at", "id"),
+        Index(
+            "ix_communities_name_lower",
+            func.lower(name).label("name_lower"),
+            postgresql_ops={"name_lower": "text_pattern_ops"},
+        ),
+    )
 
     captain = relationship("User", foreign_keys=[captain_id])
     members = relationship("CommunityMember", back_populates="community", cascade="all, delete-orphan")
@@ -35,7 +52,10 @@ class CommunityMember(Base):
     role = Column(Enum(MemberRole), nullable=False, default=MemberRole.member)
     joined_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
-    __table_args__ = (UniqueConstraint("community_id", "user_id", name="uq_community_user"),)
+    __table_args__ = (
+        UniqueConstraint("community_id", "user_id", name="uq_community_user"),
+        Index("ix_community_members_community_id_joined_at_id", "community_id", "joined_at", "id"),
+    )
 
     community = relationship("Community", back_populates="members")
     user = relationship("User")
@@ -51,5 +71,23 @@ class CommunityPost(Base):
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
+    __table_args__ = (Index("ix_community_posts_community_id_created_at", "community_id", "created_at"),)
+
     community = relationship("Community", back_populates="posts")
     owner = relationship("User")
+
+
+class CommunityDeletion(Base):
+    # One row per community being (or that was) deleted. It has no foreign key
+    # so it outlives the community and every worker can report progress.
+    __tablename__ = "community_deletions"
+
+    community_id = Column(Integer, primary_key=True)
+    requested_by = Column(Integer, nullable=False)
+    status = Column(String(16), nullable=False)
+    posts_deleted = Column(Integer, nullable=False, default=0, server_default="0")
+    members_deleted = Column(Integer, nullable=False, default=0, server_default="0")
+    started_at = Column(DateTime, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime, nullable=True)
+    error = Column(Text, nullable=True)
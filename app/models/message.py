@@ -1,9 +1,10 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.models.sync import updated_at_column, version_column
 
 class Message(Base):
     __tablename__ = "messages"
@@ -14,6 +15,16 @@ class Message(Base):
     content = Column(Text, nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     is_read = Column(Boolean, default=False, nullable=False)
+    updated_at = updated_at_column()
+    version = version_column()
+
+    __table_args__ = (
+        Index("ix_messages_recipient_id_created_at", "recipient_id", "created_at"),
+        Index("ix_messages_sender_id_recipient_id_created_at", "sender_id", "recipient_id", "created_at"),
+        Index("ix_messages_unread_recipient_id", "recipient_id", postgresql_where=is_read.is_(False)),
+        Index("ix_messages_sender_id_version", "sender_id", "version"),
+        Index("ix_messages_recipient_id_version", "recipient_id", "version"),
+    )
 
     sender = relationship("User", foreign_keys=[sender_id])
     recipient = relationship("User", foreign_keys=[recipient_id])
@@ -1,9 +1,10 @@
 from datetime import datetime, timezone
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
+from app.models.sync import updated_at_column, version_column
 
 class Post(Base):
 	__tablename__ = "posts"
@@ -14,7 +15,15 @@ class Post(Base):
 	owner_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 	is_anonymous = Column(Boolean, default=False, nullable=False)
 	display_name = Column(String(255), nullable=False, default="")
+	is_hidden = Column(Boolean, default=False, nullable=False)
 	created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
+	updated_at = updated_at_column()
+	version = version_column()
+
+	__table_args__ = (
+		Index("ix_posts_owner_id_created_at", "owner_id", "created_at"),
+		Index("ix_posts_version", "version"),
+	)
 
 	owner = relationship("User")
 	files = relationship("File", back_populates="post", cascade="all, delete-orphan")
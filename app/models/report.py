@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 import enum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer, String, Text, text
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -23,5 +23,37 @@ class Report(Base):
     status = Column(Enum(ReportStatus), default=ReportStatus.PENDING)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        Index("ix_reports_status_created_at", "status", "created_at"),
+        Index(
+            "ix_reports_pending_post_id_created_at",
+            "post_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'PENDING' AND comment_id IS NULL"),
+        ),
+        Index(
+            "ix_reports_pending_comment_id_created_at",
+            "comment_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'PENDING' AND comment_id IS NOT NULL"),
+        ),
+        Index(
+            "uq_reports_reporter_post",
+            "reporter_id",
+            "post_id",
+            unique=True,
+            postgresql_where=comment_id.is_(None),
+        ),
+        Index(
+            "uq_reports_reporter_comment",
+            "reporter_id",
+            "comment_id",
+            unique=True,
+            postgresql_where=comment_id.isnot(None),
+        ),
+    )
+
     reporter = relationship("User")
     post = relationship("Post")
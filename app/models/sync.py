@@ -0,0 +1,57 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Index, Integer, String, event, func, text
+
+from app.database import Base
+
+# A row's version is the id of the transaction that last wrote it, plus an
+# offset that kept versions above the sequence they replaced, so a client can
+# keep a single "since" cursor per feed. row_version_horizon() is the lowest
+# version a still-running transaction can hold: everything below it is final.
+ROW_VERSION_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION row_version() RETURNS bigint LANGUAGE sql VOLATILE
+    AS 'SELECT txid_current() + {offset}';
+CREATE OR REPLACE FUNCTION row_version_horizon() RETURNS bigint LANGUAGE sql VOLATILE
+    AS 'SELECT txid_snapshot_xmin(txid_current_snapshot()) + {offset}';
+"""
+
+event.listen(Base.metadata, "before_create", DDL(ROW_VERSION_FUNCTIONS.format(offset=0)))
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+def updated_at_column() -> Column:
+    return Column(DateTime, default=_now, onupdate=_now, server_default=func.now(), nullable=False)
+
+def version_column() -> Column:
+    # default/onupdate also cover bulk query.update() calls, not just ORM flushes.
+    return Column(
+        BigInteger,
+        default=func.row_version(),
+        onupdate=func.row_version(),
+        server_default=text("row_version()"),
+        nullable=False,
+    )
+
+class Deletion(Base):
+    # Tombstones for hard-deleted rows, so "changes since" feeds can report them.
+    # scope_id is the feed the row belonged to (post id for comments, each
+    # participant for messages); posts have no scope.
+    __tablename__ = "deletions"
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    scope_id = Column(Integer, nullable=True)
+    version = version_column()
+    deleted_at = Column(DateTime, default=_now, nullable=False)
+
+    __table_args__ = (Index("ix_deletions_entity_scope_id_version", "entity", "scope_id", "version"),)
+
+class DeletionRetention(Base):
+    # Single row: tombstones up to this version have been pruned, so a feed
+    # cannot serve a client whose cursor is older.
+    __tablename__ = "deletion_retention"
+
+    id = Column(Integer, primary_key=True)
+    pruned_through = Column(BigInteger, nullable=False)
@@ -1,7 +1,7 @@
 from datetime import datetime, timezone
 import enum
 
-from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Index, Integer
 from sqlalchemy.orm import relationship
 
 from app.database import Base
@@ -20,5 +20,10 @@ class Vote(Base):
     vote_type = Column(Enum(VoteType), nullable=False)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), nullable=False)
 
+    __table_args__ = (
+        Index("uq_votes_post_id_user_id", "post_id", "user_id", unique=True, postgresql_where=post_id.isnot(None)),
+        Index("uq_votes_comment_id_user_id", "comment_id", "user_id", unique=True, postgresql_where=comment_id.isnot(None)),
+    )
+
     user = relationship("User")
     post = relationship("Post")
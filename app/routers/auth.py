@@ -1,12 +1,14 @@
+import hmac
 from datetime import timedelta
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
 from app.utils.auth import hash_password,verify_password,create_access_token,decode_access_token
+from app.utils.rate_limit import limit_per_ip
 
 from app.config import settings
 from app.schemas.user import RegisterRequest,LoginRequest,LoginResponse,UserOut
@@ -15,7 +17,12 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 security = HTTPBearer()
 
-@router.post("/register", response_model=UserOut, status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/register",
+    response_model=UserOut,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_per_ip("register"))],
+)
 def register_user(payload: RegisterRequest,db: Session = Depends(get_db)):
     
     existing_email = db.query(User).filter(User.email == payload.email).first()
@@ -44,7 +51,7 @@ def register_user(payload: RegisterRequest,db: Session = Depends(get_db)):
     db.refresh(user)
     return user
 
-@router.post("/login", response_model=LoginResponse)
+@router.post("/login", response_model=LoginResponse, dependencies=[Depends(limit_per_ip("login"))])
 def login(
     payload: LoginRequest,
     db: Session = Depends(get_db)
@@ -64,10 +71,9 @@ def login(
         expires_delta=access_token_expires
     )
     return {"access_token": access_token, "token_type": "bearer"}
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+def get_current_user_id(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> int:
     token = credentials.credentials
     payload = decode_access_token(token)
     if not payload or "sub" not in payload:
@@ -75,10 +81,26 @@ def get_current_user(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials"
         )
-    user = db.query(User).filter(User.id == int(payload["sub"])).first()
+    return int(payload["sub"])
+
+def get_current_user(
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+) -> User:
+    user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     return user
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    # Operator-only endpoints share PROFILE_TOKEN with the request profiler;
+    # while it is unset they are closed to everyone.
+    token = settings.profile_token
+    if not token or x_admin_token is None or not hmac.compare_digest(x_admin_token.encode(), token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required"
+        )
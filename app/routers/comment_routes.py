@@ -1,109 +0,0 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from app.database import get_db
-from app.models.comment import Comment
-from app.models.post import Post
-from app.models.user import User
-from app.routers.auth import get_current_user
-from app.schemas.comment import CommentCreate, CommentUpdate, CommentOut
-
-router = APIRouter(prefix="/comments", tags=["comments"])
-
-@router.post("/{post_id}", status_code=status.HTTP_201_CREATED)
-def create_comment(
-    post_id: int,
-    payload: CommentCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
-
-    comment = Comment(
-        content=payload.content,
-        post_id=post_id,
-        owner_id=current_user.id
-    )
-    db.add(comment)
-    db.commit()
-    db.refresh(comment)
-    return {"message": "Successfully created comment", "data": CommentOut.model_validate(comment)}
-
-@router.get("/post/{post_id}", response_model=list[CommentOut])
-def list_comments(
-    post_id: int,
-    db: Session = Depends(get_db)
-):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
-    return db.query(Comment).filter(Comment.post_id == post_id).all()
-
-@router.get("/{comment_id}", response_model=CommentOut)
-def get_comment(
-    comment_id: int,
-    db: Session = Depends(get_db)
-):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found"
-        )
-    return comment
-
-@router.put("/{comment_id}")
-def update_comment(
-    comment_id: int,
-    payload: CommentUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found"
-        )
-    if comment.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this comment"
-        )
-
-    if payload.content:
-        comment.content = payload.content
-
-    db.commit()
-    db.refresh(comment)
-    return {"message": "Successfully updated comment", "data": CommentOut.model_validate(comment)}
-
-@router.delete("/{comment_id}", status_code=status.HTTP_200_OK)
-def delete_comment(
-    comment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found"
-        )
-    if comment.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this comment"
-        )
-
-    db.delete(comment)
-    db.commit()
-    return {"message": "Successfully deleted comment"}
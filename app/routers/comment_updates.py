@@ -1,58 +0,0 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-
-from app.database import get_db
-from app.models.comment import Comment
-from app.models.user import User
-from app.routers.auth import get_current_user
-from app.schemas.comment_update import CommentUpdate, CommentOut
-
-router = APIRouter(prefix="/comments", tags=["comments"])
-
-@router.put("/{comment_id}")
-def update_comment(
-    comment_id: int,
-    payload: CommentUpdate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found"
-        )
-    if comment.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this comment"
-        )
-
-    if payload.content:
-        comment.content = payload.content
-
-    db.commit()
-    db.refresh(comment)
-    return {"message": "Successfully updated comment", "data": CommentOut.model_validate(comment)}
-
-@router.delete("/{comment_id}", status_code=status.HTTP_200_OK)
-def delete_comment(
-    comment_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found"
-        )
-    if comment.owner_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this comment"
-        )
-
-    db.delete(comment)
-    db.commit()
-    return {"message": "Successfully deleted comment"}
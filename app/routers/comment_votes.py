@@ -1,7 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_db
 from app.models.vote import Vote, VoteType
 from app.models.comment import Comment
@@ -9,42 +14,65 @@ from app.models.user import User
 from app.routers.auth import get_current_user
 from app.schemas.vote_score import VoteScoreOut
 from app.schemas.vote import VoteCreate, VoteOut
+from app.utils.rate_limit import limit_per_user
+from app.utils.vote_buffer import VoteBufferFull, vote_buffer
+from app.utils.replicas import get_read_db
+from app.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/votes", tags=["votes"])
 
-@router.post("/comment/{comment_id}", status_code=status.HTTP_201_CREATED)
+FOREIGN_KEY_VIOLATION = "23503"
+
+@router.post(
+    "/comment/{comment_id}",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_per_user("vote"))],
+)
 def vote_comment(
     comment_id: int,
     payload: VoteCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found"
-        )
+    if vote_buffer.running:
+        try:
+            vote_buffer.add("comment", comment_id, current_user.id, payload.vote_type)
+        except VoteBufferFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many votes waiting to be saved, try again shortly",
+                headers={"Retry-After": str(max(1, math.ceil(settings.vote_buffer_flush_seconds)))}
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Successfully queued vote"}
 
-    existing = db.query(Vote).filter(
-        Vote.comment_id == comment_id,
-        Vote.user_id == current_user.id
-    ).first()
-    if existing:
-        existing.vote_type = payload.vote_type
-        db.commit()
-        db.refresh(existing)
-        return {"message": "Successfully updated vote", "data": VoteOut.model_validate(existing)}
-
-    vote = Vote(
+    stmt = insert(Vote).values(
         comment_id=comment_id,
         user_id=current_user.id,
         vote_type=payload.vote_type
     )
-    db.add(vote)
-    db.commit()
-    db.refresh(vote)
-    return {"message": "Successfully voted on comment", "data": VoteOut.model_validate(vote)}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Vote.comment_id, Vote.user_id],
+        index_where=Vote.comment_id.isnot(None),
+        set_={"vote_type": stmt.excluded.vote_type}
+    ).returning(Vote, literal_column("xmax = 0").label("inserted"))
+    try:
+        vote, inserted = db.execute(stmt, execution_options={"populate_existing": True}).one()
+        data = VoteOut.model_validate(vote)
+        db.commit()
+        response_cache.invalidate(("comment", comment_id))
+    except IntegrityError as exc:
+        db.rollback()
+        if getattr(exc.orig, "pgcode", None) != FOREIGN_KEY_VIOLATION:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+
+    message = "Successfully voted on comment" if inserted else "Successfully updated vote"
+    return {"message": message, "data": data}
 
 @router.delete("/comment/{comment_id}", status_code=status.HTTP_200_OK)
 def unvote_comment(
@@ -52,42 +80,50 @@ def unvote_comment(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    queued = vote_buffer.discard("comment", comment_id, current_user.id)
     vote = db.query(Vote).filter(
         Vote.comment_id == comment_id,
         Vote.user_id == current_user.id
     ).first()
-    if not vote:
+    if not vote and not queued:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vote not found"
         )
-    db.delete(vote)
-    db.commit()
+    if vote:
+        db.delete(vote)
+        db.commit()
+        response_cache.invalidate(("comment", comment_id))
     return {"message": "Successfully removed vote"}
 
 @router.get("/comment/{comment_id}/score", response_model=VoteScoreOut)
 def get_comment_vote_score(
     comment_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
-    comment = db.query(Comment).filter(Comment.id == comment_id).first()
-    if not comment:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Comment not found"
-        )
+    def build():
+        comment = db.query(Comment).filter(Comment.id == comment_id).first()
+        if not comment:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Comment not found"
+            )
 
-    upvotes = db.query(func.count(Vote.id)).filter(
-        Vote.comment_id == comment_id,
-        Vote.vote_type == VoteType.UPVOTE
-    ).scalar()
-    downvotes = db.query(func.count(Vote.id)).filter(
-        Vote.comment_id == comment_id,
-        Vote.vote_type == VoteType.DOWNVOTE
-    ).scalar()
+        upvotes = db.query(func.count(Vote.id)).filter(
+            Vote.comment_id == comment_id,
+            Vote.vote_type == VoteType.UPVOTE
+        ).scalar()
+        downvotes = db.query(func.count(Vote.id)).filter(
+            Vote.comment_id == comment_id,
+            Vote.vote_type == VoteType.DOWNVOTE
+        ).scalar()
+
+        return VoteScoreOut(
+            upvotes=upvotes,
+            downvotes=downvotes,
+            score=upvotes - downvotes
+        ), [("comment", comment_id)]
 
-    return {
-        "upvotes": upvotes,
-        "downvotes": downvotes,
-        "score": upvotes - downvotes
-    }
+    return response_cache.respond(request, response, build)
@@ -0,0 +1,319 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import and_, delete, func, or_, select
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.comment import Comment, MAX_COMMENT_DEPTH, PATH_SEGMENT_WIDTH
+from app.models.post import Post
+from app.models.report import Report
+from app.models.sync import Deletion
+from app.models.user import User
+from app.models.vote import Vote, VoteType
+from app.routers.auth import get_current_user
+from app.schemas.comment import CommentChangesOut, CommentCreate, CommentUpdate, CommentOut, CommentWithScoreOut
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.rate_limit import limit_per_user
+from app.utils.replicas import get_read_db
+from app.utils.response_cache import response_cache
+from app.utils.sync import changes_since, record_deletions
+
+router = APIRouter(prefix="/comments", tags=["comments"])
+
+def _path_segment(comment_id: int) -> str:
+    return f"{comment_id:0{PATH_SEGMENT_WIDTH}d}/"
+
+def _ancestor_ids(path: str) -> list[int]:
+    return [int(segment) for segment in path.split("/") if segment]
+
+def _subtree_filter(root: Comment):
+    # "~" sorts after every digit and "/", closing the range right after the subtree.
+    return (
+        Comment.post_id == root.post_id,
+        Comment.path >= root.path,
+        Comment.path < root.path + "~",
+    )
+
+def _scored_comments_query(post_id: int, db: Session):
+    scores = (
+        db.query(
+            Vote.comment_id.label("comment_id"),
+            func.count(Vote.id).filter(Vote.vote_type == VoteType.UPVOTE).label("upvotes"),
+            func.count(Vote.id).filter(Vote.vote_type == VoteType.DOWNVOTE).label("downvotes"),
+        )
+        .join(Comment, Comment.id == Vote.comment_id)
+        .filter(Comment.post_id == post_id)
+        .group_by(Vote.comment_id)
+        .subquery()
+    )
+    upvotes = func.coalesce(scores.c.upvotes, 0)
+    downvotes = func.coalesce(scores.c.downvotes, 0)
+    query = (
+        db.query(Comment, upvotes, downvotes)
+        .outerjoin(scores, scores.c.comment_id == Comment.id)
+        .filter(Comment.post_id == post_id, Comment.is_hidden.is_(False))
+    )
+    return query, upvotes - downvotes
+
+def _build_scored_out(comment: Comment, upvotes: int, downvotes: int) -> CommentWithScoreOut:
+    return CommentWithScoreOut(
+        **CommentOut.model_validate(comment).model_dump(),
+        upvotes=upvotes,
+        downvotes=downvotes,
+        score=upvotes - downvotes,
+    )
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+@router.post(
+    "/{post_id}",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_per_user("comment"))],
+)
+def create_comment(
+    post_id: int,
+    payload: CommentCreate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    post = db.query(Post).filter(Post.id == post_id).first()
+    if not post:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+
+    parent = None
+    if payload.parent_id is not None:
+        parent = db.query(Comment).filter(Comment.id == payload.parent_id).first()
+        if not parent or parent.post_id != post_id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Parent comment not found"
+            )
+        if parent.depth + 1 > MAX_COMMENT_DEPTH:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Maximum reply depth reached"
+            )
+
+    comment = Comment(
+        content=payload.content,
+        post_id=post_id,
+        owner_id=current_user.id,
+        parent_id=parent.id if parent else None,
+        depth=parent.depth + 1 if parent else 0
+    )
+    db.add(comment)
+    db.flush()
+    comment.path = (parent.path if parent else "") + _path_segment(comment.id)
+    if parent:
+        db.query(Comment).filter(Comment.id.in_(_ancestor_ids(parent.path))).update(
+            {Comment.reply_count: Comment.reply_count + 1}, synchronize_session=False
+        )
+    db.commit()
+    db.refresh(comment)
+    response_cache.invalidate(("comments", post_id))
+    return {"message": "Successfully created comment", "data": CommentOut.model_validate(comment)}
+
+@router.get("/post/{post_id}", response_model=list[CommentWithScoreOut])
+def list_comments(
+    post_id: int,
+    request: Request,
+    response: Response,
+    sort: Literal["thread", "new", "top"] = "thread",
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db)
+):
+    def build():
+        query, score = _scored_comments_query(post_id, db)
+        position = decode_cursor(cursor) if cursor else None
+        if cursor and not position:
+            raise _invalid_cursor()
+
+        try:
+            if sort == "thread":
+                if position:
+                    query = query.filter(Comment.path > str(position[0]))
+                query = query.order_by(Comment.path)
+            elif sort == "new":
+                if position:
+                    query = query.filter(Comment.id < int(position[0]))
+                query = query.order_by(Comment.id.desc())
+            else:
+                if position:
+                    last_score, last_id = int(position[0]), int(position[1])
+                    query = query.filter(or_(
+                        score < last_score,
+                        and_(score == last_score, Comment.id < last_id),
+                    ))
+                query = query.order_by(score.desc(), Comment.id.desc())
+        except (IndexError, TypeError, ValueError):
+            raise _invalid_cursor()
+
+        rows = query.limit(limit + 1).all()
+        if not rows and not cursor:
+            if not db.query(Post.id).filter(Post.id == post_id).first():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Post not found"
+                )
+
+        page = [_build_scored_out(c, up, down) for c, up, down in rows[:limit]]
+        if len(rows) > limit:
+            last = page[-1]
+            if sort == "thread":
+                response.headers["X-Next-Cursor"] = encode_cursor([rows[limit - 1][0].path])
+            elif sort == "new":
+                response.headers["X-Next-Cursor"] = encode_cursor([last.id])
+            else:
+                response.headers["X-Next-Cursor"] = encode_cursor([last.score, last.id])
+        return page, [("comments", post_id)] + [("comment", c.id) for c in page]
+
+    return response_cache.respond(request, response, build)
+
+@router.get("/post/{post_id}/changes", response_model=CommentChangesOut)
+def get_comment_changes(
+    post_id: int,
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db)
+):
+    changes, deleted, version, has_more = changes_since(
+        db.query(Comment).filter(Comment.post_id == post_id),
+        db.query(Deletion).filter(Deletion.entity == "comment", Deletion.scope_id == post_id),
+        Comment,
+        since,
+        limit,
+        is_deleted=lambda comment: comment.is_hidden,
+    )
+    if not changes and not deleted and not since:
+        if not db.query(Post.id).filter(Post.id == post_id).first():
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
+    return CommentChangesOut(
+        changes=[CommentOut.model_validate(c) for c in changes],
+        deleted=deleted,
+        version=version,
+        has_more=has_more,
+    )
+
+@router.get("/{comment_id}/thread", response_model=list[CommentWithScoreOut])
+def get_comment_thread(
+    comment_id: int,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_read_db)
+):
+    position = decode_cursor(cursor) if cursor else None
+    if cursor and not position:
+        raise _invalid_cursor()
+
+    root = db.query(Comment).filter(Comment.id == comment_id).first()
+    if not root:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+
+    query, _ = _scored_comments_query(root.post_id, db)
+    query = query.filter(*_subtree_filter(root))
+    if position:
+        query = query.filter(Comment.path > str(position[0]))
+    rows = query.order_by(Comment.path).limit(limit + 1).all()
+    if len(rows) > limit:
+        response.headers["X-Next-Cursor"] = encode_cursor([rows[limit - 1][0].path])
+    return [_build_scored_out(c, up, down) for c, up, down in rows[:limit]]
+
+@router.get("/{comment_id}", response_model=CommentOut)
+def get_comment(
+    comment_id: int,
+    db: Session = Depends(get_read_db)
+):
+    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    if not comment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+    return comment
+
+@router.put("/{comment_id}")
+def update_comment(
+    comment_id: int,
+    payload: CommentUpdate,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    if not comment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+    if comment.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to update this comment"
+        )
+
+    if payload.content:
+        comment.content = payload.content
+
+    db.commit()
+    db.refresh(comment)
+    response_cache.invalidate(("comment", comment_id))
+    return {"message": "Successfully updated comment", "data": CommentOut.model_validate(comment)}
+
+@router.delete("/{comment_id}", status_code=status.HTTP_200_OK)
+def delete_comment(
+    comment_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    comment = db.query(Comment).filter(Comment.id == comment_id).first()
+    if not comment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Comment not found"
+        )
+    if comment.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to delete this comment"
+        )
+
+    removed = comment.reply_count + 1
+    ancestor_ids = _ancestor_ids(comment.path)[:-1]
+    if ancestor_ids:
+        db.query(Comment).filter(Comment.id.in_(ancestor_ids)).update(
+            {Comment.reply_count: Comment.reply_count - removed}, synchronize_session=False
+        )
+    post_id = comment.post_id
+    # Votes and reports on any reply would block the delete through their FKs.
+    subtree_ids = select(Comment.id).where(*_subtree_filter(comment))
+    for model in (Vote, Report):
+        db.execute(
+            delete(model)
+            .where(model.comment_id.in_(subtree_ids))
+            .execution_options(synchronize_session=False)
+        )
+    deleted_ids = db.execute(
+        delete(Comment)
+        .where(*_subtree_filter(comment))
+        .returning(Comment.id)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    record_deletions(db, "comment", deleted_ids, [post_id])
+    db.commit()
+    response_cache.invalidate(("comments", post_id), *(("comment", deleted_id) for deleted_id in deleted_ids))
+    return {"message": "Successfully deleted comment"}
@@ -1,62 +1,124 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+from typing import Literal
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from sqlalchemy import func, tuple_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.config import settings
+from app.database import SessionLocal, get_db
 from app.models.community import Community, CommunityMember, CommunityPost, MemberRole
 from app.models.user import User
-from app.routers.auth import get_current_user
+from app.routers.auth import get_current_user, require_admin
 from app.schemas.community import (
     CommunityCreate,
+    CommunityDeletionOut,
     CommunityOut,
     CommunityPostCreate,
     CommunityPostOut,
     MemberOut,
 )
+from app.utils.cache import TTLCache
+from app.utils.community_deletion import community_deletions, is_deleting
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.rate_limit import limit_per_user
 
 router = APIRouter(prefix="/communities", tags=["communities"])
 
+community_cache = TTLCache(settings.community_cache_maxsize, settings.community_cache_ttl_seconds)
+membership_cache = TTLCache(settings.community_cache_maxsize, settings.community_cache_ttl_seconds)
 
-def _require_member(community_id: int, user: User, db: Session) -> CommunityMember:
-    membership = (
-        db.query(CommunityMember)
-        .filter(
-            CommunityMember.community_id == community_id,
-            CommunityMember.user_id == user.id,
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+
+def _snapshot(community: Community) -> dict:
+    return {
+        "id": community.id,
+        "name": community.name,
+        "description": community.description,
+        "captain_id": community.captain_id,
+        "member_count": community.member_count,
+        "created_at": community.created_at,
+    }
+
+
+def _get_community_snapshot(community_id: int, db: Session) -> dict | None:
+    def load():
+        community = db.query(Community).filter(Community.id == community_id).first()
+        return _snapshot(community) if community else None
+
+    return community_cache.get_or_load(community_id, load)
+
+
+def _get_member_role(community_id: int, user_id: int, db: Session, fresh: bool = False) -> MemberRole | None:
+    # Cached roles can be up to a TTL stale on other workers; destructive
+    # actions pass fresh=True and read the role from the database.
+    def load():
+        return (
+            db.query(CommunityMember.role)
+            .filter(
+                CommunityMember.community_id == community_id,
+                CommunityMember.user_id == user_id,
+            )
+            .scalar()
         )
-        .first()
+
+    if fresh:
+        return load()
+    return membership_cache.get_or_load((community_id, user_id), load)
+
+
+def _adjust_member_count(community_id: int, delta: int, db: Session) -> bool:
+    # Returns False, leaving the count alone, once the community is being deleted.
+    return bool(db.query(Community).filter(Community.id == community_id, ~is_deleting(community_id)).update(
+        {Community.member_count: Community.member_count + delta}, synchronize_session=False
+    ))
+
+
+def _being_deleted() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="This community is being deleted",
     )
-    if not membership:
+
+
+def _invalidate_membership(community_id: int, *user_ids: int):
+    membership_cache.invalidate(*[(community_id, user_id) for user_id in user_ids])
+    community_cache.invalidate(community_id)
+
+
+def _require_member(community_id: int, user: User, db: Session, fresh: bool = False) -> MemberRole:
+    role = _get_member_role(community_id, user.id, db, fresh)
+    if role is None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You must be a member of this community to perform this action",
         )
-    return membership
+    return role
 
 
-def _require_captain(community_id: int, user: User, db: Session) -> CommunityMember:
-    membership = _require_member(community_id, user, db)
-    if membership.role != MemberRole.captain:
+def _require_captain(community_id: int, user: User, db: Session):
+    # Always read from the database: right after a transfer, another worker's
+    # cache may still name the old captain. captain_id rather than the
+    # membership row, which a half-finished deletion may already have removed.
+    captain_id = db.query(Community.captain_id).filter(Community.id == community_id).scalar()
+    if captain_id is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Community not found")
+    if captain_id != user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the community captain can perform this action",
         )
-    return membership
 
 
-def _build_community_out(community: Community, db: Session) -> CommunityOut:
-    member_count = (
-        db.query(CommunityMember)
-        .filter(CommunityMember.community_id == community.id)
-        .count()
-    )
-    return CommunityOut(
-        id=community.id,
-        name=community.name,
-        description=community.description,
-        captain_id=community.captain_id,
-        member_count=member_count,
-        created_at=community.created_at,
-    )
+def _build_community_out(community: dict) -> CommunityOut:
+    return CommunityOut(**community)
 
 
 def _build_post_out(post: CommunityPost) -> CommunityPostOut:
@@ -88,6 +150,7 @@ def create_community(
         name=payload.name,
         description=payload.description,
         captain_id=current_user.id,
+        member_count=1,
     )
     db.add(community)
     db.flush()
@@ -100,8 +163,9 @@ def create_community(
     db.add(captain_membership)
     db.commit()
     db.refresh(community)
+    _invalidate_membership(community.id, current_user.id)
 
-    return {"message": "Community created", "data": _build_community_out(community, db)}
+    return {"message": "Community created", "data": _build_community_out(_snapshot(community))}
 
 
 @router.get("/", response_model=list[CommunityOut])
@@ -110,7 +174,56 @@ def list_communities(
     current_user: User = Depends(get_current_user),
 ):
     communities = db.query(Community).all()
-    return [_build_community_out(c, db) for c in communities]
+    return [_build_community_out(_snapshot(c)) for c in communities]
+
+
+DIRECTORY_SORTS = {
+    "size": (Community.member_count, int),
+    "newest": (Community.id, int),
+    "activity": (Community.last_activity_at, datetime.fromisoformat),
+}
+
+
+@router.get("/directory", response_model=list[CommunityOut])
+def community_directory(
+    response: Response,
+    q: str | None = Query(None, min_length=1, max_length=100),
+    sort: Literal["size", "newest", "activity"] = "size",
+    cursor: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    sort_column, parse_key = DIRECTORY_SORTS[sort]
+    query = db.query(Community)
+    if q:
+        pattern = q.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.filter(func.lower(Community.name).like(pattern + "%", escape="\\"))
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            last_key = (parse_key(position[0]), int(position[1]))
+        except (IndexError, TypeError, ValueError):
+            raise _invalid_cursor()
+        query = query.filter(tuple_(sort_column, Community.id) < tuple_(*last_key))
+
+    communities = query.order_by(sort_column.desc(), Community.id.desc()).limit(limit + 1).all()
+    if len(communities) > limit:
+        last = communities[limit - 1]
+        last_value = getattr(last, sort_column.key)
+        response.headers["X-Next-Cursor"] = encode_cursor([
+            last_value.isoformat() if isinstance(last_value, datetime) else last_value,
+            last.id,
+        ])
+    return [_build_community_out(_snapshot(c)) for c in communities[:limit]]
+
+
+@router.get("/cache-stats", dependencies=[Depends(require_admin)])
+def get_cache_stats():
+    return {
+        "communities": community_cache.stats(),
+        "memberships": membership_cache.stats(),
+    }
 
 
 @router.get("/{community_id}", response_model=CommunityOut)
@@ -119,10 +232,10 @@ def get_community(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    community = db.query(Community).filter(Community.id == community_id).first()
+    community = _get_community_snapshot(community_id, db)
     if not community:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Community not found")
-    return _build_community_out(community, db)
+    return _build_community_out(community)
 
 
 @router.post("/{community_id}/join", status_code=status.HTTP_200_OK)
@@ -131,22 +244,15 @@ def join_community(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    community = db.query(Community).filter(Community.id == community_id).first()
+    community = _get_community_snapshot(community_id, db)
     if not community:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Community not found")
 
-    existing = (
-        db.query(CommunityMember)
-        .filter(
-            CommunityMember.community_id == community_id,
-            CommunityMember.user_id == current_user.id,
-        )
-        .first()
+    already_member = HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="You are already a member"
     )
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="You are already a member"
-        )
+    if _get_member_role(community_id, current_user.id, db) is not None:
+        raise already_member
 
     membership = CommunityMember(
         community_id=community_id,
@@ -154,8 +260,17 @@ def join_community(
         role=MemberRole.member,
     )
     db.add(membership)
-    db.commit()
-    return {"message": f"Joined community '{community.name}'"}
+    try:
+        if not _adjust_member_count(community_id, 1, db):
+            db.rollback()
+            raise _being_deleted()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise already_member
+    finally:
+        _invalidate_membership(community_id, current_user.id)
+    return {"message": f"Joined community '{community['name']}'"}
 
 
 @router.post("/{community_id}/leave", status_code=status.HTTP_200_OK)
@@ -183,30 +298,56 @@ def leave_community(
         )
 
     db.delete(membership)
+    _adjust_member_count(community_id, -1, db)
     db.commit()
+    _invalidate_membership(community_id, current_user.id)
     return {"message": "Left community"}
 
 
 @router.get("/{community_id}/members", response_model=list[MemberOut])
 def list_members(
     community_id: int,
+    response: Response,
+    role: MemberRole | None = None,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     _require_member(community_id, current_user, db)
-    members = (
-        db.query(CommunityMember)
+    query = (
+        db.query(
+            CommunityMember.id,
+            CommunityMember.user_id,
+            User.username,
+            CommunityMember.role,
+            CommunityMember.joined_at,
+        )
+        .join(User, User.id == CommunityMember.user_id)
         .filter(CommunityMember.community_id == community_id)
-        .all()
     )
+    if role is not None:
+        query = query.filter(CommunityMember.role == role)
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            last_key = (datetime.fromisoformat(position[0]), int(position[1]))
+        except (IndexError, TypeError, ValueError):
+            raise _invalid_cursor()
+        query = query.filter(tuple_(CommunityMember.joined_at, CommunityMember.id) > tuple_(*last_key))
+
+    rows = query.order_by(CommunityMember.joined_at, CommunityMember.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        last = rows[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last.joined_at.isoformat(), last.id])
     return [
         MemberOut(
-            user_id=m.user_id,
-            username=m.user.username,
-            role=m.role,
-            joined_at=m.joined_at,
+            user_id=row.user_id,
+            username=row.username,
+            role=row.role,
+            joined_at=row.joined_at,
         )
-        for m in members
+        for row in rows[:limit]
     ]
 
 
@@ -248,23 +389,62 @@ def transfer_captaincy(
     community.captain_id = new_captain_user_id
 
     db.commit()
+    community_cache.invalidate(community_id)
+    _invalidate_membership(community_id, current_user.id, new_captain_user_id)
     return {"message": "Captaincy transferred"}
 
 
-@router.delete("/{community_id}", status_code=status.HTTP_200_OK)
+def _run_community_deletion(community_id: int):
+    try:
+        community_deletions.run(community_id, SessionLocal, settings.community_delete_batch_size)
+    finally:
+        community_cache.invalidate(community_id)
+        membership_cache.invalidate_where(lambda key: key[0] == community_id)
+
+
+@router.delete("/{community_id}", status_code=status.HTTP_202_ACCEPTED)
 def delete_community(
     community_id: int,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     _require_captain(community_id, current_user, db)
-    community = db.query(Community).filter(Community.id == community_id).first()
-    db.delete(community)
-    db.commit()
-    return {"message": "Community deleted"}
+    job = community_deletions.start(db, community_id, current_user.id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This community is already being deleted",
+        )
+    community_cache.invalidate(community_id)
+    background_tasks.add_task(_run_community_deletion, community_id)
+    return {"message": "Community deletion started", "data": CommunityDeletionOut.model_validate(job)}
+
+
+@router.get("/{community_id}/deletion", response_model=CommunityDeletionOut)
+def get_community_deletion(
+    community_id: int,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    job = community_deletions.get(db, community_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No deletion found for this community")
+    # The captain while the community exists, whoever started the job after.
+    captain_id = db.query(Community.captain_id).filter(Community.id == community_id).scalar()
+    if (captain_id or job.requested_by) != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only the community captain can perform this action",
+        )
+    return job
 
 
-@router.post("/{community_id}/posts", status_code=status.HTTP_201_CREATED)
+@router.post(
+    "/{community_id}/posts",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_per_user("post"))],
+)
 def create_community_post(
     community_id: int,
     payload: CommunityPostCreate,
@@ -273,7 +453,7 @@ def create_community_post(
 ):
     _require_member(community_id, current_user, db)
 
-    community = db.query(Community).filter(Community.id == community_id).first()
+    community = _get_community_snapshot(community_id, db)
     if not community:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Community not found")
 
@@ -284,6 +464,12 @@ def create_community_post(
         owner_id=current_user.id,
     )
     db.add(post)
+    active = db.query(Community).filter(Community.id == community_id, ~is_deleting(community_id)).update(
+        {Community.last_activity_at: datetime.now(timezone.utc)}, synchronize_session=False
+    )
+    if not active:
+        db.rollback()
+        raise _being_deleted()
     db.commit()
     db.refresh(post)
     return {"message": "Post created", "data": _build_post_out(post)}
@@ -331,7 +517,7 @@ def delete_community_post(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    membership = _require_member(community_id, current_user, db)
+    role = _require_member(community_id, current_user, db, fresh=True)
 
     post = (
         db.query(CommunityPost)
@@ -341,7 +527,7 @@ def delete_community_post(
     if not post:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Post not found")
 
-    if post.owner_id != current_user.id and membership.role != MemberRole.captain:
+    if post.owner_id != current_user.id and role != MemberRole.captain:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Only the post author or the captain can delete this post",
@@ -0,0 +1,15 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query
+
+from app.routers.auth import require_admin
+from app.utils.query_stats import query_stats
+
+router = APIRouter(prefix="/diagnostics", tags=["diagnostics"])
+
+@router.get("/queries", dependencies=[Depends(require_admin)])
+def get_query_stats(
+    sort: Literal["total_ms", "max_ms", "count", "max_per_request"] = "total_ms",
+    limit: int = Query(20, ge=1, le=200)
+):
+    return {"queries": query_stats.top(limit, sort)}
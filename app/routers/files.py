@@ -3,14 +3,18 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.file import File
+from app.models.post import Post
 from app.models.user import User
 from app.routers.auth import get_current_user
 from app.schemas.file import FileOut
+from app.utils.rate_limit import limit_per_user
 from app.utils.storage import is_allowed_media, save_upload_file
+from app.utils.response_cache import response_cache
+from app.utils.sync import touch
 
 router = APIRouter(prefix="/files", tags=["files"])
 
-@router.post("/upload", status_code=status.HTTP_201_CREATED)
+@router.post("/upload", status_code=status.HTTP_201_CREATED, dependencies=[Depends(limit_per_user("upload"))])
 def upload_file(
     file: UploadFile = FastAPIFile(...),
     post_id: int | None = None,
@@ -41,8 +45,12 @@ def upload_file(
         message_id=message_id
     )
     db.add(new_file)
+    if post_id:
+        touch(db, Post, Post.id == post_id)
     db.commit()
     db.refresh(new_file)
+    if post_id:
+        response_cache.invalidate(("post", post_id))
     return {"message": "Successfully uploaded file", "data": FileOut.model_validate(new_file)}
 
 @router.get("/{file_id}", response_model=FileOut)
@@ -84,6 +92,11 @@ def delete_file(
             detail="Not authorized to delete this file"
         )
 
+    post_id = file.post_id
     db.delete(file)
+    if post_id:
+        touch(db, Post, Post.id == post_id)
     db.commit()
+    if post_id:
+        response_cache.invalidate(("post", post_id))
     return {"message": "Successfully deleted file"}
@@ -1,16 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status
 from sqlalchemy import or_
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.message import Message
+from app.models.sync import Deletion
 from app.models.user import User
-from app.routers.auth import get_current_user
-from app.schemas.message import MessageCreate, MessageOut
+from app.routers.auth import get_current_user, get_current_user_id
+from app.schemas.message import BulkReadOut, MessageChangesOut, MessageCreate, MessageOut, UnreadCountOut
+from app.utils.rate_limit import limit_per_user
+from app.utils.sync import changes_since, record_deletions
+from app.utils.unread import count_unread, unread_counter
+from app.utils.websocket import connection_manager
 
 router = APIRouter(prefix="/messages", tags=["messages"])
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", status_code=status.HTTP_201_CREATED, dependencies=[Depends(limit_per_user("message"))])
 def send_message(
     payload: MessageCreate,
     db: Session = Depends(get_db),
@@ -31,6 +36,7 @@ def send_message(
     db.add(message)
     db.commit()
     db.refresh(message)
+    unread_counter.increment(message.recipient_id)
     return {"message": "Successfully sent message", "data": MessageOut.model_validate(message)}
 
 @router.get("/conversation/{user_id}", response_model=list[MessageOut])
@@ -65,6 +71,14 @@ def get_inbox(
     ).order_by(Message.created_at.desc()).all()
     return messages
 
+@router.get("/unread-count", response_model=UnreadCountOut)
+def get_unread_count(
+    db: Session = Depends(get_db),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    # The session only connects when the cached count has to be reloaded.
+    return {"unread": unread_counter.get(current_user_id, lambda user_id: count_unread(db, user_id))}
+
 @router.get("/sent", response_model=list[MessageOut])
 def get_sent(
     db: Session = Depends(get_db),
@@ -75,6 +89,29 @@ def get_sent(
     ).order_by(Message.created_at.desc()).all()
     return messages
 
+@router.get("/changes", response_model=MessageChangesOut)
+def get_message_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    changes, deleted, version, has_more = changes_since(
+        db.query(Message).filter(
+            or_(Message.sender_id == current_user.id, Message.recipient_id == current_user.id)
+        ),
+        db.query(Deletion).filter(Deletion.entity == "message", Deletion.scope_id == current_user.id),
+        Message,
+        since,
+        limit,
+    )
+    return MessageChangesOut(
+        changes=[MessageOut.model_validate(m) for m in changes],
+        deleted=deleted,
+        version=version,
+        has_more=has_more,
+    )
+
 @router.put("/{message_id}/mark-read")
 def mark_as_read(
     message_id: int,
@@ -93,11 +130,46 @@ def mark_as_read(
             detail="Not authorized to mark this message"
         )
 
-    message.is_read = True
-    db.commit()
-    db.refresh(message)
+    if not message.is_read:
+        message.is_read = True
+        db.commit()
+        db.refresh(message)
+        unread_counter.decrement(current_user.id)
     return {"message": "Successfully marked message as read", "data": MessageOut.model_validate(message)}
 
+@router.put("/conversation/{user_id}/mark-read")
+def mark_conversation_as_read(
+    user_id: int,
+    background_tasks: BackgroundTasks,
+    up_to_id: int = Query(..., ge=1),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    updated = db.query(Message).filter(
+        Message.sender_id == user_id,
+        Message.recipient_id == current_user.id,
+        Message.id <= up_to_id,
+        Message.is_read.is_(False)
+    ).update({Message.is_read: True}, synchronize_session=False)
+    db.commit()
+
+    if updated:
+        unread_counter.decrement(current_user.id, updated)
+        background_tasks.add_task(
+            connection_manager.send_personal_message,
+            user_id,
+            {
+                "type": "read_receipt",
+                "reader_id": current_user.id,
+                "up_to_id": up_to_id,
+                "count": updated,
+            }
+        )
+    return {
+        "message": "Successfully marked conversation as read",
+        "data": BulkReadOut(up_to_id=up_to_id, updated=updated)
+    }
+
 @router.delete("/{message_id}", status_code=status.HTTP_200_OK)
 def delete_message(
     message_id: int,
@@ -116,6 +188,11 @@ def delete_message(
             detail="Not authorized to delete this message"
         )
 
+    was_unread = not message.is_read
+    recipient_id = message.recipient_id
     db.delete(message)
+    record_deletions(db, "message", [message_id], {message.sender_id, recipient_id})
     db.commit()
+    if was_unread:
+        unread_counter.decrement(recipient_id)
     return {"message": "Successfully deleted message"}
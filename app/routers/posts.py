@@ -1,15 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.post import Post
+from app.models.sync import Deletion
 from app.models.user import User
 from app.routers.auth import get_current_user
-from app.schemas.post import PostCreate, PostUpdate, PostOut
+from app.schemas.post import PostChangesOut, PostCreate, PostUpdate, PostOut
+from app.utils.rate_limit import limit_per_user
+from app.utils.replicas import get_read_db
+from app.utils.response_cache import response_cache
+from app.utils.sync import changes_since, record_deletions
 
 router = APIRouter(prefix="/posts", tags=["posts"])
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", status_code=status.HTTP_201_CREATED, dependencies=[Depends(limit_per_user("post"))])
 def create_post(
     payload: PostCreate,
     db: Session = Depends(get_db),
@@ -39,13 +44,13 @@ def get_my_posts(
     return [PostOut.model_validate(p) for p in posts]
 
 @router.get("/", response_model=list[PostOut])
-def list_posts(db: Session = Depends(get_db)):
-    posts = db.query(Post).all()
+def list_posts(db: Session = Depends(get_read_db)):
+    posts = db.query(Post).filter(Post.is_hidden.is_(False)).all()
     return [PostOut.model_validate(p) for p in posts]
 
 @router.get("/user/{author_id}", response_model=list[PostOut])
-def get_posts_by_author(author_id: int, db: Session = Depends(get_db)):
-    posts = db.query(Post).filter(Post.owner_id == author_id).all()
+def get_posts_by_author(author_id: int, db: Session = Depends(get_read_db)):
+    posts = db.query(Post).filter(Post.owner_id == author_id, Post.is_hidden.is_(False)).all()
     if not posts:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -53,15 +58,42 @@ def get_posts_by_author(author_id: int, db: Session = Depends(get_db)):
         )
     return [PostOut.model_validate(p) for p in posts]
 
+@router.get("/changes", response_model=PostChangesOut)
+def get_post_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=500),
+    db: Session = Depends(get_read_db)
+):
+    changes, deleted, version, has_more = changes_since(
+        db.query(Post),
+        db.query(Deletion).filter(Deletion.entity == "post", Deletion.scope_id.is_(None)),
+        Post,
+        since,
+        limit,
+        is_deleted=lambda post: post.is_hidden,
+    )
+    return PostChangesOut(
+        changes=[PostOut.model_validate(p) for p in changes],
+        deleted=deleted,
+        version=version,
+        has_more=has_more,
+    )
+
 @router.get("/{post_id}", response_model=PostOut)
-def get_post(post_id: int, db: Session = Depends(get_db)):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
-    return PostOut.model_validate(post)
+def get_post(post_id: int, request: Request, response: Response, db: Session = Depends(get_read_db)):
+    def build():
+        post = db.query(Post).filter(Post.id == post_id).first()
+        if not post:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
+        return PostOut.model_validate(post), [("post", post_id)]
+
+    def version():
+        return db.query(Post.version).filter(Post.id == post_id).scalar()
+
+    return response_cache.respond(request, response, build, version)
 
 @router.put("/{post_id}")
 def update_post(
@@ -89,6 +121,7 @@ def update_post(
 
     db.commit()
     db.refresh(post)
+    response_cache.invalidate(("post", post_id))
     return {"message": "Successfully updated post", "data": PostOut.model_validate(post)}
 
 @router.delete("/{post_id}", status_code=status.HTTP_200_OK)
@@ -110,5 +143,7 @@ def delete_post(
         )
 
     db.delete(post)
+    record_deletions(db, "post", [post_id])
     db.commit()
+    response_cache.invalidate(("post", post_id), ("post_score", post_id), ("comments", post_id))
     return {"message": "Successfully deleted post"}
@@ -1,16 +1,62 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import math
+from datetime import datetime
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import Select, and_, exists, func, or_, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, aliased
+
+from app.config import settings
 from app.database import get_db
 from app.models.report import Report, ReportStatus
 from app.models.post import Post
 from app.models.comment import Comment
 from app.models.user import User
 from app.routers.auth import get_current_user
-from app.schemas.report import ReportCreate, ReportOut
+from app.schemas.report import (
+    BulkReviewOut,
+    BulkReviewRequest,
+    ReportCreate,
+    ReportOut,
+    ReportQueueItemOut,
+)
+from app.utils.pagination import decode_cursor, encode_cursor
+from app.utils.rate_limit import SlidingWindowLimiter, create_store
+from app.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/reports", tags=["reports"])
 
+report_limiter = SlidingWindowLimiter(
+    settings.report_rate_limit,
+    settings.report_rate_window_seconds,
+    create_store(settings.rate_limit_store_path),
+)
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Invalid cursor"
+    )
+
+def _hide_if_over_threshold(payload: ReportCreate, db: Session) -> bool:
+    if payload.comment_id:
+        model, target_id = Comment, payload.comment_id
+        reported = Report.comment_id == payload.comment_id
+    else:
+        model, target_id = Post, payload.post_id
+        reported = and_(Report.post_id == payload.post_id, Report.comment_id.is_(None))
+
+    pending_reports = db.query(func.count(Report.id)).filter(
+        reported,
+        Report.status == ReportStatus.PENDING
+    ).scalar_subquery()
+    hidden = db.query(model).filter(
+        model.id == target_id,
+        model.is_hidden.is_(False),
+        pending_reports >= settings.report_hide_threshold
+    ).update({model.is_hidden: True}, synchronize_session=False)
+    return bool(hidden)
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
 def create_report(
     payload: ReportCreate,
@@ -23,43 +69,196 @@ def create_report(
             detail="Must report either a post or comment"
         )
 
-    if payload.post_id:
-        post = db.query(Post).filter(Post.id == payload.post_id).first()
-        if not post:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Post not found"
-            )
+    retry_after = report_limiter.hit(f"report:{current_user.id}")
+    if retry_after is not None:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many reports, slow down",
+            headers={"Retry-After": str(math.ceil(retry_after))}
+        )
 
+    lookups = []
+    if payload.post_id:
+        lookups.append(("Post not found", db.query(Post.id).filter(Post.id == payload.post_id).exists()))
     if payload.comment_id:
-        comment = db.query(Comment).filter(Comment.id == payload.comment_id).first()
-        if not comment:
+        lookups.append(("Comment not found", db.query(Comment.id).filter(Comment.id == payload.comment_id).exists()))
+    found = db.query(*[exists for _, exists in lookups]).one()
+    for (detail, _), exists in zip(lookups, found):
+        if not exists:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="Comment not found"
+                detail=detail
             )
 
-    report = Report(
+    stmt = insert(Report).values(
         reporter_id=current_user.id,
         post_id=payload.post_id,
         comment_id=payload.comment_id,
         reason=payload.reason,
         description=payload.description
     )
-    db.add(report)
+    if payload.comment_id:
+        conflict_target = {
+            "index_elements": [Report.reporter_id, Report.comment_id],
+            "index_where": Report.comment_id.isnot(None),
+        }
+    else:
+        conflict_target = {
+            "index_elements": [Report.reporter_id, Report.post_id],
+            "index_where": Report.comment_id.is_(None),
+        }
+    stmt = stmt.on_conflict_do_update(
+        **conflict_target,
+        set_={"reason": stmt.excluded.reason, "description": stmt.excluded.description}
+    ).returning(Report)
+    report = db.scalars(stmt, execution_options={"populate_existing": True}).one()
+
+    hidden = _hide_if_over_threshold(payload, db)
     db.commit()
-    db.refresh(report)
+    if hidden and payload.comment_id:
+        response_cache.invalidate(("comment", payload.comment_id))
+    elif hidden:
+        response_cache.invalidate(("post", payload.post_id))
     return {"message": "Successfully created report", "data": ReportOut.model_validate(report)}
 
 @router.get("/", response_model=list[ReportOut])
 def list_reports(
+    response: Response,
     status_filter: ReportStatus | None = None,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=500),
     db: Session = Depends(get_db)
 ):
     query = db.query(Report)
     if status_filter:
         query = query.filter(Report.status == status_filter)
-    return query.all()
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            last_created_at, last_id = datetime.fromisoformat(position[0]), int(position[1])
+        except (IndexError, TypeError, ValueError):
+            raise _invalid_cursor()
+        query = query.filter(or_(
+            Report.created_at > last_created_at,
+            and_(Report.created_at == last_created_at, Report.id > last_id),
+        ))
+
+    reports = query.order_by(Report.created_at, Report.id).limit(limit + 1).all()
+    if len(reports) > limit:
+        last = reports[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last.created_at.isoformat(), last.id])
+    return reports[:limit]
+
+def pending_queue_heads(after: tuple[datetime, int] | None, limit: int) -> Select:
+    # The queue walks ix_reports_status_created_at and keeps only each
+    # target's earliest pending report, so a page reads the index from the
+    # cursor onwards instead of grouping every pending report. Whether an
+    # earlier pending report exists is answered by the per-target partial
+    # indexes.
+    earlier = aliased(Report)
+    before = tuple_(earlier.created_at, earlier.id) < tuple_(Report.created_at, Report.id)
+    earlier_for_post = exists().where(
+        Report.comment_id.is_(None),
+        earlier.status == ReportStatus.PENDING,
+        earlier.comment_id.is_(None),
+        earlier.post_id == Report.post_id,
+        before,
+    )
+    earlier_for_comment = exists().where(
+        earlier.status == ReportStatus.PENDING,
+        earlier.comment_id == Report.comment_id,
+        before,
+    )
+    query = select(Report.id, Report.post_id, Report.comment_id, Report.created_at).where(
+        Report.status == ReportStatus.PENDING,
+        ~earlier_for_post,
+        ~earlier_for_comment,
+    )
+    if after is not None:
+        query = query.where(tuple_(Report.created_at, Report.id) > tuple_(*after))
+    return query.order_by(Report.created_at, Report.id).limit(limit)
+
+def _pending_stats(db: Session, column, target_ids: list[int], *criteria) -> dict:
+    if not target_ids:
+        return {}
+    rows = db.query(column, func.count(Report.id), func.max(Report.created_at)).filter(
+        Report.status == ReportStatus.PENDING,
+        column.in_(target_ids),
+        *criteria
+    ).group_by(column).all()
+    return {target_id: (count, last) for target_id, count, last in rows}
+
+@router.get("/queue", response_model=list[ReportQueueItemOut])
+def get_moderation_queue(
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db)
+):
+    after = None
+    if cursor:
+        position = decode_cursor(cursor)
+        try:
+            created_at, report_id = position
+            after = (datetime.fromisoformat(created_at), int(report_id))
+        except (TypeError, ValueError):
+            raise _invalid_cursor()
+
+    heads = db.execute(pending_queue_heads(after, limit + 1)).all()
+    if len(heads) > limit:
+        last = heads[limit - 1]
+        response.headers["X-Next-Cursor"] = encode_cursor([last.created_at.isoformat(), last.id])
+    heads = heads[:limit]
+
+    post_stats = _pending_stats(
+        db, Report.post_id, [head.post_id for head in heads if head.comment_id is None], Report.comment_id.is_(None)
+    )
+    comment_stats = _pending_stats(
+        db, Report.comment_id, [head.comment_id for head in heads if head.comment_id is not None]
+    )
+    items = []
+    for head in heads:
+        if head.comment_id is None:
+            stats = post_stats.get(head.post_id)
+        else:
+            stats = comment_stats.get(head.comment_id)
+        if stats is None:
+            # Reviewed between the two queries.
+            continue
+        report_count, last_reported_at = stats
+        items.append(ReportQueueItemOut(
+            post_id=head.post_id,
+            comment_id=head.comment_id,
+            report_count=report_count,
+            first_reported_at=head.created_at,
+            last_reported_at=last_reported_at,
+        ))
+    return items
+
+@router.put("/review")
+def bulk_review_reports(
+    payload: BulkReviewRequest,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    if payload.report_ids:
+        target = Report.id.in_(payload.report_ids)
+    elif payload.comment_id:
+        target = Report.comment_id == payload.comment_id
+    elif payload.post_id:
+        target = and_(Report.post_id == payload.post_id, Report.comment_id.is_(None))
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Must select reports by report_ids, post_id or comment_id"
+        )
+
+    updated = db.query(Report).filter(
+        target,
+        Report.status == payload.current_status
+    ).update({Report.status: payload.new_status}, synchronize_session=False)
+    db.commit()
+    return {"message": "Successfully reviewed reports", "data": BulkReviewOut(updated=updated)}
 
 @router.get("/{report_id}", response_model=ReportOut)
 def get_report(
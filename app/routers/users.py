@@ -1,10 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.user import User
-from app.routers.auth import get_current_user
-from app.schemas.user import UserOut, UserUpdate
+from app.routers.auth import get_current_user, get_current_user_id
+from app.schemas.user import PresenceOut, UserOut, UserUpdate
+from app.utils.websocket import connection_manager
+from app.utils.replicas import get_read_db
+from app.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/users", tags=["users"])
 
@@ -17,20 +20,32 @@ def read_me(
 @router.get("/{user_id}", response_model=UserOut)
 def read_user(
     user_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return user
+    def build():
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        return UserOut.model_validate(user), [("user", user_id)]
+
+    return response_cache.respond(request, response, build)
+
+@router.get("/{user_id}/presence", response_model=PresenceOut)
+def read_user_presence(
+    user_id: int,
+    current_user_id: int = Depends(get_current_user_id)
+):
+    return {"user_id": user_id, "online": connection_manager.is_user_online(user_id)}
 
 @router.get("/by-username/{username}", response_model=UserOut)
 def read_user_by_username(
     username: str,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     user = db.query(User).filter(User.username == username).first()
     if not user:
@@ -89,6 +104,7 @@ def update_user(
 
     db.commit()
     db.refresh(user)
+    response_cache.invalidate(("user", user_id))
     return {"message": "Successfully updated user", "data": UserOut.model_validate(user)}
 
 @router.delete("/{user_id}", status_code=status.HTTP_200_OK)
@@ -112,4 +128,5 @@ def delete_user(
 
     db.delete(user)
     db.commit()
+    response_cache.invalidate(("user", user_id))
     return {"message": "Successfully deleted user account"}
@@ -1,50 +1,78 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import func
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import func, literal_column
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.database import get_db
 from app.models.vote import Vote, VoteType
 from app.models.post import Post
 from app.models.user import User
 from app.routers.auth import get_current_user
 from app.schemas.vote import VoteCreate, VoteOut
+from app.utils.rate_limit import limit_per_user
+from app.utils.vote_buffer import VoteBufferFull, vote_buffer
 from app.schemas.vote_score import VoteScoreOut
+from app.utils.replicas import get_read_db
+from app.utils.response_cache import response_cache
 
 router = APIRouter(prefix="/votes", tags=["votes"])
 
-@router.post("/post/{post_id}", status_code=status.HTTP_201_CREATED)
+FOREIGN_KEY_VIOLATION = "23503"
+
+@router.post(
+    "/post/{post_id}",
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_per_user("vote"))],
+)
 def vote_post(
     post_id: int,
     payload: VoteCreate,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
+    if vote_buffer.running:
+        try:
+            vote_buffer.add("post", post_id, current_user.id, payload.vote_type)
+        except VoteBufferFull:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many votes waiting to be saved, try again shortly",
+                headers={"Retry-After": str(max(1, math.ceil(settings.vote_buffer_flush_seconds)))}
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return {"message": "Successfully queued vote"}
 
-    existing = db.query(Vote).filter(
-        Vote.post_id == post_id,
-        Vote.user_id == current_user.id
-    ).first()
-    if existing:
-        existing.vote_type = payload.vote_type
-        db.commit()
-        db.refresh(existing)
-        return {"message": "Successfully updated vote", "data": VoteOut.model_validate(existing)}
-
-    vote = Vote(
+    stmt = insert(Vote).values(
         post_id=post_id,
         user_id=current_user.id,
         vote_type=payload.vote_type
     )
-    db.add(vote)
-    db.commit()
-    db.refresh(vote)
-    return {"message": "Successfully voted on post", "data": VoteOut.model_validate(vote)}
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Vote.post_id, Vote.user_id],
+        index_where=Vote.post_id.isnot(None),
+        set_={"vote_type": stmt.excluded.vote_type}
+    ).returning(Vote, literal_column("xmax = 0").label("inserted"))
+    try:
+        vote, inserted = db.execute(stmt, execution_options={"populate_existing": True}).one()
+        data = VoteOut.model_validate(vote)
+        db.commit()
+        response_cache.invalidate(("post_score", post_id))
+    except IntegrityError as exc:
+        db.rollback()
+        if getattr(exc.orig, "pgcode", None) != FOREIGN_KEY_VIOLATION:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Post not found"
+        )
+
+    message = "Successfully voted on post" if inserted else "Successfully updated vote"
+    return {"message": message, "data": data}
 
 @router.delete("/post/{post_id}", status_code=status.HTTP_200_OK)
 def unvote_post(
@@ -52,42 +80,50 @@ def unvote_post(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    queued = vote_buffer.discard("post", post_id, current_user.id)
     vote = db.query(Vote).filter(
         Vote.post_id == post_id,
         Vote.user_id == current_user.id
     ).first()
-    if not vote:
+    if not vote and not queued:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Vote not found"
         )
-    db.delete(vote)
-    db.commit()
+    if vote:
+        db.delete(vote)
+        db.commit()
+        response_cache.invalidate(("post_score", post_id))
     return {"message": "Successfully removed vote"}
 
 @router.get("/post/{post_id}/score", response_model=VoteScoreOut)
 def get_post_vote_score(
     post_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_read_db)
 ):
-    post = db.query(Post).filter(Post.id == post_id).first()
-    if not post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
+    def build():
+        post = db.query(Post).filter(Post.id == post_id).first()
+        if not post:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
 
-    upvotes = db.query(func.count(Vote.id)).filter(
-        Vote.post_id == post_id,
-        Vote.vote_type == VoteType.UPVOTE
-    ).scalar()
-    downvotes = db.query(func.count(Vote.id)).filter(
-        Vote.post_id == post_id,
-        Vote.vote_type == VoteType.DOWNVOTE
-    ).scalar()
+        upvotes = db.query(func.count(Vote.id)).filter(
+            Vote.post_id == post_id,
+            Vote.vote_type == VoteType.UPVOTE
+        ).scalar()
+        downvotes = db.query(func.count(Vote.id)).filter(
+            Vote.post_id == post_id,
+            Vote.vote_type == VoteType.DOWNVOTE
+        ).scalar()
+
+        return VoteScoreOut(
+            upvotes=upvotes,
+            downvotes=downvotes,
+            score=upvotes - downvotes
+        ), [("post_score", post_id)]
 
-    return {
-        "upvotes": upvotes,
-        "downvotes": downvotes,
-        "score": upvotes - downvotes
-    }
\ No newline at end of file
+    return response_cache.respond(request, response, build)
@@ -1,14 +1,27 @@
-from fastapi import APIRouter, WebSocket, WebSocketDisconnect, status, Query
-from sqlalchemy.orm import Session, sessionmaker
-from app.database import engine
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status, Query
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
 from app.models.message import Message
 from app.models.user import User
+from app.utils.rate_limit import enforce_limit
+from app.utils.structured_log import log_event
 from app.utils.websocket import connection_manager
+from app.utils.unread import unread_counter
 from datetime import datetime, timezone
+import itertools
 import json
+import logging
+import time
 
 router = APIRouter(prefix="/ws", tags=["websocket"])
 
+logger = logging.getLogger(__name__)
+_connection_ids = itertools.count(1)
+
+def _ms(since: float) -> float:
+    return round((time.perf_counter() - since) * 1000, 2)
+
 @router.websocket("/chat/{other_user_id}")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -16,7 +29,8 @@ async def websocket_endpoint(
     token: str = Query(...)
 ):
     
-    SessionLocal = sessionmaker(bind=engine)
+    opened = time.perf_counter()
+    connection_id = next(_connection_ids)
     db = SessionLocal()
     
     from app.utils.auth import decode_access_token
@@ -32,33 +46,45 @@ async def websocket_endpoint(
             db.close()
             return
     except Exception as e:
-        print(f"Token decode error: {e}")
+        log_event(logger, "ws.auth_failed", logging.WARNING, connection_id=connection_id, error=type(e).__name__)
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         db.close()
         return
     
     other_user = db.query(User).filter(User.id == other_user_id).first()
     if not other_user:
-        print(f"Other user {other_user_id} not found")
+        log_event(logger, "ws.peer_not_found", logging.WARNING, connection_id=connection_id,
+                  user_id=current_user_id, peer_id=other_user_id)
         await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
         db.close()
         return
     
-    print(f"User {current_user_id} connecting to chat with user {other_user_id}")
-    
     await connection_manager.connect(current_user_id, websocket)
+    connected = time.perf_counter()
+    messages = 0
+    log_event(logger, "ws.connect", connection_id=connection_id, user_id=current_user_id,
+              peer_id=other_user_id, connect_ms=_ms(opened))
     
     try:
         while True:
             data = await websocket.receive_text()
+            received = time.perf_counter()
+            # Same "message" budget as POST /messages/, counted per frame.
+            try:
+                enforce_limit("message", f"user:{current_user_id}")
+            except HTTPException as e:
+                await websocket.send_json({
+                    "type": "error",
+                    "detail": e.detail,
+                    "retry_after": int(e.headers["Retry-After"])
+                })
+                continue
             message_data = json.loads(data)
             content = message_data.get("content", "").strip()
             
             if not content:
                 continue
             
-            print(f"Message from {current_user_id} to {other_user_id}: {content}")
-            
             message = Message(
                 sender_id=current_user_id,
                 recipient_id=other_user_id,
@@ -69,8 +95,8 @@ async def websocket_endpoint(
             db.add(message)
             db.commit()
             db.refresh(message)
-            
-            print(f"Message saved to DB with ID {message.id}")
+            unread_counter.increment(message.recipient_id)
+            stored = time.perf_counter()
             
             response = {
                 "type": "message",
@@ -82,17 +108,34 @@ async def websocket_endpoint(
                 "id": message.id
             }
             
-            await connection_manager.broadcast_to_users(
+            delivered = await connection_manager.broadcast_to_users(
                 current_user_id,
                 other_user_id,
                 response
             )
+            messages += 1
+            log_event(
+                logger,
+                "ws.message",
+                sample_rate=settings.ws_message_log_sample_rate,
+                connection_id=connection_id,
+                user_id=current_user_id,
+                peer_id=other_user_id,
+                message_id=message.id,
+                length=len(content),
+                store_ms=round((stored - received) * 1000, 2),
+                fanout_ms=_ms(stored),
+                total_ms=_ms(received),
+                delivered=delivered,
+            )
             
-    except WebSocketDisconnect:
-        print(f"User {current_user_id} disconnected")
+    except WebSocketDisconnect as e:
+        log_event(logger, "ws.disconnect", connection_id=connection_id, user_id=current_user_id,
+                  code=e.code, messages=messages, duration_ms=_ms(connected))
         connection_manager.disconnect(current_user_id)
-    except Exception as e:
-        print(f"WebSocket error: {e}")
+    except Exception:
+        log_event(logger, "ws.error", logging.ERROR, exc_info=True, connection_id=connection_id,
+                  user_id=current_user_id, messages=messages, duration_ms=_ms(connected))
         connection_manager.disconnect(current_user_id)
         try:
             await websocket.close(code=status.WS_1011_SERVER_ERROR)
@@ -4,6 +4,7 @@ from pydantic import BaseModel, ConfigDict
 
 class CommentCreate(BaseModel):
     content: str
+    parent_id: int | None = None
 
 class CommentUpdate(BaseModel):
     content: str | None = None
@@ -13,6 +14,22 @@ class CommentOut(BaseModel):
     content: str
     post_id: int
     owner_id: int
+    parent_id: int | None = None
+    depth: int = 0
+    reply_count: int = 0
     created_at: datetime
+    updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+class CommentWithScoreOut(CommentOut):
+    upvotes: int = 0
+    downvotes: int = 0
+    score: int = 0
+
+class CommentChangesOut(BaseModel):
+    changes: list[CommentOut]
+    deleted: list[int]
+    version: int
+    has_more: bool
@@ -1,4 +1,5 @@
 from datetime import datetime
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict
 
@@ -21,6 +22,18 @@ class CommunityOut(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+class CommunityDeletionOut(BaseModel):
+    community_id: int
+    status: Literal["running", "done", "failed"]
+    posts_deleted: int
+    members_deleted: int
+    started_at: datetime
+    finished_at: datetime | None
+    error: str | None
+
+    model_config = ConfigDict(from_attributes=True)
+
+
 class MemberOut(BaseModel):
     user_id: int
     username: str
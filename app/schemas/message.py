@@ -12,5 +12,20 @@ class MessageOut(BaseModel):
     content: str
     created_at: datetime
     is_read: bool
+    updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+class MessageChangesOut(BaseModel):
+    changes: list[MessageOut]
+    deleted: list[int]
+    version: int
+    has_more: bool
+
+class BulkReadOut(BaseModel):
+    up_to_id: int
+    updated: int
+
+class UnreadCountOut(BaseModel):
+    unread: int
@@ -19,5 +19,13 @@ class PostOut(PostBase):
     display_name: str
     files: list[FileOut] = []
     created_at: datetime
+    updated_at: datetime
+    version: int
 
     model_config = ConfigDict(from_attributes=True)
+
+class PostChangesOut(BaseModel):
+    changes: list[PostOut]
+    deleted: list[int]
+    version: int
+    has_more: bool
@@ -19,3 +19,20 @@ class ReportOut(BaseModel):
     created_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
+
+class ReportQueueItemOut(BaseModel):
+    post_id: int | None
+    comment_id: int | None
+    report_count: int
+    first_reported_at: datetime
+    last_reported_at: datetime
+
+class BulkReviewRequest(BaseModel):
+    new_status: ReportStatus
+    current_status: ReportStatus = ReportStatus.PENDING
+    report_ids: list[int] | None = None
+    post_id: int | None = None
+    comment_id: int | None = None
+
+class BulkReviewOut(BaseModel):
+    updated: int
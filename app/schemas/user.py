@@ -31,3 +31,7 @@ class LoginRequest(BaseModel):
 class LoginResponse(BaseModel):
     access_token: str
     token_type: str
+
+class PresenceOut(BaseModel):
+    user_id: int
+    online: bool
@@ -1,18 +1,24 @@
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from jose import jwt, JWTError
-from passlib.hash import argon2
-
 from app.config import settings
 
+# jose (with its cryptography backend) and passlib's argon2 handler are imported
+# on first use; together they are a large share of app.main's import time.
+
 def hash_password(password: str) -> str:
+	from passlib.hash import argon2
+
 	return argon2.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
+	from passlib.hash import argon2
+
 	return argon2.verify(plain_password, hashed_password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+	from jose import jwt
+
 	to_encode = data.copy()
 	expire = datetime.now(timezone.utc) + (expires_delta or timedelta(minutes=settings.jwt_access_token_expire_minutes))
 	to_encode.update({"exp": expire})
@@ -20,6 +26,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 	return encoded_jwt
 
 def decode_access_token(token: str) -> dict | None:
+	from jose import JWTError, jwt
+
 	try:
 		payload = jwt.decode(token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm])
 		return payload
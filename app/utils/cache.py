@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable
+
+class TTLCache:
+	# Bounded LRU with per-entry expiry. Lives in one worker's memory, so entries
+	# invalidated by another worker can stay visible here for up to ttl seconds.
+
+	def __init__(self, maxsize: int, ttl: float):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self.hits = 0
+		self.misses = 0
+		self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+		# Keys being loaded, each with a token that invalidation removes, so a
+		# value read before an invalidation is not stored after it.
+		self._loading: dict[Hashable, object] = {}
+		self._lock = Lock()
+
+	def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+		now = time.monotonic()
+		with self._lock:
+			entry = self._data.get(key)
+			if entry is not None and entry[0] > now:
+				self._data.move_to_end(key)
+				self.hits += 1
+				return entry[1]
+			self.misses += 1
+			token = self._loading[key] = object()
+
+		try:
+			value = loader()
+		except BaseException:
+			with self._lock:
+				if self._loading.get(key) is token:
+					del self._loading[key]
+			raise
+		with self._lock:
+			if self._loading.get(key) is token:
+				del self._loading[key]
+				self._store(key, value)
+		return value
+
+	def set(self, key: Hashable, value: Any):
+		with self._lock:
+			self._loading.pop(key, None)
+			self._store(key, value)
+
+	def _store(self, key: Hashable, value: Any):
+		self._data[key] = (time.monotonic() + self.ttl, value)
+		self._data.move_to_end(key)
+		while len(self._data) > self.maxsize:
+			self._data.popitem(last=False)
+
+	def invalidate(self, *keys: Hashable):
+		with self._lock:
+			for key in keys:
+				self._data.pop(key, None)
+				self._loading.pop(key, None)
+
+	def invalidate_where(self, predicate: Callable[[Hashable], bool]):
+		with self._lock:
+			for key in [key for key in self._data if predicate(key)]:
+				del self._data[key]
+			for key in [key for key in self._loading if predicate(key)]:
+				del self._loading[key]
+
+	def clear(self):
+		with self._lock:
+			self._data.clear()
+			self._loading.clear()
+
+	def stats(self) -> dict:
+		lookups = self.hits + self.misses
+		return {
+			"size": len(self._data),
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_rate": self.hits / lookups if lookups else 0.0,
+		}
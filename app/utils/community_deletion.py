@@ -0,0 +1,120 @@
+"""Delete a community and its rows in bounded batches.
+
+Posts and memberships are removed with set-based DELETEs of at most
+COMMUNITY_DELETE_BATCH_SIZE rows, each in its own short transaction together
+with the progress counters, so a big community never holds locks for long or
+gets loaded into the session. The community row goes last, together with
+anything created while the batches ran.
+
+Job state lives in the community_deletions table, so every worker can report
+it. Its row also marks the community as being deleted: joins and new posts are
+refused and member_count is left alone from then on. Captain checks use
+communities.captain_id rather than memberships, so a job that failed, or
+whose worker died (no progress for STALE_AFTER), can simply be started again.
+"""
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, delete, exists, or_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.community import Community, CommunityDeletion, CommunityMember, CommunityPost
+
+logger = logging.getLogger(__name__)
+
+STALE_AFTER = timedelta(minutes=5)
+
+def is_deleting(community_id: int):
+    return exists().where(CommunityDeletion.community_id == community_id)
+
+class CommunityDeletions:
+
+    def start(self, db: Session, community_id: int, requested_by: int) -> CommunityDeletion | None:
+        now = datetime.now(timezone.utc)
+        stmt = insert(CommunityDeletion).values(
+            community_id=community_id,
+            requested_by=requested_by,
+            status="running",
+            posts_deleted=0,
+            members_deleted=0,
+            started_at=now,
+            updated_at=now,
+        )
+        # Counters carry over from an earlier attempt: they count what is gone.
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CommunityDeletion.community_id],
+            set_={
+                "requested_by": requested_by,
+                "status": "running",
+                "started_at": now,
+                "updated_at": now,
+                "finished_at": None,
+                "error": None,
+            },
+            where=or_(
+                CommunityDeletion.status == "failed",
+                and_(CommunityDeletion.status == "running", CommunityDeletion.updated_at < now - STALE_AFTER),
+            ),
+        ).returning(CommunityDeletion)
+        job = db.scalars(stmt, execution_options={"populate_existing": True}).one_or_none()
+        db.commit()
+        return job
+
+    def get(self, db: Session, community_id: int) -> CommunityDeletion | None:
+        return db.get(CommunityDeletion, community_id)
+
+    @staticmethod
+    def _progress(community_id: int, **values):
+        return update(CommunityDeletion).where(CommunityDeletion.community_id == community_id).values(
+            updated_at=datetime.now(timezone.utc), **values
+        )
+
+    def run(self, community_id: int, session_factory: sessionmaker, batch_size: int):
+        db = session_factory()
+        try:
+            for model, field in ((CommunityPost, "posts_deleted"), (CommunityMember, "members_deleted")):
+                counter = getattr(CommunityDeletion, field)
+                while True:
+                    batch = (
+                        select(model.id)
+                        .where(model.community_id == community_id)
+                        .limit(batch_size)
+                        .scalar_subquery()
+                    )
+                    deleted = db.execute(delete(model).where(model.id.in_(batch))).rowcount
+                    if deleted:
+                        db.execute(self._progress(community_id, **{field: counter + deleted}))
+                    db.commit()
+                    if not deleted:
+                        break
+
+            posts = db.execute(delete(CommunityPost).where(CommunityPost.community_id == community_id)).rowcount
+            members = db.execute(delete(CommunityMember).where(CommunityMember.community_id == community_id)).rowcount
+            db.execute(delete(Community).where(Community.id == community_id))
+            db.execute(self._progress(
+                community_id,
+                posts_deleted=CommunityDeletion.posts_deleted + posts,
+                members_deleted=CommunityDeletion.members_deleted + members,
+                status="done",
+                finished_at=datetime.now(timezone.utc),
+            ))
+            db.commit()
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Deleting community %s failed", community_id)
+            try:
+                db.execute(self._progress(
+                    community_id, status="failed", error=str(exc), finished_at=datetime.now(timezone.utc)
+                ))
+                db.commit()
+            except Exception:
+                # Left "running"; it can be restarted once it goes stale.
+                db.rollback()
+                logger.exception("Recording the failed deletion of community %s failed", community_id)
+        finally:
+            db.close()
+
+community_deletions = CommunityDeletions()
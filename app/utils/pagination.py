@@ -0,0 +1,14 @@
+import base64
+import json
+
+def encode_cursor(values: list) -> str:
+	raw = json.dumps(values, separators=(",", ":")).encode()
+	return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list | None:
+	try:
+		raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+		values = json.loads(raw)
+	except (ValueError, json.JSONDecodeError):
+		return None
+	return values if isinstance(values, list) else None
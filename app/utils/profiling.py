@@ -0,0 +1,143 @@
+"""Opt-in sampling profiler for individual requests.
+
+A request is profiled when it carries `X-Profile: <PROFILE_TOKEN>` or is picked
+at random with probability PROFILE_SAMPLE_RATE. While it runs, a background
+thread samples every thread's stack each PROFILE_INTERVAL_SECONDS. Sync
+endpoints and dependencies run in the threadpool, so Argon2, SQLAlchemy and
+the database driver show up next to validation and serialization on the
+event loop. Samples are added to PROFILE_DIR/<method>_<route>.collapsed in
+the folded format that flamegraph.pl and speedscope read.
+
+Only one request is profiled at a time, and samples from other requests
+running alongside it are included, so profile on a quiet worker when the
+picture has to be exact. The middleware is only installed when a token or a
+sample rate is configured; otherwise there is no cost at all.
+"""
+from __future__ import annotations
+
+import hmac
+import os
+import random
+import re
+import sys
+import sysconfig
+import threading
+from collections import Counter
+
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+
+from app.config import settings
+
+# Leaf frames of threads that are parked rather than working.
+IDLE_FRAMES = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+}
+
+class SamplingProfiler:
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._stacks: Counter[str] = Counter()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> bool:
+        with self._lock:
+            if self._thread is not None:
+                return False
+            self._stacks = Counter()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+            self._thread.start()
+            return True
+
+    def stop(self) -> Counter[str]:
+        self._stop.set()
+        self._thread.join()
+        with self._lock:
+            self._thread = None
+            return self._stacks
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = _collapse(frame)
+                if stack:
+                    self._stacks[stack] += 1
+
+def _collapse(frame) -> str | None:
+    code = frame.f_code
+    if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+        return None
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+_PROJECT_ROOT = os.getcwd() + os.sep
+_STDLIB = sysconfig.get_paths()["stdlib"] + os.sep
+_SITE_PACKAGES = "site-packages" + os.sep
+
+def _short_path(filename: str) -> str:
+    for prefix in (_PROJECT_ROOT, _STDLIB):
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    _, found, rest = filename.partition(_SITE_PACKAGES)
+    return rest if found else filename
+
+def profile_path(directory: str, method: str, route: str) -> str:
+    name = re.sub(r"[^A-Za-z0-9]+", "_", f"{method}{route}").strip("_")
+    return os.path.join(directory, f"{name}.collapsed")
+
+_write_lock = threading.Lock()
+
+def save_profile(path: str, stacks: Counter[str]):
+    # Fold the new samples into what this route has collected so far.
+    with _write_lock:
+        merged = Counter()
+        if os.path.exists(path):
+            with open(path) as handle:
+                for line in handle:
+                    stack, _, count = line.rstrip("\n").rpartition(" ")
+                    merged[stack] += int(count)
+        merged.update(stacks)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as handle:
+            for stack, count in merged.most_common():
+                handle.write(f"{stack} {count}\n")
+
+profiler = SamplingProfiler(settings.profile_interval_seconds)
+
+def profiling_enabled() -> bool:
+    return bool(settings.profile_token) or settings.profile_sample_rate > 0
+
+def wants_profile(request: Request) -> bool:
+    token = request.headers.get("x-profile")
+    if token is not None and settings.profile_token:
+        return hmac.compare_digest(token.encode(), settings.profile_token.encode())
+    return settings.profile_sample_rate > 0 and random.random() < settings.profile_sample_rate
+
+async def profile_requests(request: Request, call_next):
+    if not wants_profile(request) or not profiler.start():
+        return await call_next(request)
+    try:
+        response = await call_next(request)
+    finally:
+        # Joining the sampler and rewriting the file both block; keep them off
+        # the event loop.
+        stacks = await run_in_threadpool(profiler.stop)
+    route = request.scope.get("route")
+    path = profile_path(settings.profile_dir, request.method, getattr(route, "path", "unmatched"))
+    await run_in_threadpool(save_profile, path, stacks)
+    response.headers["X-Profile-Samples"] = str(sum(stacks.values()))
+    return response
@@ -0,0 +1,142 @@
+"""Per-route statement statistics and a slow-query log.
+
+Every statement an engine runs is reduced to a fingerprint (literals and bind
+parameters become `?`, IN lists become `(...)`) and counted against the route
+that issued it: executions, total and max time, and the most executions of
+that fingerprint within a single request. A fingerprint that runs dozens of
+times per request is an N+1 even when each execution is fast. Statements
+slower than SLOW_QUERY_MS are also logged.
+
+The route comes from track_request_queries, an app-wide dependency, so
+statements issued by dependencies and background tasks count against the
+route too; anything outside a request is reported under "-". The numbers live
+in this worker's memory, since it started or was last reset.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from threading import Lock
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.requests import HTTPConnection
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_COMMENTS = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_LITERALS = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|%s|\$\d+|\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACES = re.compile(r"\s+")
+
+_fingerprints: dict[str, str] = {}
+
+def fingerprint(statement: str) -> str:
+    # The same compiled statement strings come back over and over.
+    cached = _fingerprints.get(statement)
+    if cached is not None:
+        return cached
+    normalized = _COMMENTS.sub(" ", statement)
+    normalized = _LITERALS.sub("?", normalized)
+    normalized = _LISTS.sub("(...)", normalized)
+    normalized = _SPACES.sub(" ", normalized).strip()
+    if len(_fingerprints) >= settings.query_stats_maxsize:
+        _fingerprints.clear()
+    _fingerprints[statement] = normalized
+    return normalized
+
+@dataclass
+class QueryStat:
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    max_per_request: int = 0
+    slow: int = 0
+
+@dataclass
+class RequestQueries:
+    route: str
+    counts: dict[str, int] = field(default_factory=dict)
+
+_request_queries: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+
+class QueryStats:
+
+    def __init__(self, maxsize: int, slow_ms: float):
+        self.maxsize = maxsize
+        self.slow_ms = slow_ms
+        self._stats: dict[tuple[str, str], QueryStat] = {}
+        self._lock = Lock()
+
+    def record(self, statement: str, elapsed_ms: float):
+        query = fingerprint(statement)
+        current = _request_queries.get()
+        route = current.route if current else "-"
+        per_request = 1
+        if current is not None:
+            per_request = current.counts.get(query, 0) + 1
+            current.counts[query] = per_request
+
+        slow = elapsed_ms >= self.slow_ms
+        with self._lock:
+            stat = self._stats.get((route, query))
+            if stat is None:
+                if len(self._stats) >= self.maxsize:
+                    stat = QueryStat()
+                else:
+                    stat = self._stats[(route, query)] = QueryStat()
+            stat.count += 1
+            stat.total_ms += elapsed_ms
+            stat.max_ms = max(stat.max_ms, elapsed_ms)
+            stat.max_per_request = max(stat.max_per_request, per_request)
+            stat.slow += slow
+        if slow:
+            logger.warning("Slow query (%.1f ms) on %s: %s", elapsed_ms, route, query)
+
+    def top(self, limit: int, sort: str) -> list[dict]:
+        with self._lock:
+            rows = [
+                {
+                    "route": route,
+                    "fingerprint": query,
+                    "count": stat.count,
+                    "total_ms": round(stat.total_ms, 2),
+                    "mean_ms": round(stat.total_ms / stat.count, 2),
+                    "max_ms": round(stat.max_ms, 2),
+                    "max_per_request": stat.max_per_request,
+                    "slow": stat.slow,
+                }
+                for (route, query), stat in self._stats.items()
+            ]
+        rows.sort(key=lambda row: row[sort], reverse=True)
+        return rows[:limit]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+query_stats = QueryStats(settings.query_stats_maxsize, settings.slow_query_ms)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        query_stats.record(statement, (time.perf_counter() - started) * 1000)
+
+def install(engine: Engine):
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+async def track_request_queries(connection: HTTPConnection):
+    # Async, so the context variable is set in the request's own context and
+    # is copied into the threadpool for the sync dependencies and endpoint.
+    route = connection.scope.get("route")
+    method = connection.scope.get("method", "WS")
+    _request_queries.set(RequestQueries(route=f"{method} {getattr(route, 'path', connection.url.path)}"))
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import math
+import sqlite3
+import time
+from collections import deque
+from threading import Lock
+
+from fastapi import Depends, HTTPException, Request, status
+
+from app.config import parse_limits, settings
+
+class MemoryWindowStore:
+
+	def __init__(self, prune_every: int = 10000):
+		self._hits: dict[str, deque[float]] = {}
+		self._prune_every = prune_every
+		self._adds = 0
+		self._lock = Lock()
+
+	def add_hit(self, key: str, now: float, window: float, limit: int) -> float | None:
+		with self._lock:
+			self._adds += 1
+			if self._adds % self._prune_every == 0:
+				# Keys whose newest hit has left the window are as good as missing.
+				for stale in [k for k, hits in self._hits.items() if hits[-1] <= now - window]:
+					del self._hits[stale]
+
+			hits = self._hits.setdefault(key, deque())
+			while hits and hits[0] <= now - window:
+				hits.popleft()
+			if len(hits) >= limit:
+				return hits[0] + window - now
+			hits.append(now)
+			return None
+
+class SQLiteWindowStore:
+	# Local stand-in for a shared store such as Redis: every worker on the host
+	# opens the same file, and BEGIN IMMEDIATE serializes the check-and-add.
+
+	def __init__(self, path: str):
+		self.path = path
+		with self._connect() as conn:
+			conn.execute("CREATE TABLE IF NOT EXISTS rate_limit_hits (key TEXT NOT NULL, ts REAL NOT NULL)")
+			conn.execute("CREATE INDEX IF NOT EXISTS ix_rate_limit_hits_key_ts ON rate_limit_hits (key, ts)")
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+	def add_hit(self, key: str, now: float, window: float, limit: int) -> float | None:
+		conn = self._connect()
+		try:
+			conn.execute("BEGIN IMMEDIATE")
+			conn.execute("DELETE FROM rate_limit_hits WHERE key = ? AND ts <= ?", (key, now - window))
+			count, oldest = conn.execute(
+				"SELECT COUNT(*), MIN(ts) FROM rate_limit_hits WHERE key = ?", (key,)
+			).fetchone()
+			if count >= limit:
+				conn.execute("COMMIT")
+				return oldest + window - now
+			conn.execute("INSERT INTO rate_limit_hits (key, ts) VALUES (?, ?)", (key, now))
+			conn.execute("COMMIT")
+			return None
+		finally:
+			conn.close()
+
+def create_store(path: str | None = None) -> MemoryWindowStore | SQLiteWindowStore:
+	return SQLiteWindowStore(path) if path else MemoryWindowStore()
+
+class SlidingWindowLimiter:
+
+	def __init__(self, limit: int, window_seconds: float, store: MemoryWindowStore | SQLiteWindowStore | None = None):
+		self.limit = limit
+		self.window_seconds = window_seconds
+		self.store = store or MemoryWindowStore()
+
+	def hit(self, key: str) -> float | None:
+		return self.store.add_hit(key, time.time(), self.window_seconds, self.limit)
+
+class MemoryBucketStore:
+
+	def __init__(self, prune_every: int = 10000):
+		# key -> (tokens, updated, full_at); a bucket past full_at has refilled
+		# completely and is indistinguishable from a missing one.
+		self._buckets: dict[str, tuple[float, float, float]] = {}
+		self._prune_every = prune_every
+		self._takes = 0
+		self._lock = Lock()
+
+	def take(self, key: str, now: float, capacity: int, refill_per_second: float) -> float | None:
+		with self._lock:
+			tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+			tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+			retry_after = None
+			if tokens < 1:
+				retry_after = (1 - tokens) / refill_per_second
+			else:
+				tokens -= 1
+			self._buckets[key] = (tokens, now, now + (capacity - tokens) / refill_per_second)
+
+			self._takes += 1
+			if self._takes % self._prune_every == 0:
+				for stale in [k for k, (_, _, full_at) in self._buckets.items() if full_at <= now]:
+					del self._buckets[stale]
+			return retry_after
+
+class SQLiteBucketStore:
+	# Same shared-file stand-in as SQLiteWindowStore, one row per bucket.
+
+	def __init__(self, path: str, prune_every: int = 1000):
+		self.path = path
+		self._prune_every = prune_every
+		self._takes = 0
+		with self._connect() as conn:
+			conn.execute(
+				"CREATE TABLE IF NOT EXISTS rate_limit_buckets "
+				"(key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL, full_at REAL NOT NULL)"
+			)
+
+	def _connect(self) -> sqlite3.Connection:
+		return sqlite3.connect(self.path, timeout=5, isolation_level=None)
+
+	def take(self, key: str, now: float, capacity: int, refill_per_second: float) -> float | None:
+		self._takes += 1
+		conn = self._connect()
+		try:
+			conn.execute("BEGIN IMMEDIATE")
+			row = conn.execute("SELECT tokens, updated FROM rate_limit_buckets WHERE key = ?", (key,)).fetchone()
+			tokens, updated = row if row else (capacity, now)
+			tokens = min(capacity, tokens + (now - updated) * refill_per_second)
+			retry_after = None
+			if tokens < 1:
+				retry_after = (1 - tokens) / refill_per_second
+			else:
+				tokens -= 1
+			conn.execute(
+				"INSERT INTO rate_limit_buckets (key, tokens, updated, full_at) VALUES (?, ?, ?, ?) "
+				"ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated, "
+				"full_at = excluded.full_at",
+				(key, tokens, now, now + (capacity - tokens) / refill_per_second),
+			)
+			if self._takes % self._prune_every == 0:
+				conn.execute("DELETE FROM rate_limit_buckets WHERE full_at <= ?", (now,))
+			conn.execute("COMMIT")
+			return retry_after
+		finally:
+			conn.close()
+
+def create_bucket_store(path: str | None = None) -> MemoryBucketStore | SQLiteBucketStore:
+	return SQLiteBucketStore(path) if path else MemoryBucketStore()
+
+class TokenBucketLimiter:
+
+	def __init__(self, store: MemoryBucketStore | SQLiteBucketStore | None = None):
+		self.store = store or MemoryBucketStore()
+
+	def hit(self, key: str, capacity: int, period_seconds: float) -> float | None:
+		return self.store.take(key, time.time(), capacity, capacity / period_seconds)
+
+request_limiter = TokenBucketLimiter(create_bucket_store(settings.rate_limit_store_path))
+
+def enforce_limit(scope: str, key: str):
+	limit = parse_limits(settings.rate_limits).get(scope)
+	if limit is None:
+		return
+	retry_after = request_limiter.hit(f"{scope}:{key}", *limit)
+	if retry_after is not None:
+		raise HTTPException(
+			status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+			detail="Too many requests, slow down",
+			headers={"Retry-After": str(math.ceil(retry_after))}
+		)
+
+def limit_per_ip(scope: str):
+	def check(request: Request):
+		enforce_limit(scope, f"ip:{request.client.host if request.client else 'unknown'}")
+	return check
+
+def limit_per_user(scope: str):
+	# Shares get_current_user_id with the endpoint's own auth dependency, so
+	# the token is only decoded once per request. Imported here because the
+	# auth router itself depends on this module.
+	from app.routers.auth import get_current_user_id
+
+	def check(user_id: int = Depends(get_current_user_id)):
+		enforce_limit(scope, f"user:{user_id}")
+	return check
@@ -0,0 +1,173 @@
+"""Route read-only requests to Postgres read replicas.
+
+READ_REPLICA_URLS is a comma-separated list of SQLAlchemy URLs. Routes that
+depend on get_read_db get a session on one of them (round robin), except when:
+
+- the caller wrote something through this worker in the last
+  READ_YOUR_WRITES_SECONDS, so they always see their own changes;
+- a replica is further than REPLICA_MAX_LAG_SECONDS behind, or unreachable.
+  A background thread samples lag every REPLICA_HEALTH_CHECK_SECONDS, with
+  connects and the probe bounded by REPLICA_TIMEOUT_SECONDS; requests only
+  read its last result, and a replica counts as unhealthy until first probed.
+
+In both cases, and when no replicas are configured, reads go to the primary.
+Stickiness is tracked per worker: a write served by another worker is only
+covered once replication catches up.
+"""
+import itertools
+import logging
+import math
+import threading
+import time
+from threading import Lock
+
+from fastapi import Request
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import settings
+from app.database import SessionLocal, get_engine
+from app.utils import query_stats
+
+logger = logging.getLogger(__name__)
+
+LAG_QUERY = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+
+STICKY_PRUNE_THRESHOLD = 10000
+
+class ReplicaRouter:
+
+    def __init__(
+        self,
+        urls: list[str],
+        max_lag_seconds: float,
+        sticky_seconds: float,
+        health_check_seconds: float,
+        timeout_seconds: float = 2,
+    ):
+        self.urls = urls
+        self.max_lag_seconds = max_lag_seconds
+        self.sticky_seconds = sticky_seconds
+        self.health_check_seconds = health_check_seconds
+        self.timeout_seconds = timeout_seconds
+        self._engines: list[Engine] | None = None
+        self._lags = [float("inf")] * len(urls)
+        self._sticky_until: dict[int, float] = {}
+        self._turn = itertools.count()
+        self._lock = Lock()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.urls)
+
+    def engines(self) -> list[Engine]:
+        with self._lock:
+            if self._engines is None:
+                # libpq takes whole seconds; an unreachable replica must not
+                # hang the connect for the OS default.
+                self._engines = [
+                    create_engine(
+                        url,
+                        pool_pre_ping=True,
+                        connect_args={"connect_timeout": max(1, math.ceil(self.timeout_seconds))},
+                    )
+                    for url in self.urls
+                ]
+                for engine in self._engines:
+                    query_stats.install(engine)
+            return self._engines
+
+    def mark_write(self, user_id: int):
+        now = time.monotonic()
+        with self._lock:
+            self._sticky_until[user_id] = now + self.sticky_seconds
+            if len(self._sticky_until) > STICKY_PRUNE_THRESHOLD:
+                self._sticky_until = {uid: until for uid, until in self._sticky_until.items() if until > now}
+
+    def is_sticky(self, user_id: int | None) -> bool:
+        return user_id is not None and self._sticky_until.get(user_id, 0) > time.monotonic()
+
+    def lag_seconds(self, engine: Engine) -> float:
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(f"SET LOCAL statement_timeout = {int(self.timeout_seconds * 1000)}"))
+                return float(connection.execute(LAG_QUERY).scalar())
+        except SQLAlchemyError:
+            return float("inf")
+
+    def probe(self):
+        self._lags = [self.lag_seconds(engine) for engine in self.engines()]
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                self.probe()
+            except Exception:
+                logger.exception("Probing read replicas failed")
+            self._stopped.wait(self.health_check_seconds)
+
+    def start(self):
+        if self.enabled and self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="replica-probe", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopped.set()
+            self._thread.join()
+            self._thread = None
+
+    def engine_for(self, user_id: int | None) -> Engine:
+        if not self.enabled or self.is_sticky(user_id):
+            return get_engine()
+        lags = self._lags
+        healthy = [engine for engine, lag in zip(self.engines(), lags) if lag <= self.max_lag_seconds]
+        if not healthy:
+            return get_engine()
+        return healthy[next(self._turn) % len(healthy)]
+
+replica_router = ReplicaRouter(
+    [url.strip() for url in settings.read_replica_urls.split(",") if url.strip()],
+    settings.replica_max_lag_seconds,
+    settings.read_your_writes_seconds,
+    settings.replica_health_check_seconds,
+    settings.replica_timeout_seconds,
+)
+
+def request_user_id(request: Request) -> int | None:
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    from app.utils.auth import decode_access_token
+
+    payload = decode_access_token(token)
+    try:
+        return int(payload["sub"]) if payload else None
+    except (KeyError, TypeError, ValueError):
+        return None
+
+async def track_replica_writes(request: Request, call_next):
+    response = await call_next(request)
+    if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+        user_id = request_user_id(request)
+        if user_id is not None:
+            replica_router.mark_write(user_id)
+    return response
+
+def get_read_db(request: Request):
+    user_id = request_user_id(request) if replica_router.enabled else None
+    db = SessionLocal(bind=replica_router.engine_for(user_id))
+    try:
+        yield db
+    finally:
+        db.close()
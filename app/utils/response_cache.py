@@ -0,0 +1,186 @@
+"""Cache serialized JSON for public read endpoints, with ETags.
+
+Handlers pass respond() a builder that returns the response content and the
+tags it depends on, e.g. ("post", 7). The serialized body is kept per path and
+query string together with a strong ETag, so a repeat hit skips the database
+and serialization, and a matching If-None-Match gets a 304.
+
+When the content is fully described by one versioned row, the handler also
+passes a version() lookup and the ETag is that row's version: on a miss, a
+matching If-None-Match is answered from the single-column lookup without
+building the body. Other responses use a hash of the body.
+
+Write handlers call invalidate() with the tags they touched. The cache lives in
+this worker's memory: another worker's writes become visible here within
+RESPONSE_CACHE_TTL_SECONDS at most. Users within their read-your-writes window
+bypass the cache, and with read replicas a body is not stored while one of its
+tags was invalidated less than REPLICA_MAX_LAG_SECONDS ago, since the replica
+it was read from may not have the write yet.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Hashable, Iterable
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.config import settings
+from app.utils.replicas import replica_router, request_user_id
+
+@dataclass(frozen=True)
+class CachedResponse:
+	etag: str
+	body: bytes
+	headers: dict[str, str]
+	tags: frozenset[Hashable]
+	expires_at: float
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+	if not if_none_match:
+		return False
+	candidates = [tag.strip() for tag in if_none_match.split(",")]
+	return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+class ResponseCache:
+
+	def __init__(self, maxsize: int, ttl: float, max_age: int, settle_seconds: float = 0):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self.settle_seconds = settle_seconds
+		self.cache_control = f"public, max-age={max_age}, must-revalidate"
+		self.hits = 0
+		self.misses = 0
+		self._entries: OrderedDict[Hashable, CachedResponse] = OrderedDict()
+		self._keys_by_tag: dict[Hashable, set[Hashable]] = {}
+		# Sequence number and time of the latest invalidation per tag, for the
+		# most recent maxsize tags; anything older is only known to precede
+		# _forgotten_before.
+		self._sequence = 0
+		self._invalidated_at: OrderedDict[Hashable, tuple[int, float]] = OrderedDict()
+		self._forgotten_before = (0, float("-inf"))
+		self._lock = Lock()
+
+	def respond(
+		self,
+		request: Request,
+		response: Response,
+		build: Callable[[], tuple[Any, Iterable[Hashable]]],
+		version: Callable[[], int | None] | None = None,
+	) -> Response:
+		key = (request.url.path, request.url.query)
+		if_none_match = request.headers.get("if-none-match")
+		bypass = replica_router.enabled and replica_router.is_sticky(request_user_id(request))
+		entry = None if bypass else self._get(key)
+		if entry is None:
+			etag = None
+			if version is not None:
+				# Read before building, so the ETag is never newer than the body.
+				current = version()
+				if current is not None:
+					etag = f'"v{current}"'
+					if etag_matches(if_none_match, etag):
+						return Response(status_code=304, headers=self._headers(dict(response.headers), etag))
+			started = self._sequence
+			content, tags = build()
+			body = JSONResponse(jsonable_encoder(content)).body
+			entry = CachedResponse(
+				etag=etag or f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+				body=body,
+				headers=dict(response.headers),
+				tags=frozenset(tags),
+				expires_at=time.monotonic() + self.ttl,
+			)
+			if not bypass:
+				self._put(key, entry, started)
+
+		headers = self._headers(entry.headers, entry.etag)
+		if etag_matches(if_none_match, entry.etag):
+			return Response(status_code=304, headers=headers)
+		return Response(entry.body, media_type="application/json", headers=headers)
+
+	def _headers(self, headers: dict[str, str], etag: str) -> dict[str, str]:
+		return {**headers, "ETag": etag, "Cache-Control": self.cache_control}
+
+	def invalidate(self, *tags: Hashable):
+		with self._lock:
+			self._sequence += 1
+			now = time.monotonic()
+			for tag in tags:
+				self._invalidated_at[tag] = (self._sequence, now)
+				self._invalidated_at.move_to_end(tag)
+				for key in self._keys_by_tag.pop(tag, ()):
+					self._remove(key)
+			while len(self._invalidated_at) > self.maxsize:
+				_, self._forgotten_before = self._invalidated_at.popitem(last=False)
+
+	def clear(self):
+		with self._lock:
+			self._sequence += 1
+			self._forgotten_before = (self._sequence, time.monotonic())
+			self._invalidated_at.clear()
+			self._entries.clear()
+			self._keys_by_tag.clear()
+
+	def stats(self) -> dict:
+		lookups = self.hits + self.misses
+		return {
+			"size": len(self._entries),
+			"hits": self.hits,
+			"misses": self.misses,
+			"hit_rate": self.hits / lookups if lookups else 0.0,
+		}
+
+	def _get(self, key: Hashable) -> CachedResponse | None:
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None and entry.expires_at > time.monotonic():
+				self._entries.move_to_end(key)
+				self.hits += 1
+				return entry
+			if entry is not None:
+				self._remove(key)
+			self.misses += 1
+			return None
+
+	def _put(self, key: Hashable, entry: CachedResponse, started: int):
+		with self._lock:
+			# One of its tags was invalidated while the builder ran, or so recently
+			# that a replica may still lack the write, so the content may already
+			# be stale; serve it this once but don't keep it.
+			settled_before = time.monotonic() - self.settle_seconds
+			invalidations = [self._invalidated_at.get(tag, (0, float("-inf"))) for tag in entry.tags]
+			if any(
+				sequence > started or (self.settle_seconds and at > settled_before)
+				for sequence, at in invalidations + [self._forgotten_before]
+			):
+				return
+			self._remove(key)
+			self._entries[key] = entry
+			for tag in entry.tags:
+				self._keys_by_tag.setdefault(tag, set()).add(key)
+			while len(self._entries) > self.maxsize:
+				self._remove(next(iter(self._entries)))
+
+	def _remove(self, key: Hashable):
+		entry = self._entries.pop(key, None)
+		if entry is None:
+			return
+		for tag in entry.tags:
+			keys = self._keys_by_tag.get(tag)
+			if keys is not None:
+				keys.discard(key)
+				if not keys:
+					del self._keys_by_tag[tag]
+
+response_cache = ResponseCache(
+	settings.response_cache_maxsize,
+	settings.response_cache_ttl_seconds,
+	settings.response_cache_max_age_seconds,
+	settings.replica_max_lag_seconds if replica_router.enabled else 0,
+)
@@ -0,0 +1,29 @@
+from sqlalchemy import text
+from sqlalchemy.exc import ProgrammingError
+from sqlalchemy.engine import Connection, Engine
+
+# Alembic head this code expects. Bump it together with every new migration;
+# tests/test_schema.py fails when the two drift apart. Keeping it as a constant
+# lets startup check the schema without importing Alembic or its scripts.
+SCHEMA_REVISION = "b5c6d7e8f9a0"
+
+class SchemaOutOfDate(RuntimeError):
+	pass
+
+def current_revisions(connection: Connection) -> set[str]:
+	try:
+		return set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+	except ProgrammingError:
+		connection.rollback()
+		return set()
+
+def verify_schema(engine: Engine):
+	# Startup only reads alembic_version; creating or upgrading tables is the
+	# job of `python -m app.commands.migrate`, run once per deploy.
+	with engine.connect() as connection:
+		current = current_revisions(connection)
+	if current != {SCHEMA_REVISION}:
+		raise SchemaOutOfDate(
+			f"Database schema is at {sorted(current) or 'no revision'}, expected {SCHEMA_REVISION}. "
+			"Run `python -m app.commands.migrate` first."
+		)
@@ -0,0 +1,134 @@
+"""JSON-lines logging that never blocks the request path.
+
+configure_logging() puts a QueueHandler on the "app" logger. Callers only
+build a record and drop it on a bounded queue; a background QueueListener
+thread turns it into one JSON object per line and writes it to stdout. If the
+writer falls behind and the queue is full, records are dropped and counted
+rather than stalling the event loop.
+
+Use log_event() for structured events. High-volume events (every chat
+message, every request) pass a sample_rate; the rate is written with the
+event so counts can be scaled back up.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
+
+from fastapi import Request
+
+from app.config import settings
+
+class JsonFormatter(logging.Formatter):
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if getattr(record, "sample_rate", 1.0) < 1.0:
+            entry["sample_rate"] = record.sample_rate
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+class DroppingQueueHandler(QueueHandler):
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Resolve the message and traceback now, while the arguments are still
+        # valid, but leave the JSON encoding to the writer thread.
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_listener: QueueListener | None = None
+_handler: DroppingQueueHandler | None = None
+
+def configure_logging(stream: TextIO | None = None):
+    global _listener, _handler
+    if _listener is not None:
+        return
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(JsonFormatter())
+    _handler = DroppingQueueHandler(queue.Queue(maxsize=settings.log_queue_size))
+    _listener = QueueListener(_handler.queue, writer, respect_handler_level=False)
+    _listener.start()
+
+    logger = logging.getLogger("app")
+    logger.setLevel(settings.log_level.upper())
+    logger.addHandler(_handler)
+    logger.propagate = False
+
+def shutdown_logging():
+    # Writes out whatever is still queued.
+    global _listener, _handler
+    if _listener is None:
+        return
+    logger = logging.getLogger("app")
+    logger.removeHandler(_handler)
+    logger.propagate = True
+    _listener.stop()
+    _listener = _handler = None
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler else 0
+
+def log_event(
+    logger: logging.Logger,
+    event: str,
+    level: int = logging.INFO,
+    sample_rate: float = 1.0,
+    exc_info: bool = False,
+    **fields,
+):
+    if sample_rate < 1.0 and random.random() >= sample_rate:
+        return
+    if logger.isEnabledFor(level):
+        logger.log(level, event, exc_info=exc_info, extra={"fields": fields, "sample_rate": sample_rate})
+
+access_logger = logging.getLogger("app.access")
+
+async def log_requests(request: Request, call_next):
+    started = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        log_event(
+            access_logger,
+            "request",
+            sample_rate=settings.access_log_sample_rate,
+            method=request.method,
+            route=getattr(route, "path", None),
+            path=request.url.path,
+            status=status_code,
+            duration_ms=round((time.perf_counter() - started) * 1000, 2),
+            client=request.client.host if request.client else None,
+        )
@@ -0,0 +1,101 @@
+"""Helpers for the "changes since" feeds.
+
+Every write to a versioned row stamps it with row_version(), the writing
+transaction's id, and hard deletes leave a tombstone in the deletions table
+stamped the same way. A feed returns everything above the client's last
+version, in version order, and the client passes the returned version back as
+`since`.
+
+A transaction's id is handed out before it commits, so a feed only returns
+versions below row_version_horizon(), the oldest transaction still running:
+anything a client has not seen yet is either still above `since` or not
+committed. A long-running transaction therefore holds every feed back until it
+ends. All writes of one transaction share a version, so a page never splits
+them.
+
+Tombstones are pruned after DELETION_RETENTION_DAYS by
+`python -m app.commands.prune_deletions`; a client whose cursor predates the
+pruned ones gets a 410 and has to sync again from 0.
+"""
+from typing import Iterable
+
+from fastapi import HTTPException, status
+from sqlalchemy import func, select
+from sqlalchemy.orm import Query, Session
+
+from app.models.sync import Deletion, DeletionRetention
+
+def record_deletions(db: Session, entity: str, ids: Iterable[int], scope_ids: Iterable[int | None] = (None,)):
+    scope_ids = list(scope_ids)
+    db.add_all(
+        Deletion(entity=entity, entity_id=entity_id, scope_id=scope_id)
+        for entity_id in ids
+        for scope_id in scope_ids
+    )
+
+def touch(db: Session, model, *criteria) -> int:
+    # Give matching rows a new version (and updated_at) without changing them,
+    # for writes to child rows that show up in the parent's representation.
+    return db.query(model).filter(*criteria).update(
+        {model.version: func.row_version()}, synchronize_session=False
+    )
+
+def _merge(rows: list, tombstones: list) -> list:
+    return sorted(
+        [(row.version, row) for row in rows] + [(version, entity_id) for version, entity_id in tombstones],
+        key=lambda item: item[0],
+    )
+
+def changes_since(
+    changed: Query,
+    deletions: Query,
+    model,
+    since: int,
+    limit: int,
+    is_deleted=lambda row: False,
+) -> tuple[list, list[int], int, bool]:
+    """Merge changed rows and tombstones above `since` into one page.
+
+    Returns (changed rows, deleted ids, version to resume from, has_more).
+    Rows for which is_deleted() is true, e.g. hidden ones, count as deleted.
+    """
+    # Read before the rows, so every transaction below the horizon has
+    # committed by the time they are queried.
+    horizon, pruned_through = changed.session.execute(
+        select(func.row_version_horizon(), select(DeletionRetention.pruned_through).scalar_subquery())
+    ).one()
+    if since and pruned_through is not None and since < pruned_through:
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="Changes this old are no longer available, sync again from 0"
+        )
+
+    changed = changed.filter(model.version > since, model.version < horizon)
+    deletions = deletions.filter(Deletion.version > since, Deletion.version < horizon).with_entities(
+        Deletion.version, Deletion.entity_id
+    )
+    merged = _merge(
+        changed.order_by(model.version).limit(limit + 1).all(),
+        deletions.order_by(Deletion.version).limit(limit + 1).all(),
+    )
+    page = merged[:limit]
+    has_more = len(merged) > limit
+    if has_more and merged[limit][0] == page[-1][0]:
+        # The page ends inside one transaction's writes: stop before them, or
+        # if they are all there is, return the whole transaction.
+        last = page[-1][0]
+        page = [item for item in page if item[0] != last] or _merge(
+            changed.filter(model.version == last).all(),
+            deletions.filter(Deletion.version == last).all(),
+        )
+
+    changes, deleted = [], []
+    for _, item in page:
+        if isinstance(item, int):
+            deleted.append(item)
+        elif is_deleted(item):
+            deleted.append(item.id)
+        else:
+            changes.append(item)
+    version = page[-1][0] if page else since
+    return changes, deleted, version, has_more
@@ -0,0 +1,60 @@
+import time
+from threading import Lock
+from typing import Callable
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.message import Message
+
+class UnreadCounter:
+    # Counts live in this worker's memory and are only a cache of the messages
+    # table. Sends and reads handled by this worker adjust them right away; a
+    # count that is missing or older than UNREAD_COUNT_TTL_SECONDS is reloaded
+    # from the database, so a change made through another worker shows up
+    # within that window.
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._counts: dict[int, tuple[int, float]] = {}
+        self._generations: dict[int, int] = {}
+        self._lock = Lock()
+
+    def _adjust(self, user_id: int, amount: int):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            cached = self._counts.get(user_id)
+            if cached is not None:
+                self._counts[user_id] = (max(cached[0] + amount, 0), cached[1])
+
+    def increment(self, user_id: int, amount: int = 1):
+        self._adjust(user_id, amount)
+
+    def decrement(self, user_id: int, amount: int = 1):
+        self._adjust(user_id, -amount)
+
+    def get(self, user_id: int, load: Callable[[int], int]) -> int:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._counts.get(user_id)
+            if cached is not None and now - cached[1] < self.ttl:
+                return cached[0]
+            generation = self._generations.get(user_id, 0)
+        count = load(user_id)
+        with self._lock:
+            # A send or read that landed while loading may or may not be in
+            # the count; leave it for the next call to load again.
+            if self._generations.get(user_id, 0) == generation:
+                self._counts[user_id] = (count, now)
+            else:
+                self._counts.pop(user_id, None)
+        return count
+
+def count_unread(db: Session, user_id: int) -> int:
+    return db.query(func.count(Message.id)).filter(
+        Message.recipient_id == user_id,
+        Message.is_read.is_(False)
+    ).scalar()
+
+unread_counter = UnreadCounter(settings.unread_count_ttl_seconds)
@@ -0,0 +1,195 @@
+"""Optional write-behind buffer for votes.
+
+When VOTE_BUFFER_ENABLED is set, the vote endpoints answer 202 right away and
+record the vote here. Repeat votes by the same user on the same target within
+one flush interval are coalesced (last one wins), and a background thread
+writes everything pending as one multi-row upsert per target kind.
+
+Durability: an accepted vote lives only in this worker's memory until the next
+flush (VOTE_BUFFER_FLUSH_SECONDS). A graceful shutdown flushes; a crash or
+SIGKILL loses at most the votes accepted since the last flush. Scores read from
+the database lag by up to one interval.
+
+A flush that fails is retried: if the database is unreachable the votes go back
+into the buffer for the next interval, and if one row breaks a constraint (its
+post, comment or user was deleted meanwhile) the batch is written row by row
+and only the offending votes are dropped. Once VOTE_BUFFER_MAX_PENDING votes
+are waiting, voting flushes in the request itself, and refuses with
+VoteBufferFull if that does not make room.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timezone
+
+from sqlalchemy import Integer, String, cast, column, select, values
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.comment import Comment
+from app.models.post import Post
+from app.models.vote import Vote, VoteType
+from app.utils.response_cache import response_cache
+
+logger = logging.getLogger(__name__)
+
+TARGETS = {
+    "post": (Vote.post_id, Post),
+    "comment": (Vote.comment_id, Comment),
+}
+
+SCORE_CACHE_TAGS = {"post": "post_score", "comment": "comment"}
+
+class VoteBufferFull(RuntimeError):
+    pass
+
+class VoteBuffer:
+
+    def __init__(self, session_factory: sessionmaker, flush_seconds: float = 0.5, max_pending: int = 10000):
+        self.session_factory = session_factory
+        self.flush_seconds = flush_seconds
+        self.max_pending = max_pending
+        self._pending: dict[tuple[str, int, int], tuple[VoteType, datetime]] = {}
+        self._lock = threading.Lock()
+        # Held for a whole flush, from taking the pending votes to commit.
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def add(self, kind: str, target_id: int, user_id: int, vote_type: VoteType):
+        key = (kind, target_id, user_id)
+        with self._lock:
+            full = len(self._pending) >= self.max_pending and key not in self._pending
+        if full:
+            # Make room by flushing in the caller's thread rather than letting
+            # the buffer grow while the database is slow or down.
+            self.flush()
+        with self._lock:
+            if len(self._pending) >= self.max_pending and key not in self._pending:
+                raise VoteBufferFull(f"{len(self._pending)} votes are waiting to be written")
+            self._pending[key] = (vote_type, datetime.now(timezone.utc))
+
+    def discard(self, kind: str, target_id: int, user_id: int) -> bool:
+        # Waits for a flush in progress, so a vote it already took is either
+        # committed and visible to the caller, or back in the buffer.
+        with self._flush_lock, self._lock:
+            return self._pending.pop((kind, target_id, user_id), None) is not None
+
+    def flush(self) -> int:
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            try:
+                written = self._write(pending)
+            except Exception:
+                self._requeue(pending)
+                logger.exception("Failed to flush %d buffered votes; they will be retried", len(pending))
+                return 0
+        response_cache.invalidate(*{(SCORE_CACHE_TAGS[kind], target_id) for kind, target_id, _ in written})
+        return len(written)
+
+    def _write(self, pending: dict) -> dict:
+        db: Session = self.session_factory()
+        try:
+            try:
+                self._write_batch(db, pending)
+                db.commit()
+                return pending
+            except IntegrityError:
+                db.rollback()
+            written = {}
+            for key, vote in pending.items():
+                try:
+                    with db.begin_nested():
+                        self._write_batch(db, {key: vote})
+                except IntegrityError:
+                    logger.warning("Dropped buffered vote on %s %d by user %d, which no longer exists", *key)
+                    continue
+                written[key] = vote
+            db.commit()
+            return written
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _write_batch(self, db: Session, pending: dict):
+        for kind, (target_column, target_model) in TARGETS.items():
+            rows = [
+                (target_id, user_id, vote_type.name, created_at)
+                for (row_kind, target_id, user_id), (vote_type, created_at) in pending.items()
+                if row_kind == kind
+            ]
+            if rows:
+                db.execute(self._upsert(target_column, target_model, rows))
+
+    def _requeue(self, pending: dict):
+        # Votes cast since the failed flush are newer and win.
+        with self._lock:
+            self._pending = {**pending, **self._pending}
+
+    @staticmethod
+    def _upsert(target_column, target_model, rows):
+        batch = values(
+            column("target_id", Integer),
+            column("user_id", Integer),
+            column("vote_type", String),
+            column("created_at", Vote.created_at.type),
+            name="batch",
+        ).data(rows)
+        # Joining the target table skips votes for posts/comments that no longer
+        # exist instead of failing the whole batch on a foreign key.
+        source = select(
+            batch.c.target_id,
+            batch.c.user_id,
+            cast(batch.c.vote_type, Vote.vote_type.type),
+            batch.c.created_at,
+        ).join(
+            target_model, target_model.id == batch.c.target_id
+        )
+        stmt = insert(Vote).from_select(
+            [target_column.key, "user_id", "vote_type", "created_at"], source
+        )
+        return stmt.on_conflict_do_update(
+            index_elements=[target_column, Vote.user_id],
+            index_where=target_column.isnot(None),
+            set_={"vote_type": stmt.excluded.vote_type},
+        )
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self.flush()
+
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name="vote-buffer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        if self._thread is not None:
+            self._stopped.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+vote_buffer = VoteBuffer(
+    SessionLocal,
+    flush_seconds=settings.vote_buffer_flush_seconds,
+    max_pending=settings.vote_buffer_max_pending,
+)
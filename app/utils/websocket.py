@@ -1,11 +1,15 @@
-from fastapi import WebSocket, status
-from sqlalchemy.orm import Session
-from app.models.message import Message
-from app.models.user import User
-from datetime import datetime
-import json
+import logging
+
+from fastapi import WebSocket
+
+from app.utils.structured_log import log_event
+
+logger = logging.getLogger(__name__)
 
 class ConnectionManager:
+    # Sockets are held by the worker that accepted them, so presence and live
+    # delivery only see users connected to this worker. Run the WebSocket
+    # endpoint on a single worker, or route each user's sockets to one worker.
     
     def __init__(self):
         self.active_connections: dict[int, WebSocket] = {}
@@ -18,17 +22,20 @@ class ConnectionManager:
         if user_id in self.active_connections:
             del self.active_connections[user_id]
     
-    async def send_personal_message(self, user_id: int, message: dict):
+    async def send_personal_message(self, user_id: int, message: dict) -> bool:
         if user_id in self.active_connections:
             try:
                 await self.active_connections[user_id].send_json(message)
+                return True
             except Exception as e:
-                print(f"Error sending message to user {user_id}: {e}")
+                log_event(logger, "ws.send_failed", logging.WARNING, user_id=user_id, error=type(e).__name__)
                 self.disconnect(user_id)
+        return False
     
-    async def broadcast_to_users(self, sender_id: int, recipient_id: int, message: dict):
-        await self.send_personal_message(sender_id, message)
-        await self.send_personal_message(recipient_id, message)
+    async def broadcast_to_users(self, sender_id: int, recipient_id: int, message: dict) -> int:
+        delivered = await self.send_personal_message(sender_id, message)
+        delivered += await self.send_personal_message(recipient_id, message)
+        return delivered
     
     def is_user_online(self, user_id: int) -> bool:
         return user_id in self.active_connections
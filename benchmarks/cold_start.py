@@ -0,0 +1,66 @@
+"""Measure how long a fresh worker takes to become ready.
+
+Each run starts a new interpreter, imports app.main and enters the lifespan
+startup hook, which is what uvicorn does before it accepts the first request.
+It also counts the SQL statements issued in each phase.
+Run from the repository root with the usual .env:
+
+    python -m benchmarks.cold_start --runs 10
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+
+CHILD = """
+import asyncio, json, time
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+statements = []
+event.listen(Engine, "before_cursor_execute", lambda *args: statements.append(time.perf_counter()))
+
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+import_queries = len(statements)
+
+async def boot():
+    async with app.router.lifespan_context(app):
+        return time.perf_counter()
+
+ready = asyncio.run(boot())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "import_queries": import_queries,
+    "startup_queries": len(statements) - import_queries,
+}))
+"""
+
+def run_once() -> dict:
+    started = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], check=True, capture_output=True, text=True
+    ).stdout
+    timings = json.loads(output.strip().splitlines()[-1])
+    timings["process_ms"] = (time.perf_counter() - started) * 1000
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    print(f"{args.runs} cold starts")
+    # Every query is a network round trip against a remote database, which this
+    # local timing does not show; the counts carry over to any deployment.
+    for key in ("import_ms", "startup_ms", "process_ms", "import_queries", "startup_queries"):
+        values = [run[key] for run in runs]
+        print(f"  {key:<15} median {statistics.median(values):8.1f}  min {min(values):8.1f}  max {max(values):8.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Profile what `import app.main` costs, using CPython's -X importtime.
+
+Prints the slowest top-level packages (summed self time) and the slowest app
+modules (cumulative time), then checks the total against a boot budget and
+exits non-zero when it is exceeded. Modules that must stay out of the import
+path because they are loaded on first use are reported as well. Run from the
+repository root with the usual .env:
+
+    python -m benchmarks.import_time --budget-ms 1100
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+# Loaded on first use or in the lifespan hook, never while importing app.main.
+DEFERRED_MODULES = ("jose", "passlib", "argon2", "psycopg2")
+
+def profile() -> list[tuple[str, int, int]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        check=True, capture_output=True, text=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=1100)
+    args = parser.parse_args()
+
+    runs = [profile() for _ in range(args.runs)]
+    totals = [sum(self_us for _, self_us, _ in rows) / 1000 for rows in runs]
+    total = statistics.median(totals)
+    rows = min(zip(totals, runs), key=lambda run: abs(run[0] - total))[1]
+
+    packages = defaultdict(int)
+    for name, self_us, _ in rows:
+        packages[name.split(".")[0]] += self_us
+    print(f"Slowest packages ({args.runs} runs, median run):")
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {package:<24} {self_us / 1000:8.1f} ms")
+
+    print("Slowest app modules (cumulative):")
+    app_modules = [row for row in rows if row[0].startswith("app.")]
+    for name, _, cumulative_us in sorted(app_modules, key=lambda row: -row[2])[:args.top]:
+        print(f"  {name:<24} {cumulative_us / 1000:8.1f} ms")
+
+    imported = {name.split(".")[0] for name, _, _ in rows}
+    leaked = [module for module in DEFERRED_MODULES if module in imported]
+    print(f"import app.main: median {total:.1f} ms (min {min(totals):.1f}), budget {args.budget_ms:.0f} ms")
+    if leaked:
+        print(f"Deferred modules imported eagerly: {', '.join(leaked)}")
+    if total > args.budget_ms or leaked:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
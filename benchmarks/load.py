@@ -0,0 +1,240 @@
+"""Drive scripted user scenarios against the API and report latency and RPS.
+
+Each scenario runs for --seconds with --concurrency simulated users, one
+thread each, and reports requests/sec plus p50/p95/p99 latency overall and per
+route. Which posts, users and conversations get picked follows the same power
+law as benchmarks.seed_data, ranked by the activity actually in the database,
+so the hot rows stay hot.
+
+By default requests go through the ASGI app in this process (no server or
+network needed); pass --base-url to load a running server instead. Requests
+carry pre-minted JWTs, so password hashing is not part of the numbers. The
+hottest simulated users will run into the per-user write limits; set
+RATE_LIMITS= to measure the handlers without them.
+
+Seed a scratch database first, then save a run and compare a later one:
+
+    python -m benchmarks.seed_data --yes-truncate --seed 1
+    python -m benchmarks.load --seed 1 --json before.json
+    python -m benchmarks.load --seed 1 --baseline before.json
+"""
+import argparse
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from datetime import timedelta
+
+import httpx
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.database import get_engine
+from app.utils.auth import create_access_token
+from benchmarks.seed_data import PowerLaw
+
+class Context:
+    """Ids the scenarios pick from, most active first."""
+
+    def __init__(self, skew: float, users: int):
+        with get_engine().connect() as conn:
+            self.posts = conn.execute(text(
+                "SELECT posts.id FROM posts LEFT JOIN votes ON votes.post_id = posts.id "
+                "WHERE NOT posts.is_hidden GROUP BY posts.id ORDER BY count(votes.id) DESC, posts.id"
+            )).scalars().all()
+            self.users = conn.execute(text(
+                "SELECT users.id FROM users LEFT JOIN messages ON messages.sender_id = users.id "
+                "GROUP BY users.id ORDER BY count(messages.id) DESC, users.id LIMIT :users"
+            ), {"users": users}).scalars().all()
+            self.comments_by_post = defaultdict(list)
+            for post_id, comment_id in conn.execute(text(
+                "SELECT post_id, id FROM comments WHERE post_id = ANY(:posts) AND NOT is_hidden ORDER BY id"
+            ), {"posts": self.posts[:20]}):
+                self.comments_by_post[post_id].append(comment_id)
+        if not self.posts or len(self.users) < 2:
+            raise SystemExit("No data to load against; run benchmarks.seed_data first")
+        self.skew = skew
+        self.tokens = {
+            user_id: {"Authorization": "Bearer " + create_access_token({"sub": str(user_id)}, timedelta(hours=12))}
+            for user_id in self.users
+        }
+
+    def pickers(self, rng: random.Random) -> tuple[PowerLaw, PowerLaw]:
+        return PowerLaw(self.posts, self.skew, rng), PowerLaw(self.users, self.skew, rng)
+
+class Recorder:
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def request(self, client, method: str, route: str, path: str, **kwargs) -> httpx.Response | None:
+        label = f"{method} {route}"
+        started = time.perf_counter()
+        try:
+            response = client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        elapsed = (time.perf_counter() - started) * 1000
+        with self._lock:
+            self.samples[label].append(elapsed)
+            if response is None or response.status_code >= 400:
+                self.errors[label] += 1
+        return response
+
+def browse(client, record: Recorder, context: Context, posts: PowerLaw, users: PowerLaw, rng: random.Random):
+    post_id = posts.draw()
+    post = record.request(client, "GET", "/posts/{post_id}", f"/posts/{post_id}")
+    record.request(client, "GET", "/comments/post/{post_id}", f"/comments/post/{post_id}", params={"limit": 50})
+    record.request(client, "GET", "/votes/post/{post_id}/score", f"/votes/post/{post_id}/score")
+    if post is not None and post.status_code == 200 and rng.random() < 0.2:
+        record.request(client, "GET", "/users/{user_id}", f"/users/{users.draw()}")
+
+def vote_storm(client, record: Recorder, context: Context, posts: PowerLaw, users: PowerLaw, rng: random.Random):
+    # Everyone piles onto the handful of hottest posts and their comments.
+    post_id = rng.choice(context.posts[:5])
+    headers = context.tokens[rng.choice(context.users)]
+    vote = {"vote_type": rng.choice(["upvote", "upvote", "upvote", "downvote"])}
+    record.request(client, "POST", "/votes/post/{post_id}", f"/votes/post/{post_id}", json=vote, headers=headers)
+    comments = context.comments_by_post.get(post_id)
+    if comments and rng.random() < 0.5:
+        comment_id = rng.choice(comments[:50])
+        record.request(
+            client, "POST", "/votes/comment/{comment_id}", f"/votes/comment/{comment_id}", json=vote, headers=headers
+        )
+    record.request(client, "GET", "/votes/post/{post_id}/score", f"/votes/post/{post_id}/score")
+
+def chat(client, record: Recorder, context: Context, posts: PowerLaw, users: PowerLaw, rng: random.Random):
+    sender, recipient = users.draw(), users.draw()
+    if sender == recipient:
+        return
+    sent = record.request(
+        client, "POST", "/messages/", "/messages/",
+        json={"recipient_id": recipient, "content": "hello " * rng.randrange(1, 20)},
+        headers=context.tokens[sender],
+    )
+    headers = context.tokens[recipient]
+    record.request(client, "GET", "/messages/unread-count", "/messages/unread-count", headers=headers)
+    record.request(client, "GET", "/messages/conversation/{user_id}", f"/messages/conversation/{sender}", headers=headers)
+    if sent is not None and sent.status_code == 201:
+        record.request(
+            client, "PUT", "/messages/conversation/{user_id}/mark-read", f"/messages/conversation/{sender}/mark-read",
+            params={"up_to_id": sent.json()["data"]["id"]}, headers=headers,
+        )
+
+SCENARIOS = {"browse": browse, "vote_storm": vote_storm, "chat": chat}
+
+def run_scenario(name: str, make_client, context: Context, args) -> dict:
+    record = Recorder()
+    deadline = time.perf_counter() + args.seconds
+
+    def worker(index: int):
+        rng = random.Random(f"{args.seed}-{name}-{index}")
+        posts, users = context.pickers(rng)
+        with make_client() as client:
+            while time.perf_counter() < deadline:
+                SCENARIOS[name](client, record, context, posts, users, rng)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(args.concurrency)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    routes = {label: summarize(samples, record.errors[label], elapsed) for label, samples in sorted(record.samples.items())}
+    every = [sample for samples in record.samples.values() for sample in samples]
+    return {**summarize(every, sum(record.errors.values()), elapsed), "routes": routes}
+
+def summarize(samples: list[float], errors: int, elapsed: float) -> dict:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive") if len(samples) > 1 else (samples or [0.0]) * 99
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 1),
+        "p50_ms": round(cuts[49], 2),
+        "p95_ms": round(cuts[94], 2),
+        "p99_ms": round(cuts[98], 2),
+    }
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def report(results: dict, baseline: dict | None):
+    columns = ("rps", "p50_ms", "p95_ms", "p99_ms")
+    print(f"{'':<48} {'requests':>9} {'errors':>7}" + "".join(f" {column:>16}" for column in columns))
+    for name, scenario in results["scenarios"].items():
+        before = (baseline or {}).get("scenarios", {}).get(name, {})
+        rows = [(name, scenario, before)] + [
+            (f"  {label}", stats, before.get("routes", {}).get(label, {}))
+            for label, stats in scenario["routes"].items()
+        ]
+        for label, stats, old in rows:
+            cells = []
+            for column in columns:
+                cell = f"{stats[column]:.1f}"
+                if old.get(column):
+                    cell += f" ({(stats[column] - old[column]) / old[column]:+.0%})"
+                cells.append(f" {cell:>16}")
+            print(f"{label:<48} {stats['requests']:>9} {stats['errors']:>7}" + "".join(cells))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--users", type=int, default=500, help="distinct users the scenarios act as")
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--base-url", help="load a running server instead of the in-process app")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--baseline", help="results file from an earlier run to compare against")
+    args = parser.parse_args()
+
+    names = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    context = Context(args.skew, args.users)
+    results = {
+        "revision": git_revision(),
+        "settings": {key: getattr(args, key) for key in ("seconds", "concurrency", "users", "skew", "seed", "base_url")},
+        "scenarios": {},
+    }
+    if args.base_url:
+        make_client = lambda: httpx.Client(base_url=args.base_url, timeout=30)
+        for name in names:
+            results["scenarios"][name] = run_scenario(name, make_client, context, args)
+    else:
+        from app.main import app
+
+        # One app and lifespan shared by every simulated user, as in a single worker.
+        with TestClient(app) as shared:
+            make_client = lambda: nullcontext(shared)
+            for name in names:
+                results["scenarios"][name] = run_scenario(name, make_client, context, args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as handle:
+            baseline = json.load(handle)
+        print(f"compared with {args.baseline} (revision {baseline.get('revision')})")
+    report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+
+if __name__ == "__main__":
+    main()
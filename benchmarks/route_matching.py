@@ -0,0 +1,76 @@
+"""Measure how much work Starlette spends matching a request to a route.
+
+Starlette walks the route table in registration order until a route fully
+matches, so every extra or shadowed registration is paid for on every request
+that sits behind it. Run from the repository root with the usual .env:
+
+    python -m benchmarks.route_matching
+"""
+import time
+from collections import Counter
+
+from starlette.routing import Match
+
+from app.main import app
+
+SAMPLE_REQUESTS = [
+    ("GET", "/posts/"),
+    ("GET", "/posts/1"),
+    ("GET", "/users/me"),
+    ("GET", "/comments/post/1"),
+    ("GET", "/comments/1"),
+    ("PUT", "/comments/1"),
+    ("DELETE", "/comments/1"),
+    ("POST", "/votes/post/1"),
+    ("GET", "/votes/comment/1/score"),
+    ("GET", "/messages/inbox"),
+    ("PUT", "/messages/1/mark-read"),
+    ("GET", "/communities/1"),
+    ("GET", "/communities/1/posts"),
+]
+
+def build_route_table(routes=None) -> list:
+    # The flat table Starlette scans, taken from the app itself so the order
+    # (including the docs routes registered ahead of the routers) is what
+    # ships. Newer FastAPI keeps each included router as one node; its routes
+    # already carry the router prefix, so they are expanded in place.
+    table = []
+    for route in app.routes if routes is None else routes:
+        included = getattr(route, "original_router", None)
+        table.extend(build_route_table(included.routes) if included is not None else [route])
+    return table
+
+def match(routes, method: str, path: str) -> int:
+    scope = {"type": "http", "method": method, "path": path, "root_path": ""}
+    for scanned, route in enumerate(routes, start=1):
+        result, _ = route.matches(scope)
+        if result == Match.FULL:
+            return scanned
+    return len(routes)
+
+def duplicate_registrations(routes) -> list[tuple[str, str]]:
+    seen = Counter(
+        (method, route.path)
+        for route in routes
+        for method in getattr(route, "methods", None) or ()
+    )
+    return sorted(key for key, count in seen.items() if count > 1)
+
+def main(iterations: int = 20000):
+    routes = build_route_table()
+    scanned = [match(routes, method, path) for method, path in SAMPLE_REQUESTS]
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for method, path in SAMPLE_REQUESTS:
+            match(routes, method, path)
+    elapsed = time.perf_counter() - start
+    per_request_us = elapsed / (iterations * len(SAMPLE_REQUESTS)) * 1e6
+
+    print(f"routes registered:       {len(routes)}")
+    print(f"duplicate registrations: {duplicate_registrations(routes)}")
+    print(f"avg routes scanned:      {sum(scanned) / len(scanned):.1f}")
+    print(f"match cost per request:  {per_request_us:.2f} us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""Fill a database with a realistic, reproducible data set for load tests.
+
+Activity is heavy-tailed, as on any forum: a few users write most posts,
+comments and messages; a few posts attract most comments and votes; a few
+communities hold most members. Each of these is drawn from a Zipf-like power
+law with exponent --skew, using --seed, so the same arguments always produce
+the same rows. Every user's password is "benchmark".
+
+The target database must be migrated; rows already in it are removed first,
+so nothing runs without --yes-truncate. Run from the repository root with the
+.env pointing at a scratch database:
+
+    python -m benchmarks.seed_data --yes-truncate --users 5000 --posts 20000 --seed 1
+"""
+import argparse
+import bisect
+import itertools
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import insert, text
+
+from app.database import get_engine
+from app.models.comment import Comment, MAX_COMMENT_DEPTH, PATH_SEGMENT_WIDTH
+from app.models.community import Community, CommunityMember, CommunityPost, MemberRole
+from app.models.message import Message
+from app.models.post import Post
+from app.models.user import User
+from app.models.vote import Vote, VoteType
+from app.utils.auth import hash_password
+
+PASSWORD = "benchmark"
+BATCH_SIZE = 5000
+TABLES = (
+    "deletions", "deletion_retention", "community_deletions", "reports", "files", "votes", "messages", "community_posts",
+    "community_members", "communities", "comments", "posts", "users",
+)
+
+class PowerLaw:
+    """Draws from ids, most popular first, with weight 1 / rank ** skew."""
+
+    def __init__(self, ids: list[int], skew: float, rng: random.Random):
+        self.ids = ids
+        self.cum_weights = list(itertools.accumulate(1 / rank ** skew for rank in range(1, len(ids) + 1)))
+        self.rng = rng
+
+    def draw(self) -> int:
+        point = self.rng.random() * self.cum_weights[-1]
+        return self.ids[bisect.bisect(self.cum_weights, point)]
+
+def shuffled_ids(n: int, rng: random.Random) -> list[int]:
+    # Spread the popular ids over the id range instead of making them the oldest rows.
+    ids = list(range(1, n + 1))
+    rng.shuffle(ids)
+    return ids
+
+def generate(args) -> dict[str, list[dict]]:
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    ago = lambda: now - timedelta(seconds=rng.randrange(30 * 24 * 3600))
+    authors = PowerLaw(shuffled_ids(args.users, rng), args.skew, rng)
+    posts = PowerLaw(shuffled_ids(args.posts, rng), args.skew, rng)
+    hashed = hash_password(PASSWORD)
+
+    rows = {"users": [], "posts": [], "comments": [], "votes": [], "messages": [],
+            "communities": [], "community_members": [], "community_posts": []}
+    rows["users"] = [
+        {"id": i, "username": f"user_{i}", "email": f"user_{i}@example.com", "hashed_password": hashed,
+         "is_active": True, "created_at": ago()}
+        for i in range(1, args.users + 1)
+    ]
+    rows["posts"] = [
+        {"id": i, "title": f"Post {i}", "content": "lorem ipsum " * rng.randrange(1, 40), "owner_id": authors.draw(),
+         "is_anonymous": False, "display_name": "bench", "is_hidden": False, "created_at": ago()}
+        for i in range(1, args.posts + 1)
+    ]
+
+    threads: dict[int, list[dict]] = {}
+    comments: dict[int, dict] = {}
+    for i in range(1, args.comments + 1):
+        post_id = posts.draw()
+        thread = threads.setdefault(post_id, [])
+        parent = rng.choice(thread) if thread and rng.random() < 0.6 else None
+        if parent and parent["depth"] >= MAX_COMMENT_DEPTH:
+            parent = None
+        comment = {
+            "id": i, "content": "a reply", "post_id": post_id, "owner_id": authors.draw(),
+            "parent_id": parent["id"] if parent else None, "depth": parent["depth"] + 1 if parent else 0,
+            "path": (parent["path"] if parent else "") + f"{i:0{PATH_SEGMENT_WIDTH}d}/",
+            "reply_count": 0, "is_hidden": False, "created_at": ago(),
+        }
+        for segment in comment["path"].split("/")[:-2]:
+            comments[int(segment)]["reply_count"] += 1
+        thread.append(comment)
+        comments[i] = comment
+        rows["comments"].append(comment)
+
+    voted = set()
+    for _ in range(args.votes):
+        key = ("post_id", posts.draw(), rng.randrange(1, args.users + 1))
+        if rows["comments"] and rng.random() < 0.3:
+            key = ("comment_id", rng.randrange(1, args.comments + 1), key[2])
+        if key in voted:
+            continue
+        voted.add(key)
+        vote_type = VoteType.UPVOTE if rng.random() < 0.75 else VoteType.DOWNVOTE
+        rows["votes"].append({"post_id": None, "comment_id": None, key[0]: key[1], "user_id": key[2],
+                              "vote_type": vote_type, "created_at": ago()})
+
+    for _ in range(args.messages):
+        sender, recipient = authors.draw(), authors.draw()
+        if sender == recipient:
+            continue
+        rows["messages"].append({"sender_id": sender, "recipient_id": recipient, "content": "hey",
+                                 "created_at": ago(), "is_read": rng.random() < 0.8})
+
+    sizes = PowerLaw(shuffled_ids(args.communities, rng), args.skew, rng)
+    members = {}
+    for _ in range(args.memberships):
+        members.setdefault(sizes.draw(), set()).add(rng.randrange(1, args.users + 1))
+    for i in range(1, args.communities + 1):
+        captain = authors.draw()
+        joined = members.get(i, set()) | {captain}
+        rows["communities"].append({"id": i, "name": f"community_{i}", "description": None, "captain_id": captain,
+                                    "member_count": len(joined), "created_at": ago(), "last_activity_at": now})
+        rows["community_members"].extend(
+            {"community_id": i, "user_id": user_id, "joined_at": ago(),
+             "role": MemberRole.captain if user_id == captain else MemberRole.member}
+            for user_id in sorted(joined)
+        )
+    rows["community_posts"] = [
+        {"community_id": sizes.draw(), "title": "title", "content": "content", "owner_id": authors.draw(), "created_at": ago()}
+        for _ in range(args.community_posts)
+    ]
+    return rows
+
+MODELS = {
+    "users": User, "posts": Post, "comments": Comment, "votes": Vote, "messages": Message,
+    "communities": Community, "community_members": CommunityMember, "community_posts": CommunityPost,
+}
+
+def load(rows: dict[str, list[dict]]):
+    engine = get_engine()
+    with engine.begin() as conn:
+        conn.execute(text(f"TRUNCATE {', '.join(TABLES)} RESTART IDENTITY CASCADE"))
+        for table, table_rows in rows.items():
+            for start in range(0, len(table_rows), BATCH_SIZE):
+                conn.execute(insert(MODELS[table]), table_rows[start:start + BATCH_SIZE])
+            # Ids above were given explicitly, so move the serial sequences past them.
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), (SELECT coalesce(max(id), 0) + 1 FROM {table}), false)"
+            ))
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        conn.execute(text("VACUUM ANALYZE"))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--comments", type=int, default=40000)
+    parser.add_argument("--votes", type=int, default=100000)
+    parser.add_argument("--messages", type=int, default=40000)
+    parser.add_argument("--communities", type=int, default=500)
+    parser.add_argument("--memberships", type=int, default=20000)
+    parser.add_argument("--community-posts", type=int, default=10000)
+    parser.add_argument("--skew", type=float, default=1.1)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--yes-truncate", action="store_true", help="empty the .env database before loading")
+    args = parser.parse_args()
+    if not args.yes_truncate:
+        target = get_engine().url.render_as_string(hide_password=True)
+        raise SystemExit(f"This empties every table in {target}; pass --yes-truncate if it is a scratch database")
+
+    started = time.perf_counter()
+    rows = generate(args)
+    generated = time.perf_counter()
+    load(rows)
+    print(f"generated in {generated - started:.1f}s, loaded in {time.perf_counter() - generated:.1f}s")
+    for table, table_rows in rows.items():
+        print(f"  {table:<18} {len(table_rows):>8}")
+
+if __name__ == "__main__":
+    main()
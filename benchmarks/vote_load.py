@@ -0,0 +1,101 @@
+"""Sustained votes/sec on a single "viral" post, with and without the vote buffer.
+
+Drives the real vote_post handler from a pool of threads, each with its own
+session, so the numbers include the handler's database work but not HTTP.
+Needs a migrated database (the usual .env); it creates its own users and post.
+
+    python -m benchmarks.vote_load --threads 16 --seconds 10
+"""
+import argparse
+import random
+import threading
+import time
+import uuid
+
+from fastapi import Response
+
+from app.database import SessionLocal
+from app.models.post import Post
+from app.models.user import User
+from app.models.vote import Vote, VoteType
+from app.routers.votes import vote_post
+from app.schemas.vote import VoteCreate
+from app.utils.vote_buffer import vote_buffer
+
+def seed(voters: int) -> tuple[int, list[User]]:
+    db = SessionLocal()
+    tag = uuid.uuid4().hex[:8]
+    users = [
+        User(username=f"bench_{tag}_{i}", email=f"bench_{tag}_{i}@example.com", hashed_password="x")
+        for i in range(voters)
+    ]
+    db.add_all(users)
+    db.flush()
+    post = Post(title=f"Viral {tag}", content="benchmark", owner_id=users[0].id, display_name="bench")
+    db.add(post)
+    db.commit()
+    for user in users:
+        db.refresh(user)
+        db.expunge(user)
+    post_id = post.id
+    db.close()
+    return post_id, users
+
+def run(post_id: int, users: list[User], threads: int, seconds: float) -> int:
+    deadline = time.perf_counter() + seconds
+    counts = [0] * threads
+
+    def worker(index: int):
+        db = SessionLocal()
+        rng = random.Random(index)
+        try:
+            while time.perf_counter() < deadline:
+                vote_post(
+                    post_id,
+                    VoteCreate(vote_type=rng.choice(list(VoteType))),
+                    Response(),
+                    db,
+                    rng.choice(users),
+                )
+                counts[index] += 1
+        finally:
+            db.close()
+
+    pool = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return sum(counts)
+
+def persisted_votes(post_id: int) -> int:
+    db = SessionLocal()
+    try:
+        return db.query(Vote).filter(Vote.post_id == post_id).count()
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--voters", type=int, default=2000)
+    args = parser.parse_args()
+
+    post_id, users = seed(args.voters)
+    accepted = run(post_id, users, args.threads, args.seconds)
+    print(f"direct:   {accepted / args.seconds:10.0f} votes/s  ({persisted_votes(post_id)} rows)")
+
+    post_id, users = seed(args.voters)
+    vote_buffer.start()
+    accepted = run(post_id, users, args.threads, args.seconds)
+    start = time.perf_counter()
+    vote_buffer.stop()
+    drain = time.perf_counter() - start
+    print(
+        f"buffered: {accepted / args.seconds:10.0f} votes/s  ({persisted_votes(post_id)} rows,"
+        f" final flush {drain * 1000:.0f} ms)"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""track community deletion jobs in the database
+
+Revision ID: a4b5c6d7e8f9
+Revises: f3a4b5c6d7e8
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a4b5c6d7e8f9'
+down_revision = 'f3a4b5c6d7e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'community_deletions',
+        sa.Column('community_id', sa.Integer(), nullable=False),
+        sa.Column('requested_by', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=16), nullable=False),
+        sa.Column('posts_deleted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('members_deleted', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('started_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+        sa.Column('error', sa.Text(), nullable=True),
+        sa.PrimaryKeyConstraint('community_id'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('community_deletions')
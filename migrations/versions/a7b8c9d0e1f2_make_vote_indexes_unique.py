@@ -0,0 +1,69 @@
+"""make per-user vote indexes unique
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'a7b8c9d0e1f2'
+down_revision = 'f6a7b8c9d0e1'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('uq_votes_post_id_user_id', 'post_id'),
+    ('uq_votes_comment_id_user_id', 'comment_id'),
+]
+
+# Non-unique versions that earlier builds of f6a7b8c9d0e1 created.
+SUPERSEDED = ['ix_votes_post_id_user_id', 'ix_votes_comment_id_user_id']
+
+
+def _drop_if_invalid(name: str) -> None:
+    # A failed concurrent build leaves an invalid index behind, which
+    # if_not_exists would then treat as done.
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index JOIN pg_class ON pg_class.oid = pg_index.indexrelid "
+        "WHERE pg_class.relname = :name AND NOT pg_index.indisvalid"
+    ), {"name": name}).scalar()
+    if invalid:
+        op.drop_index(name, table_name='votes', postgresql_concurrently=True)
+
+
+def upgrade() -> None:
+    # Keep each user's most recent vote per target before enforcing uniqueness.
+    # Votes written by the old code while the indexes build can still collide;
+    # the build then fails and running the migration again cleans them up.
+    for _, column in INDEXES:
+        op.execute(f"""
+            DELETE FROM votes WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, row_number() OVER (PARTITION BY {column}, user_id ORDER BY id DESC) AS newer
+                    FROM votes WHERE {column} IS NOT NULL
+                ) ranked
+                WHERE newer > 1
+            )
+        """)
+    # Built concurrently, like f6a7b8c9d0e1, so voting is not blocked meanwhile.
+    with op.get_context().autocommit_block():
+        for name, column in INDEXES:
+            _drop_if_invalid(name)
+            op.create_index(
+                name, 'votes', [column, 'user_id'],
+                unique=True, postgresql_where=sa.text(f'{column} IS NOT NULL'),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+        for name in SUPERSEDED:
+            op.drop_index(name, table_name='votes', postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='votes', postgresql_concurrently=True)
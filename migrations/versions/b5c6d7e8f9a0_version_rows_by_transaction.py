@@ -0,0 +1,54 @@
+"""version rows by transaction id and track pruned tombstones
+
+Revision ID: b5c6d7e8f9a0
+Revises: a4b5c6d7e8f9
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b5c6d7e8f9a0'
+down_revision = 'a4b5c6d7e8f9'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('posts', 'comments', 'communities', 'messages', 'deletions')
+
+ROW_VERSION_FUNCTIONS = """
+CREATE OR REPLACE FUNCTION row_version() RETURNS bigint LANGUAGE sql VOLATILE
+    AS 'SELECT txid_current() + {offset}';
+CREATE OR REPLACE FUNCTION row_version_horizon() RETURNS bigint LANGUAGE sql VOLATILE
+    AS 'SELECT txid_snapshot_xmin(txid_current_snapshot()) + {offset}';
+"""
+
+
+def upgrade() -> None:
+    # Versions handed out from now on must stay above every sequence value a
+    # client may already hold as its cursor.
+    offset = op.get_bind().execute(sa.text(
+        "SELECT greatest(0, (SELECT last_value FROM row_version_seq) - txid_current())"
+    )).scalar()
+    op.execute(ROW_VERSION_FUNCTIONS.format(offset=offset))
+    for table in VERSIONED_TABLES:
+        op.alter_column(table, 'version', server_default=sa.text('row_version()'))
+    op.execute("DROP SEQUENCE row_version_seq")
+
+    op.create_table(
+        'deletion_retention',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('pruned_through', sa.BigInteger(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('deletion_retention')
+
+    latest = ", ".join(f"(SELECT max(version) FROM {table})" for table in VERSIONED_TABLES)
+    op.execute("CREATE SEQUENCE row_version_seq")
+    op.execute(f"SELECT setval('row_version_seq', greatest(coalesce(greatest({latest}), 0), row_version()))")
+    for table in VERSIONED_TABLES:
+        op.alter_column(table, 'version', server_default=sa.text("nextval('row_version_seq')"))
+    op.execute("DROP FUNCTION row_version_horizon()")
+    op.execute("DROP FUNCTION row_version()")
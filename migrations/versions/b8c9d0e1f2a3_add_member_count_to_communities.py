@@ -0,0 +1,28 @@
+"""add maintained member_count to communities
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b8c9d0e1f2a3'
+down_revision = 'a7b8c9d0e1f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('communities', sa.Column('member_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute("""
+        UPDATE communities SET member_count = (
+            SELECT count(*) FROM community_members WHERE community_members.community_id = communities.id
+        )
+    """)
+
+
+def downgrade() -> None:
+    op.drop_column('communities', 'member_count')
@@ -0,0 +1,40 @@
+"""add comment threading with materialized path
+
+Revision ID: c3d4e5f6a7b8
+Revises: 10a36f762b2d, b2c3d4e5f6a7
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c3d4e5f6a7b8'
+down_revision = ('10a36f762b2d', 'b2c3d4e5f6a7')
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('comments_parent_id_fkey', 'comments', 'comments', ['parent_id'], ['id'])
+    op.create_index(op.f('ix_comments_parent_id'), 'comments', ['parent_id'], unique=False)
+
+    op.add_column('comments', sa.Column('path', sa.String(length=255, collation='C'), nullable=True))
+    op.execute("UPDATE comments SET path = lpad(id::text, 10, '0') || '/' WHERE path IS NULL")
+    op.alter_column('comments', 'path', nullable=False)
+
+    op.add_column('comments', sa.Column('depth', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_index('ix_comments_post_id_path', 'comments', ['post_id', 'path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_post_id_path', table_name='comments')
+    op.drop_column('comments', 'reply_count')
+    op.drop_column('comments', 'depth')
+    op.drop_column('comments', 'path')
+    op.drop_index(op.f('ix_comments_parent_id'), table_name='comments')
+    op.drop_constraint('comments_parent_id_fkey', 'comments', type_='foreignkey')
+    op.drop_column('comments', 'parent_id')
@@ -0,0 +1,41 @@
+"""add last_activity_at and directory indexes to communities
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c9d0e1f2a3b4'
+down_revision = 'b8c9d0e1f2a3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'communities',
+        sa.Column('last_activity_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+    )
+    op.execute("""
+        UPDATE communities SET last_activity_at = GREATEST(
+            communities.created_at,
+            COALESCE((
+                SELECT max(community_posts.created_at) FROM community_posts
+                WHERE community_posts.community_id = communities.id
+            ), communities.created_at)
+        )
+    """)
+    op.create_index('ix_communities_member_count_id', 'communities', ['member_count', 'id'])
+    op.create_index('ix_communities_last_activity_at_id', 'communities', ['last_activity_at', 'id'])
+    op.execute("CREATE INDEX ix_communities_name_lower ON communities (lower(name) text_pattern_ops)")
+
+
+def downgrade() -> None:
+    op.drop_index('ix_communities_name_lower', table_name='communities')
+    op.drop_index('ix_communities_last_activity_at_id', table_name='communities')
+    op.drop_index('ix_communities_member_count_id', table_name='communities')
+    op.drop_column('communities', 'last_activity_at')
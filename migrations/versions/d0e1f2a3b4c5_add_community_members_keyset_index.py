@@ -0,0 +1,27 @@
+"""add keyset index for paging community members
+
+Revision ID: d0e1f2a3b4c5
+Revises: c9d0e1f2a3b4
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+
+
+revision = 'd0e1f2a3b4c5'
+down_revision = 'c9d0e1f2a3b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_community_members_community_id_joined_at_id', 'community_members',
+            ['community_id', 'joined_at', 'id'], unique=False,
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_community_members_community_id_joined_at_id', table_name='community_members')
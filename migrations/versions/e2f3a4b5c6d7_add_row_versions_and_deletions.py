@@ -0,0 +1,60 @@
+"""add updated_at, row versions and deletion tombstones
+
+Revision ID: e2f3a4b5c6d7
+Revises: d0e1f2a3b4c5
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e2f3a4b5c6d7'
+down_revision = 'd0e1f2a3b4c5'
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ('posts', 'comments', 'communities', 'messages')
+
+
+def upgrade() -> None:
+    op.execute("CREATE SEQUENCE row_version_seq")
+    for table in VERSIONED_TABLES:
+        op.add_column(
+            table,
+            sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        )
+        op.add_column(
+            table,
+            sa.Column('version', sa.BigInteger(), nullable=False, server_default=sa.text("nextval('row_version_seq')")),
+        )
+        op.execute(f"UPDATE {table} SET updated_at = COALESCE(created_at, updated_at)")
+
+    op.create_index('ix_posts_version', 'posts', ['version'])
+    op.create_index('ix_comments_post_id_version', 'comments', ['post_id', 'version'])
+    op.create_index('ix_messages_sender_id_version', 'messages', ['sender_id', 'version'])
+    op.create_index('ix_messages_recipient_id_version', 'messages', ['recipient_id', 'version'])
+
+    op.create_table(
+        'deletions',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('entity', sa.String(length=20), nullable=False),
+        sa.Column('entity_id', sa.Integer(), nullable=False),
+        sa.Column('scope_id', sa.Integer(), nullable=True),
+        sa.Column('version', sa.BigInteger(), nullable=False, server_default=sa.text("nextval('row_version_seq')")),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index('ix_deletions_entity_scope_id_version', 'deletions', ['entity', 'scope_id', 'version'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_deletions_entity_scope_id_version', table_name='deletions')
+    op.drop_table('deletions')
+    op.drop_index('ix_messages_recipient_id_version', table_name='messages')
+    op.drop_index('ix_messages_sender_id_version', table_name='messages')
+    op.drop_index('ix_comments_post_id_version', table_name='comments')
+    op.drop_index('ix_posts_version', table_name='posts')
+    for table in reversed(VERSIONED_TABLES):
+        op.drop_column(table, 'version')
+        op.drop_column(table, 'updated_at')
+    op.execute("DROP SEQUENCE row_version_seq")
@@ -0,0 +1,49 @@
+"""deduplicate reports per reporter/target and add is_hidden flags
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e5f6a7b8c9d0'
+down_revision = 'd4e5f6a7b8c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM reports r USING reports d
+        WHERE r.reporter_id = d.reporter_id
+          AND r.post_id = d.post_id
+          AND r.comment_id IS NULL AND d.comment_id IS NULL
+          AND r.id > d.id
+    """)
+    op.execute("""
+        DELETE FROM reports r USING reports d
+        WHERE r.reporter_id = d.reporter_id
+          AND r.comment_id = d.comment_id
+          AND r.id > d.id
+    """)
+    op.create_index(
+        'uq_reports_reporter_post', 'reports', ['reporter_id', 'post_id'],
+        unique=True, postgresql_where=sa.text('comment_id IS NULL'),
+    )
+    op.create_index(
+        'uq_reports_reporter_comment', 'reports', ['reporter_id', 'comment_id'],
+        unique=True, postgresql_where=sa.text('comment_id IS NOT NULL'),
+    )
+
+    op.add_column('posts', sa.Column('is_hidden', sa.Boolean(), nullable=False, server_default=sa.false()))
+    op.add_column('comments', sa.Column('is_hidden', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade() -> None:
+    op.drop_column('comments', 'is_hidden')
+    op.drop_column('posts', 'is_hidden')
+    op.drop_index('uq_reports_reporter_comment', table_name='reports')
+    op.drop_index('uq_reports_reporter_post', table_name='reports')
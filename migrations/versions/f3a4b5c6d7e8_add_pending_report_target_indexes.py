@@ -0,0 +1,39 @@
+"""add per-target partial indexes on pending reports
+
+Revision ID: f3a4b5c6d7e8
+Revises: e2f3a4b5c6d7
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'f3a4b5c6d7e8'
+down_revision = 'e2f3a4b5c6d7'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_reports_pending_post_id_created_at', ['post_id', 'created_at', 'id'],
+     "status = 'PENDING' AND comment_id IS NULL"),
+    ('ix_reports_pending_comment_id_created_at', ['comment_id', 'created_at', 'id'],
+     "status = 'PENDING' AND comment_id IS NOT NULL"),
+]
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, columns, where in INDEXES:
+            op.create_index(
+                name, 'reports', columns, unique=False,
+                postgresql_where=sa.text(where),
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='reports')
@@ -0,0 +1,43 @@
+"""add composite and partial indexes for hot access patterns
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-19 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'f6a7b8c9d0e1'
+down_revision = 'e5f6a7b8c9d0'
+branch_labels = None
+depends_on = None
+
+
+# The per-user vote lookups are served by the unique indexes that
+# a7b8c9d0e1f2 builds, so they are not indexed twice here.
+INDEXES = [
+    ('ix_messages_recipient_id_created_at', 'messages', ['recipient_id', 'created_at'], None),
+    ('ix_messages_sender_id_recipient_id_created_at', 'messages', ['sender_id', 'recipient_id', 'created_at'], None),
+    ('ix_messages_unread_recipient_id', 'messages', ['recipient_id'], 'is_read IS false'),
+    ('ix_community_posts_community_id_created_at', 'community_posts', ['community_id', 'created_at'], None),
+    ('ix_posts_owner_id_created_at', 'posts', ['owner_id', 'created_at'], None),
+]
+
+
+def upgrade() -> None:
+    # Built concurrently so writes to these busy tables are not blocked meanwhile.
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name, table, columns, unique=False,
+                postgresql_where=sa.text(where) if where else None,
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    for name, table, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -1,12 +1,19 @@
+import os
 import uuid
 import pytest
 from fastapi.testclient import TestClient
 
+# The whole session logs in from one client address; tests that cover rate
+# limiting set their own limits.
+os.environ.setdefault("RATE_LIMITS", "")
+
+from app.commands.migrate import migrate
 from app.main import app
 
 
 @pytest.fixture(scope="session")
 def client():
+    migrate()
     with TestClient(app) as c:
         yield c
 
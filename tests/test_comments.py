@@ -77,3 +77,122 @@ def test_delete_comment(client):
     resp = client.delete(f"/comments/{comment_id}", headers=user["headers"])
     assert resp.status_code == 200
     assert client.get(f"/comments/{comment_id}").status_code == 404
+
+
+def test_delete_thread_with_voted_and_reported_reply(client):
+    user, post_id = _setup(client)
+    other = register_and_login(client)
+    root_id = client.post(
+        f"/comments/{post_id}", json={"content": "Root"}, headers=user["headers"]
+    ).json()["data"]["id"]
+    reply_id = client.post(
+        f"/comments/{post_id}", json={"content": "Reply", "parent_id": root_id}, headers=other["headers"]
+    ).json()["data"]["id"]
+    vote = client.post(f"/votes/comment/{reply_id}", json={"vote_type": "upvote"}, headers=user["headers"])
+    report = client.post("/reports/", json={"comment_id": reply_id, "reason": "spam"}, headers=user["headers"])
+    assert (vote.status_code, report.status_code) == (201, 201)
+
+    resp = client.delete(f"/comments/{root_id}", headers=user["headers"])
+    assert resp.status_code == 200
+    assert client.get(f"/comments/{reply_id}").status_code == 404
+
+
+def test_reply_thread(client):
+    user, post_id = _setup(client)
+    root_id = client.post(
+        f"/comments/{post_id}", json={"content": "Root"}, headers=user["headers"]
+    ).json()["data"]["id"]
+    reply = client.post(
+        f"/comments/{post_id}", json={"content": "Reply", "parent_id": root_id}, headers=user["headers"]
+    ).json()["data"]
+    assert reply["parent_id"] == root_id
+    assert reply["depth"] == 1
+    client.post(
+        f"/comments/{post_id}", json={"content": "Nested", "parent_id": reply["id"]}, headers=user["headers"]
+    )
+
+    resp = client.get(f"/comments/{root_id}/thread")
+    assert resp.status_code == 200
+    thread = resp.json()
+    assert [c["content"] for c in thread] == ["Root", "Reply", "Nested"]
+    assert thread[0]["reply_count"] == 2
+
+    client.delete(f"/comments/{reply['id']}", headers=user["headers"])
+    thread = client.get(f"/comments/{root_id}/thread").json()
+    assert len(thread) == 1
+    assert thread[0]["reply_count"] == 0
+
+
+def test_list_comments_sorted_by_score_with_cursor(client):
+    user, post_id = _setup(client)
+    voter = register_and_login(client)
+    ids = [
+        client.post(f"/comments/{post_id}", json={"content": f"C{i}"}, headers=user["headers"]).json()["data"]["id"]
+        for i in range(3)
+    ]
+    client.post(f"/votes/comment/{ids[1]}", json={"vote_type": "upvote"}, headers=voter["headers"])
+    client.post(f"/votes/comment/{ids[2]}", json={"vote_type": "downvote"}, headers=voter["headers"])
+
+    resp = client.get(f"/comments/post/{post_id}", params={"sort": "top", "limit": 2})
+    assert resp.status_code == 200
+    first_page = resp.json()
+    assert [c["id"] for c in first_page] == [ids[1], ids[0]]
+    assert first_page[0]["score"] == 1
+
+    cursor = resp.headers["X-Next-Cursor"]
+    resp = client.get(f"/comments/post/{post_id}", params={"sort": "top", "limit": 2, "cursor": cursor})
+    assert [c["id"] for c in resp.json()] == [ids[2]]
+    assert resp.json()[0]["score"] == -1
+    assert "X-Next-Cursor" not in resp.headers
+
+
+def test_list_comments_nonexistent_post(client):
+    resp = client.get("/comments/post/9999999")
+    assert resp.status_code == 404
+
+
+def test_list_comments_cache_invalidated_by_votes_and_replies(client):
+    user, post_id = _setup(client)
+    for i in range(3):
+        client.post(f"/comments/{post_id}", json={"content": f"c{i}"}, headers=user["headers"])
+
+    first = client.get(f"/comments/post/{post_id}", params={"limit": 2})
+    cached = client.get(f"/comments/post/{post_id}", params={"limit": 2})
+    assert cached.headers["ETag"] == first.headers["ETag"]
+    assert cached.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+
+    comment_id = first.json()[0]["id"]
+    client.post(f"/votes/comment/{comment_id}", json={"vote_type": "upvote"}, headers=user["headers"])
+    voted = client.get(f"/comments/post/{post_id}", params={"limit": 2})
+    assert voted.json()[0]["upvotes"] == 1
+
+    client.post(f"/comments/{post_id}", json={"content": "late", "parent_id": comment_id}, headers=user["headers"])
+    replied = client.get(f"/comments/post/{post_id}", params={"limit": 2})
+    assert replied.json()[0]["reply_count"] == 1
+
+
+def test_comment_changes_report_edits_and_deleted_subtrees(client):
+    user, post_id = _setup(client)
+    root = client.post(f"/comments/{post_id}", json={"content": "Root"}, headers=user["headers"]).json()["data"]
+    reply = client.post(f"/comments/{post_id}", json={"content": "Reply", "parent_id": root["id"]}, headers=user["headers"]).json()["data"]
+    other = client.post(f"/comments/{post_id}", json={"content": "Other"}, headers=user["headers"]).json()["data"]
+
+    initial = client.get(f"/comments/post/{post_id}/changes").json()
+    assert {c["id"] for c in initial["changes"]} == {root["id"], reply["id"], other["id"]}
+    by_id = {c["id"]: c for c in initial["changes"]}
+    assert by_id[root["id"]]["reply_count"] == 1
+
+    client.put(f"/comments/{other['id']}", json={"content": "Edited"}, headers=user["headers"])
+    client.delete(f"/comments/{root['id']}", headers=user["headers"])
+
+    resp = client.get(f"/comments/post/{post_id}/changes?since={initial['version']}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [c["content"] for c in body["changes"]] == ["Edited"]
+    assert sorted(body["deleted"]) == sorted([root["id"], reply["id"]])
+    assert body["has_more"] is False
+
+
+def test_comment_changes_nonexistent_post(client):
+    resp = client.get("/comments/post/9999999/changes")
+    assert resp.status_code == 404
@@ -1,3 +1,9 @@
+from app.commands.repair_member_counts import repair_member_counts
+from app.config import settings
+from app.database import SessionLocal
+from app.models.community import Community, CommunityMember, MemberRole
+from app.utils.community_deletion import community_deletions
+from app.utils.cache import TTLCache
 from tests.conftest import register_and_login, unique
 
 
@@ -124,3 +130,203 @@ def test_duplicate_community_name(client):
     _create_community(client, captain["headers"], name=name)
     resp = _create_community(client, captain["headers"], name=name)
     assert resp.status_code == 400
+
+
+def test_membership_cache_invalidated_on_leave(client, monkeypatch):
+    captain = register_and_login(client)
+    member = register_and_login(client)
+    cid = _create_community(client, captain["headers"]).json()["data"]["id"]
+    client.post(f"/communities/{cid}/join", headers=member["headers"])
+    assert client.get(f"/communities/{cid}/posts", headers=member["headers"]).status_code == 200
+    assert client.get(f"/communities/{cid}", headers=member["headers"]).json()["member_count"] == 2
+
+    client.post(f"/communities/{cid}/leave", headers=member["headers"])
+    assert client.get(f"/communities/{cid}/posts", headers=member["headers"]).status_code == 403
+    assert client.get(f"/communities/{cid}", headers=member["headers"]).json()["member_count"] == 1
+
+    assert client.get("/communities/cache-stats", headers=captain["headers"]).status_code == 403
+    monkeypatch.setattr(settings, "profile_token", "admin-secret")
+    stats = client.get("/communities/cache-stats", headers={"X-Admin-Token": "admin-secret"}).json()
+    assert stats["memberships"]["hits"] >= 1
+
+
+def test_cache_drops_load_invalidated_while_running():
+    cache = TTLCache(maxsize=10, ttl=60)
+
+    def load_then_invalidate():
+        cache.invalidate("key")
+        return "stale"
+
+    assert cache.get_or_load("key", load_then_invalidate) == "stale"
+    assert cache.get_or_load("key", lambda: "fresh") == "fresh"
+
+
+def test_captain_checks_ignore_cached_roles(client):
+    captain = register_and_login(client)
+    member = register_and_login(client)
+    cid = _create_community(client, captain["headers"]).json()["data"]["id"]
+    client.post(f"/communities/{cid}/join", headers=member["headers"])
+    member_id = client.get("/users/me", headers=member["headers"]).json()["id"]
+    assert client.get(f"/communities/{cid}/posts", headers=captain["headers"]).status_code == 200
+
+    # Another worker transferred captaincy; this worker's cache still says captain.
+    db = SessionLocal()
+    try:
+        for membership in db.query(CommunityMember).filter(CommunityMember.community_id == cid):
+            membership.role = MemberRole.captain if membership.user_id == member_id else MemberRole.member
+        db.query(Community).filter(Community.id == cid).update({Community.captain_id: member_id})
+        db.commit()
+    finally:
+        db.close()
+
+    resp = client.post(f"/communities/{cid}/transfer-captaincy", params={"new_captain_user_id": member_id},
+                       headers=captain["headers"])
+    assert resp.status_code == 403
+    assert client.delete(f"/communities/{cid}", headers=captain["headers"]).status_code == 403
+
+
+def test_repair_member_counts(client):
+    captain = register_and_login(client)
+    cid = _create_community(client, captain["headers"]).json()["data"]["id"]
+    db = SessionLocal()
+    try:
+        db.query(Community).filter(Community.id == cid).update({Community.member_count: 42})
+        db.commit()
+        assert repair_member_counts(db) >= 1
+        assert db.query(Community.member_count).filter(Community.id == cid).scalar() == 1
+    finally:
+        db.close()
+
+
+def test_community_directory_prefix_search_and_pagination(client):
+    user = register_and_login(client)
+    prefix = f"Dir_{unique()}"
+    ids = [_create_community(client, user["headers"], f"{prefix}_{i}").json()["data"]["id"] for i in range(3)]
+    _create_community(client, user["headers"])
+
+    resp = client.get("/communities/directory", params={
+        "q": prefix.lower(), "sort": "newest", "limit": 2,
+    }, headers=user["headers"])
+    assert resp.status_code == 200
+    assert [c["id"] for c in resp.json()] == ids[::-1][:2]
+    cursor = resp.headers["X-Next-Cursor"]
+
+    resp = client.get("/communities/directory", params={
+        "q": prefix, "sort": "newest", "limit": 2, "cursor": cursor,
+    }, headers=user["headers"])
+    assert [c["id"] for c in resp.json()] == [ids[0]]
+    assert "X-Next-Cursor" not in resp.headers
+
+
+def test_community_directory_sorts_by_activity(client):
+    user = register_and_login(client)
+    prefix = f"Act_{unique()}"
+    first = _create_community(client, user["headers"], f"{prefix}_a").json()["data"]["id"]
+    second = _create_community(client, user["headers"], f"{prefix}_b").json()["data"]["id"]
+    client.post(f"/communities/{first}/posts", json={"title": "t", "content": "c"}, headers=user["headers"])
+
+    resp = client.get("/communities/directory", params={"q": prefix, "sort": "activity"}, headers=user["headers"])
+    assert [c["id"] for c in resp.json()] == [first, second]
+
+
+def test_community_directory_escapes_wildcards(client):
+    user = register_and_login(client)
+    resp = client.get("/communities/directory", params={"q": "%"}, headers=user["headers"])
+    assert resp.status_code == 200
+    assert resp.json() == []
+
+
+def test_list_members_paginates_and_filters_by_role(client):
+    captain = register_and_login(client)
+    cid = _create_community(client, captain["headers"]).json()["data"]["id"]
+    joiners = [register_and_login(client) for _ in range(3)]
+    for joiner in joiners:
+        client.post(f"/communities/{cid}/join", headers=joiner["headers"])
+
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        resp = client.get(f"/communities/{cid}/members", params=params, headers=captain["headers"])
+        assert resp.status_code == 200
+        seen.extend(m["user_id"] for m in resp.json())
+        cursor = resp.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert len(seen) == 4 and len(set(seen)) == 4
+
+    resp = client.get(f"/communities/{cid}/members", params={"role": "captain"}, headers=captain["headers"])
+    assert [m["role"] for m in resp.json()] == ["captain"]
+
+
+def test_delete_community_in_batches(client, monkeypatch):
+    monkeypatch.setattr(settings, "community_delete_batch_size", 2)
+    captain = register_and_login(client)
+    cid = _create_community(client, captain["headers"]).json()["data"]["id"]
+    for joiner in [register_and_login(client) for _ in range(2)]:
+        client.post(f"/communities/{cid}/join", headers=joiner["headers"])
+    for i in range(5):
+        client.post(f"/communities/{cid}/posts", json={"title": f"t{i}", "content": "c"}, headers=captain["headers"])
+
+    resp = client.delete(f"/communities/{cid}", headers=captain["headers"])
+    assert resp.status_code == 202
+    assert resp.json()["data"]["status"] == "running"
+
+    progress = client.get(f"/communities/{cid}/deletion", headers=captain["headers"]).json()
+    assert progress["status"] == "done"
+    assert progress["posts_deleted"] == 5
+    assert progress["members_deleted"] == 3
+    assert client.get(f"/communities/{cid}", headers=captain["headers"]).status_code == 404
+
+
+def test_delete_community_requires_captain(client):
+    captain = register_and_login(client)
+    member = register_and_login(client)
+    cid = _create_community(client, captain["headers"]).json()["data"]["id"]
+    client.post(f"/communities/{cid}/join", headers=member["headers"])
+    assert client.delete(f"/communities/{cid}", headers=member["headers"]).status_code == 403
+
+
+def test_failed_community_deletion_can_be_restarted(client):
+    captain = register_and_login(client)
+    member = register_and_login(client)
+    cid = _create_community(client, captain["headers"]).json()["data"]["id"]
+    client.post(f"/communities/{cid}/join", headers=member["headers"])
+    captain_id = client.get("/users/me", headers=captain["headers"]).json()["id"]
+
+    # A job that removed every membership, the captain's included, then failed.
+    db = SessionLocal()
+    try:
+        community_deletions.start(db, cid, captain_id)
+        db.query(CommunityMember).filter(CommunityMember.community_id == cid).delete()
+        db.commit()
+        community_deletions.run(cid, lambda: _FailingSession(), 10)
+        assert community_deletions.get(db, cid).status == "failed"
+    finally:
+        db.close()
+
+    latecomer = register_and_login(client)
+    assert client.post(f"/communities/{cid}/join", headers=latecomer["headers"]).status_code == 409
+    assert client.get(f"/communities/{cid}/deletion", headers=member["headers"]).status_code == 403
+
+    assert client.delete(f"/communities/{cid}", headers=captain["headers"]).status_code == 202
+    progress = client.get(f"/communities/{cid}/deletion", headers=captain["headers"]).json()
+    assert progress["status"] == "done"
+    assert client.get(f"/communities/{cid}", headers=captain["headers"]).status_code == 404
+
+
+class _FailingSession:
+    # Fails the first batch, then records the failure normally.
+
+    def __init__(self):
+        self.db = SessionLocal()
+        self.failed = False
+
+    def execute(self, statement, *args, **kwargs):
+        if not self.failed:
+            self.failed = True
+            raise RuntimeError("connection lost")
+        return self.db.execute(statement, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
@@ -0,0 +1,81 @@
+import io
+import json
+import logging
+import time
+
+import pytest
+
+from app.config import settings
+from app.utils import structured_log
+from app.utils.structured_log import configure_logging, log_event, shutdown_logging
+from app.utils.websocket import connection_manager
+from tests.conftest import register_and_login
+
+
+@pytest.fixture
+def json_log():
+    shutdown_logging()
+    stream = io.StringIO()
+    configure_logging(stream)
+
+    def read() -> list[dict]:
+        shutdown_logging()
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    yield read
+    shutdown_logging()
+
+
+def test_events_written_as_json_lines(json_log):
+    logger = logging.getLogger("app.tests")
+    log_event(logger, "thing.happened", user_id=7, took_ms=1.5)
+    log_event(logger, "thing.sampled_out", sample_rate=0.0)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("thing.failed for %s", "someone")
+
+    first, failed = json_log()
+    assert first["event"] == "thing.happened"
+    assert first["level"] == "info" and first["logger"] == "app.tests"
+    assert first["user_id"] == 7 and first["took_ms"] == 1.5
+    assert failed["event"] == "thing.failed for someone"
+    assert "ValueError: boom" in failed["exc"]
+
+
+def test_full_queue_drops_instead_of_blocking(monkeypatch):
+    shutdown_logging()
+    monkeypatch.setattr(settings, "log_queue_size", 1)
+    configure_logging()
+    structured_log._listener.stop()
+    try:
+        logger = logging.getLogger("app.tests")
+        for _ in range(5):
+            log_event(logger, "flood")
+        assert structured_log.dropped_records() == 4
+    finally:
+        structured_log._listener.start()
+        shutdown_logging()
+
+
+def test_chat_logs_timings_without_content(client, json_log, monkeypatch):
+    monkeypatch.setattr(settings, "ws_message_log_sample_rate", 1.0)
+    sender = register_and_login(client)
+    receiver = register_and_login(client)
+    receiver_id = client.get("/users/me", headers=receiver["headers"]).json()["id"]
+
+    with client.websocket_connect(f"/ws/chat/{receiver_id}?token={sender['token']}") as ws:
+        ws.send_text(json.dumps({"content": "secret words"}))
+        sender_id = ws.receive_json()["sender_id"]
+    deadline = time.monotonic() + 2
+    while connection_manager.is_user_online(sender_id) and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    events = {entry["event"]: entry for entry in json_log() if entry["logger"] == "app.routers.websocket"}
+    assert {"ws.connect", "ws.message", "ws.disconnect"} <= set(events)
+    message = events["ws.message"]
+    assert message["peer_id"] == receiver_id
+    assert message["delivered"] == 1
+    assert message["total_ms"] >= message["store_ms"] >= 0
+    assert "secret words" not in json.dumps(message)
+    assert events["ws.disconnect"]["messages"] == 1
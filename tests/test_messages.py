@@ -1,3 +1,6 @@
+from app.database import SessionLocal
+from app.models.message import Message
+from app.utils.unread import unread_counter
 from tests.conftest import register_and_login, unique
 
 
@@ -59,3 +62,90 @@ def test_get_conversation(client):
 def test_message_requires_auth(client):
     resp = client.post("/messages/", json={"recipient_id": 1, "content": "No auth"})
     assert resp.status_code in (401, 403)
+
+
+def test_mark_conversation_read(client):
+    sender = register_and_login(client)
+    receiver = register_and_login(client)
+    sender_id = client.get("/users/me", headers=sender["headers"]).json()["id"]
+    receiver_id = client.get("/users/me", headers=receiver["headers"]).json()["id"]
+
+    ids = [
+        client.post("/messages/", json={"recipient_id": receiver_id, "content": f"Msg {i}"},
+                    headers=sender["headers"]).json()["data"]["id"]
+        for i in range(3)
+    ]
+
+    resp = client.put(
+        f"/messages/conversation/{sender_id}/mark-read",
+        params={"up_to_id": ids[1]},
+        headers=receiver["headers"],
+    )
+    assert resp.status_code == 200
+    assert resp.json()["data"]["updated"] == 2
+
+    inbox = {m["id"]: m["is_read"] for m in client.get("/messages/inbox", headers=receiver["headers"]).json()}
+    assert inbox[ids[0]] and inbox[ids[1]]
+    assert not inbox[ids[2]]
+
+
+def test_unread_count(client):
+    sender = register_and_login(client)
+    receiver = register_and_login(client)
+    sender_id = client.get("/users/me", headers=sender["headers"]).json()["id"]
+    receiver_id = client.get("/users/me", headers=receiver["headers"]).json()["id"]
+
+    last_id = None
+    for i in range(2):
+        last_id = client.post("/messages/", json={"recipient_id": receiver_id, "content": f"Msg {i}"},
+                              headers=sender["headers"]).json()["data"]["id"]
+
+    resp = client.get("/messages/unread-count", headers=receiver["headers"])
+    assert resp.status_code == 200
+    assert resp.json()["unread"] == 2
+
+    client.put(f"/messages/conversation/{sender_id}/mark-read", params={"up_to_id": last_id},
+               headers=receiver["headers"])
+    assert client.get("/messages/unread-count", headers=receiver["headers"]).json()["unread"] == 0
+
+
+def test_unread_count_reloads_changes_from_other_workers(client, monkeypatch):
+    sender = register_and_login(client)
+    receiver = register_and_login(client)
+    sender_id = client.get("/users/me", headers=sender["headers"]).json()["id"]
+    receiver_id = client.get("/users/me", headers=receiver["headers"]).json()["id"]
+    assert client.get("/messages/unread-count", headers=receiver["headers"]).json()["unread"] == 0
+
+    # Written the way another worker would, without touching this worker's counter.
+    db = SessionLocal()
+    try:
+        db.add(Message(sender_id=sender_id, recipient_id=receiver_id, content="elsewhere"))
+        db.commit()
+    finally:
+        db.close()
+
+    monkeypatch.setattr(unread_counter, "ttl", 0)
+    assert client.get("/messages/unread-count", headers=receiver["headers"]).json()["unread"] == 1
+
+def test_message_changes_for_both_participants(client):
+    sender = register_and_login(client)
+    receiver = register_and_login(client)
+    receiver_id = client.get("/users/me", headers=receiver["headers"]).json()["id"]
+
+    first = client.post("/messages/", json={"recipient_id": receiver_id, "content": "One"}, headers=sender["headers"]).json()["data"]
+    second = client.post("/messages/", json={"recipient_id": receiver_id, "content": "Two"}, headers=sender["headers"]).json()["data"]
+    synced = client.get("/messages/changes", headers=receiver["headers"]).json()
+    assert [m["id"] for m in synced["changes"]] == [first["id"], second["id"]]
+
+    client.put(f"/messages/{first['id']}/mark-read", headers=receiver["headers"])
+    client.delete(f"/messages/{second['id']}", headers=receiver["headers"])
+
+    for user in (sender, receiver):
+        resp = client.get(f"/messages/changes?since={synced['version']}", headers=user["headers"])
+        assert resp.status_code == 200
+        body = resp.json()
+        assert [(m["id"], m["is_read"]) for m in body["changes"]] == [(first["id"], True)]
+        assert body["deleted"] == [second["id"]]
+
+    outsider = register_and_login(client)
+    assert client.get("/messages/changes", headers=outsider["headers"]).json()["changes"] == []
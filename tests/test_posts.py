@@ -1,3 +1,9 @@
+from datetime import datetime, timedelta, timezone
+
+from app.commands.prune_deletions import prune_deletions
+from app.database import SessionLocal
+from app.models.post import Post
+from app.models.sync import Deletion
 from tests.conftest import register_and_login, unique
 
 
@@ -88,3 +94,117 @@ def test_delete_post_by_another_user(client):
     post_id = _create_post(client, owner["headers"]).json()["data"]["id"]
     resp = client.delete(f"/posts/{post_id}", headers=other["headers"])
     assert resp.status_code == 403
+
+
+def test_get_post_conditional_request(client):
+    user = register_and_login(client)
+    post_id = _create_post(client, user["headers"]).json()["data"]["id"]
+
+    first = client.get(f"/posts/{post_id}")
+    etag = first.headers["ETag"]
+    assert "max-age" in first.headers["Cache-Control"]
+    assert client.get(f"/posts/{post_id}", headers={"If-None-Match": etag}).status_code == 304
+
+    client.put(f"/posts/{post_id}", json={"title": "Edited"}, headers=user["headers"])
+    changed = client.get(f"/posts/{post_id}", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["title"] == "Edited"
+    assert changed.headers["ETag"] != etag
+
+
+def test_post_changes_since_version(client):
+    user = register_and_login(client)
+    first = _create_post(client, user["headers"]).json()["data"]
+    since = first["version"]
+    second = _create_post(client, user["headers"]).json()["data"]
+    updated = client.put(f"/posts/{first['id']}", json={"title": "Edited"}, headers=user["headers"]).json()["data"]
+    assert updated["version"] > since
+    assert updated["updated_at"] >= first["updated_at"]
+    client.delete(f"/posts/{second['id']}", headers=user["headers"])
+
+    resp = client.get(f"/posts/changes?since={since}")
+    assert resp.status_code == 200
+    body = resp.json()
+    assert [p["id"] for p in body["changes"] if p["id"] in (first["id"], second["id"])] == [first["id"]]
+    assert second["id"] in body["deleted"]
+    assert body["version"] > updated["version"]
+
+    caught_up = client.get(f"/posts/changes?since={body['version']}").json()
+    assert caught_up["version"] >= body["version"]
+    assert first["id"] not in [p["id"] for p in caught_up["changes"]]
+
+
+def test_post_changes_paginates_in_version_order(client):
+    user = register_and_login(client)
+    since = _create_post(client, user["headers"]).json()["data"]["version"]
+    ids = [_create_post(client, user["headers"]).json()["data"]["id"] for _ in range(3)]
+
+    page = client.get(f"/posts/changes?since={since}&limit=2").json()
+    assert page["has_more"] is True
+    rest = client.get(f"/posts/changes?since={page['version']}&limit=50").json()
+    seen = [p["id"] for p in page["changes"] + rest["changes"]]
+    assert [i for i in seen if i in ids] == ids
+
+
+def _new_posts(owner_id: int, count: int) -> list[Post]:
+    return [Post(title=f"Post {unique()}", content="c", owner_id=owner_id) for _ in range(count)]
+
+
+def test_post_changes_wait_for_transactions_that_commit_late(client):
+    user = register_and_login(client)
+    owner_id = client.get("/users/me", headers=user["headers"]).json()["id"]
+    since = _create_post(client, user["headers"]).json()["data"]["version"]
+
+    db = SessionLocal()
+    try:
+        late = _new_posts(owner_id, 1)[0]
+        db.add(late)
+        db.flush()
+        early = _create_post(client, user["headers"]).json()["data"]
+
+        held_back = client.get(f"/posts/changes?since={since}").json()
+        assert early["id"] not in [p["id"] for p in held_back["changes"]]
+        db.commit()
+        late_id = late.id
+    finally:
+        db.close()
+
+    caught_up = client.get(f"/posts/changes?since={held_back['version']}").json()
+    assert {late_id, early["id"]} <= {p["id"] for p in caught_up["changes"]}
+
+
+def test_post_changes_never_split_a_transaction(client):
+    user = register_and_login(client)
+    owner_id = client.get("/users/me", headers=user["headers"]).json()["id"]
+    since = _create_post(client, user["headers"]).json()["data"]["version"]
+    db = SessionLocal()
+    try:
+        posts = _new_posts(owner_id, 3)
+        db.add_all(posts)
+        db.commit()
+        ids = {post.id for post in posts}
+    finally:
+        db.close()
+
+    page = client.get(f"/posts/changes?since={since}&limit=2").json()
+    assert ids <= {p["id"] for p in page["changes"]}
+
+
+def test_pruned_tombstones_require_a_full_sync(client):
+    user = register_and_login(client)
+    post_id = _create_post(client, user["headers"]).json()["data"]["id"]
+    since = client.get("/posts/changes?since=0").json()["version"]
+    client.delete(f"/posts/{post_id}", headers=user["headers"])
+
+    db = SessionLocal()
+    try:
+        db.query(Deletion).filter(Deletion.entity == "post", Deletion.entity_id == post_id).update(
+            {Deletion.deleted_at: datetime.now(timezone.utc) - timedelta(days=2)}, synchronize_session=False
+        )
+        db.commit()
+        assert prune_deletions(db, timedelta(days=1)) >= 1
+    finally:
+        db.close()
+
+    assert client.get(f"/posts/changes?since={since}").status_code == 410
+    assert client.get("/posts/changes?since=0").status_code == 200
@@ -0,0 +1,72 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.config import settings
+from app.utils import profiling
+from app.utils.profiling import profile_requests
+
+
+def _busy_endpoint():
+    deadline = time.perf_counter() + 0.1
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+    return {"ok": True}
+
+
+def _app() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(BaseHTTPMiddleware, dispatch=profile_requests)
+    app.get("/busy/{item_id}")(_busy_endpoint)
+    return TestClient(app)
+
+
+def test_profile_written_per_route_when_token_matches(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profile_token", "secret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    client = _app()
+
+    resp = client.get("/busy/1", headers={"X-Profile": "secret"})
+    assert resp.status_code == 200
+    assert int(resp.headers["X-Profile-Samples"]) > 0
+    client.get("/busy/2", headers={"X-Profile": "secret"})
+
+    lines = (tmp_path / "GET_busy_item_id.collapsed").read_text().splitlines()
+    assert any("_busy_endpoint" in line for line in lines)
+    stack, _, count = lines[0].rpartition(" ")
+    assert ";" in stack and int(count) > 0
+
+
+def test_requests_without_token_are_not_profiled(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profile_token", "secret")
+    monkeypatch.setattr(settings, "profile_sample_rate", 0)
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    client = _app()
+
+    assert "X-Profile-Samples" not in client.get("/busy/1").headers
+    assert "X-Profile-Samples" not in client.get("/busy/1", headers={"X-Profile": "wrong"}).headers
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_profile_is_stopped_and_saved_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profile_token", "secret")
+    monkeypatch.setattr(settings, "profile_dir", str(tmp_path))
+    on_loop = []
+
+    def record(original):
+        def wrapper(*args):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(original.__name__)
+            except RuntimeError:
+                pass
+            return original(*args)
+        return wrapper
+
+    monkeypatch.setattr(profiling.profiler, "stop", record(profiling.profiler.stop))
+    monkeypatch.setattr(profiling, "save_profile", record(profiling.save_profile))
+    assert _app().get("/busy/1", headers={"X-Profile": "secret"}).status_code == 200
+    assert on_loop == []
@@ -0,0 +1,137 @@
+"""EXPLAIN the hot queries against a seeded Postgres and fail on sequential scans.
+
+Point QUERY_PLAN_DATABASE_URL at a scratch database; the module drops and
+recreates every table in it. Skipped when the variable is not set.
+"""
+import json
+import os
+
+import pytest
+from sqlalchemy import create_engine, func, or_, select, text
+from sqlalchemy.dialects import postgresql
+
+from app.database import Base
+from app.models.comment import Comment
+from app.models.community import Community, CommunityMember, CommunityPost
+from app.models.message import Message
+from app.models.post import Post
+from app.models.report import Report, ReportStatus
+from app.models.vote import Vote, VoteType
+from app.routers.reports import pending_queue_heads
+
+DATABASE_URL = os.getenv("QUERY_PLAN_DATABASE_URL")
+
+pytestmark = pytest.mark.skipif(not DATABASE_URL, reason="QUERY_PLAN_DATABASE_URL is not set")
+
+VOLUMES = {
+    "users": 20000,
+    "posts": 100000,
+    "comments": 200000,
+    "post_votes": 300000,
+    "comment_votes": 100000,
+    "messages": 200000,
+    "communities": 20000,
+    "members": 100000,
+    "community_posts": 100000,
+    "reports": 50000,
+}
+
+SEED_STATEMENTS = [
+    """INSERT INTO users (id, username, email, hashed_password, is_active, created_at)
+       SELECT g, 'user_' || g, 'user_' || g || '@example.com', 'x', true, now() - g * interval '1 minute'
+       FROM generate_series(1, :users) g""",
+    """INSERT INTO posts (id, title, content, owner_id, is_anonymous, display_name, is_hidden, created_at)
+       SELECT g, 'Post ' || g, 'content', 1 + (g * 7919) % :users, false, 'user', false, now() - g * interval '1 second'
+       FROM generate_series(1, :posts) g""",
+    """INSERT INTO comments (id, content, post_id, owner_id, path, depth, reply_count, is_hidden, created_at)
+       SELECT g, 'comment', 1 + (g * 31) % :posts, 1 + (g * 13) % :users, lpad(g::text, 10, '0') || '/', 0, 0, false, now()
+       FROM generate_series(1, :comments) g""",
+    """INSERT INTO votes (user_id, post_id, vote_type, created_at)
+       SELECT 1 + g / :posts, 1 + g % :posts, (CASE WHEN g % 4 = 0 THEN 'DOWNVOTE' ELSE 'UPVOTE' END)::votetype, now()
+       FROM generate_series(0, :post_votes - 1) g""",
+    """INSERT INTO votes (user_id, comment_id, vote_type, created_at)
+       SELECT 1 + g / :comments, 1 + g % :comments, (CASE WHEN g % 4 = 0 THEN 'DOWNVOTE' ELSE 'UPVOTE' END)::votetype, now()
+       FROM generate_series(0, :comment_votes - 1) g""",
+    """INSERT INTO messages (sender_id, recipient_id, content, created_at, is_read)
+       SELECT 1 + (g * 17) % :users, 1 + (g * 23) % :users, 'hi', now() - g * interval '1 second', g % 10 <> 0
+       FROM generate_series(1, :messages) g""",
+    """INSERT INTO communities (id, name, description, captain_id, created_at)
+       SELECT g, 'community_' || g, NULL, 1 + g % :users, now()
+       FROM generate_series(1, :communities) g""",
+    """INSERT INTO community_members (community_id, user_id, role, joined_at)
+       SELECT 1 + g % :communities, 1 + g / :communities, 'member'::memberrole, now() - g * interval '1 second'
+       FROM generate_series(0, :members - 1) g""",
+    """INSERT INTO community_posts (community_id, title, content, owner_id, created_at)
+       SELECT 1 + g % :communities, 'title', 'content', 1 + g % :users, now() - g * interval '1 second'
+       FROM generate_series(1, :community_posts) g""",
+    """INSERT INTO reports (reporter_id, post_id, reason, status, created_at)
+       SELECT 1 + g % :users, 1 + g % :posts, 'spam',
+              (CASE WHEN g % 10 = 0 THEN 'PENDING' ELSE 'RESOLVED' END)::reportstatus, now() - g * interval '1 second'
+       FROM generate_series(1, :reports) g""",
+]
+
+HOT_QUERIES = {
+    "vote_on_post": select(Vote).where(Vote.post_id == 4242, Vote.user_id == 3),
+    "vote_on_comment": select(Vote).where(Vote.comment_id == 4242, Vote.user_id == 1),
+    "post_score": select(func.count(Vote.id)).where(Vote.post_id == 4242, Vote.vote_type == VoteType.UPVOTE),
+    "inbox": select(Message).where(Message.recipient_id == 777).order_by(Message.created_at.desc()),
+    "sent": select(Message).where(Message.sender_id == 777).order_by(Message.created_at.desc()),
+    "conversation": select(Message).where(or_(
+        (Message.sender_id == 777) & (Message.recipient_id == 778),
+        (Message.sender_id == 778) & (Message.recipient_id == 777),
+    )).order_by(Message.created_at.asc()),
+    "unread_count": select(func.count(Message.id)).where(Message.recipient_id == 777, Message.is_read.is_(False)),
+    "member_lookup": select(CommunityMember).where(
+        CommunityMember.community_id == 7, CommunityMember.user_id == 42
+    ),
+    "member_page": select(CommunityMember.user_id, CommunityMember.joined_at)
+        .where(CommunityMember.community_id == 7).order_by(CommunityMember.joined_at, CommunityMember.id).limit(50),
+    "community_posts": select(CommunityPost).where(CommunityPost.community_id == 7).order_by(CommunityPost.created_at),
+    "posts_by_owner": select(Post).where(Post.owner_id == 777).order_by(Post.created_at),
+    "comments_for_post": select(Comment).where(Comment.post_id == 4242).order_by(Comment.path),
+    "post_changes": select(Post).where(Post.version > 99000).order_by(Post.version).limit(101),
+    "comment_changes": select(Comment).where(Comment.post_id == 4242, Comment.version > 0).order_by(Comment.version).limit(101),
+    "message_changes": select(Message).where(
+        or_(Message.sender_id == 777, Message.recipient_id == 777), Message.version > 0
+    ).order_by(Message.version).limit(101),
+    "directory_by_size": select(Community).order_by(Community.member_count.desc(), Community.id.desc()).limit(20),
+    "directory_prefix": select(Community).where(func.lower(Community.name).like("community_12%"))
+        .order_by(Community.id.desc()).limit(20),
+    "pending_reports": select(Report).where(Report.status == ReportStatus.PENDING)
+        .order_by(Report.created_at, Report.id).limit(50),
+    "report_queue": pending_queue_heads(None, 51),
+}
+
+
+@pytest.fixture(scope="module")
+def seeded_engine():
+    engine = create_engine(DATABASE_URL)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        for statement in SEED_STATEMENTS:
+            conn.execute(text(statement), VOLUMES)
+        conn.execute(text("ANALYZE"))
+    yield engine
+    engine.dispose()
+
+
+def _sequential_scans(plan: dict) -> list[str]:
+    found, nodes = [], [plan]
+    while nodes:
+        node = nodes.pop()
+        if node["Node Type"] == "Seq Scan":
+            found.append(node["Relation Name"])
+        nodes.extend(node.get("Plans", []))
+    return found
+
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(seeded_engine, name):
+    compiled = HOT_QUERIES[name].compile(
+        dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+    )
+    with seeded_engine.connect() as conn:
+        raw = conn.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}")).scalar()
+    plan = (raw if isinstance(raw, list) else json.loads(raw))[0]["Plan"]
+    assert _sequential_scans(plan) == [], f"{name} plan:\n{json.dumps(plan, indent=2)}"
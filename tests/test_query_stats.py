@@ -0,0 +1,37 @@
+from app.config import settings
+from app.utils.query_stats import fingerprint, query_stats
+from tests.conftest import register_and_login
+
+
+def test_fingerprint_strips_literals_and_collapses_lists():
+    first = fingerprint("SELECT * FROM posts WHERE id IN (%(id_1_1)s, %(id_1_2)s) AND title = 'a''b' LIMIT 10")
+    second = fingerprint("SELECT *  FROM posts\nWHERE id IN (%(id_1_1)s) AND title = 'other' LIMIT 20 -- note")
+    assert first == second == "SELECT * FROM posts WHERE id IN (...) AND title = ? LIMIT ?"
+    assert fingerprint("SELECT users_1.id FROM users AS users_1") == "SELECT users_1.id FROM users AS users_1"
+
+
+def test_statements_attributed_to_route(client, monkeypatch):
+    monkeypatch.setattr(settings, "profile_token", "admin-secret")
+    query_stats.reset()
+    user = register_and_login(client)
+    post_id = client.post("/posts/", json={"title": "t", "content": "c"}, headers=user["headers"]).json()["data"]["id"]
+    for _ in range(3):
+        client.post(f"/comments/{post_id}", json={"content": "hi"}, headers=user["headers"])
+
+    resp = client.get("/diagnostics/queries?sort=count&limit=200", headers={"X-Admin-Token": "admin-secret"})
+    assert resp.status_code == 200
+    rows = [row for row in resp.json()["queries"] if row["route"] == "POST /comments/{post_id}"]
+    inserts = [row for row in rows if row["fingerprint"].startswith("INSERT INTO comments")]
+    assert len(inserts) == 1
+    assert inserts[0]["count"] == 3
+    assert inserts[0]["max_per_request"] == 1
+    assert inserts[0]["max_ms"] >= inserts[0]["mean_ms"] > 0
+    assert any(row["fingerprint"].startswith("SELECT users.") for row in rows)
+
+
+def test_query_stats_require_admin_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "profile_token", "admin-secret")
+    user = register_and_login(client)
+    assert client.get("/diagnostics/queries").status_code == 403
+    assert client.get("/diagnostics/queries", headers=user["headers"]).status_code == 403
+    assert client.get("/diagnostics/queries", headers={"X-Admin-Token": "wrong"}).status_code == 403
@@ -0,0 +1,94 @@
+import json
+
+import pytest
+
+from pydantic import ValidationError
+
+from app.config import Settings, settings
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryBucketStore, MemoryWindowStore, SQLiteBucketStore, TokenBucketLimiter, parse_limits
+from tests.conftest import register_and_login
+
+
+@pytest.fixture
+def limits(monkeypatch):
+    monkeypatch.setattr(rate_limit, "request_limiter", TokenBucketLimiter())
+
+    def set_limits(spec: str):
+        monkeypatch.setattr(settings, "rate_limits", spec)
+    return set_limits
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_bucket_allows_burst_then_refills(backend, tmp_path):
+    store = MemoryBucketStore() if backend == "memory" else SQLiteBucketStore(str(tmp_path / "limits.db"))
+    assert [store.take("k", 100.0, 3, 0.5) for _ in range(3)] == [None, None, None]
+    assert store.take("k", 100.0, 3, 0.5) == pytest.approx(2.0)
+    assert store.take("k", 101.0, 3, 0.5) == pytest.approx(1.0)
+    assert store.take("k", 102.0, 3, 0.5) is None
+    assert store.take("other", 102.0, 3, 0.5) is None
+
+
+def test_window_store_forgets_keys_after_the_window():
+    store = MemoryWindowStore(prune_every=3)
+    assert store.add_hit("a", 100.0, 10, 1) is None
+    assert store.add_hit("b", 101.0, 10, 1) is None
+    assert len(store._hits) == 2
+
+    assert store.add_hit("c", 120.0, 10, 1) is None
+    assert set(store._hits) == {"c"}
+
+
+def test_parse_limits():
+    assert parse_limits("login:10/60, vote:120/30") == {"login": (10, 60.0), "vote": (120, 30.0)}
+    assert parse_limits("") == {}
+
+
+@pytest.mark.parametrize("spec", ["login:10", "login:0/60", "login:10/0", "login:ten/60", ":10/60", "login:10/inf"])
+def test_malformed_rate_limits_fail_at_startup(spec, monkeypatch):
+    monkeypatch.setenv("RATE_LIMITS", spec)
+    with pytest.raises(ValidationError, match="RATE_LIMITS entry"):
+        Settings()
+
+
+def test_writes_limited_per_user_with_retry_after(client, limits):
+    first = register_and_login(client)
+    second = register_and_login(client)
+    limits("post:2/60")
+
+    statuses = [
+        client.post("/posts/", json={"title": "t", "content": "c"}, headers=first["headers"]).status_code
+        for _ in range(3)
+    ]
+    assert statuses == [201, 201, 429]
+    limited = client.post("/posts/", json={"title": "t", "content": "c"}, headers=first["headers"])
+    assert limited.json()["detail"] == "Too many requests, slow down"
+    assert 1 <= int(limited.headers["Retry-After"]) <= 30
+    assert client.post("/posts/", json={"title": "t", "content": "c"}, headers=second["headers"]).status_code == 201
+
+
+def test_login_limited_per_ip(client, limits):
+    user = register_and_login(client)
+    limits("login:2/60")
+    credentials = {"email": user["email"], "password": "wrong"}
+    statuses = [client.post("/auth/login", json=credentials).status_code for _ in range(3)]
+    assert statuses == [401, 401, 429]
+
+
+def test_chat_frames_share_the_message_limit(client, limits):
+    sender = register_and_login(client)
+    receiver = register_and_login(client)
+    receiver_id = client.get("/users/me", headers=receiver["headers"]).json()["id"]
+    limits("message:2/60")
+
+    with client.websocket_connect(f"/ws/chat/{receiver_id}?token={sender['token']}") as ws:
+        replies = []
+        for _ in range(3):
+            ws.send_text(json.dumps({"content": "hi"}))
+            replies.append(ws.receive_json())
+    assert [reply["type"] for reply in replies] == ["message", "message", "error"]
+    assert replies[-1]["detail"] == "Too many requests, slow down"
+    assert replies[-1]["retry_after"] >= 1
+    assert client.post(
+        "/messages/", json={"recipient_id": receiver_id, "content": "hi"}, headers=sender["headers"]
+    ).status_code == 429
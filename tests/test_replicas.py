@@ -0,0 +1,72 @@
+import time
+
+from app.database import DATABASE_URL, get_engine
+from app.utils import replicas
+from app.utils.replicas import ReplicaRouter
+from tests.conftest import register_and_login
+
+
+def _router(urls, **overrides) -> ReplicaRouter:
+    options = {"max_lag_seconds": 5, "sticky_seconds": 5, "health_check_seconds": 60, **overrides}
+    return ReplicaRouter(urls, **options)
+
+
+def test_reads_use_primary_without_replicas():
+    assert _router([]).engine_for(1) is get_engine()
+
+
+def test_reads_go_to_healthy_replica_until_user_writes():
+    router = _router([DATABASE_URL])
+    router.probe()
+    replica = router.engine_for(1)
+    assert replica is not get_engine()
+    assert replica.url == get_engine().url
+
+    router.mark_write(1)
+    assert router.engine_for(1) is get_engine()
+    assert router.engine_for(2) is replica
+
+
+def test_lagging_or_unreachable_replicas_fall_back_to_primary(monkeypatch):
+    router = _router([DATABASE_URL])
+    monkeypatch.setattr(router, "lag_seconds", lambda engine: 60.0)
+    router.probe()
+    assert router.engine_for(None) is get_engine()
+
+    unreachable = _router(["postgresql+psycopg2://postgres@127.0.0.1:1/none"], timeout_seconds=1)
+    unreachable.probe()
+    assert unreachable.engine_for(None) is get_engine()
+
+
+def test_requests_never_probe_replicas(monkeypatch):
+    router = _router([DATABASE_URL])
+    probes = []
+    monkeypatch.setattr(router, "lag_seconds", lambda engine: probes.append(engine) or 0.0)
+
+    assert router.engine_for(None) is get_engine()
+    assert probes == []
+
+    router.start()
+    try:
+        deadline = time.monotonic() + 5
+        while not probes and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        router.stop()
+    assert len(probes) == 1
+    assert router.engine_for(None) is not get_engine()
+
+
+def test_read_routes_served_from_replica(client, monkeypatch):
+    router = _router([DATABASE_URL])
+    router.probe()
+    monkeypatch.setattr(replicas, "replica_router", router)
+    probes = []
+    monkeypatch.setattr(router, "lag_seconds", lambda engine: probes.append(engine) or 0.0)
+    user = register_and_login(client)
+    post_id = client.post("/posts/", json={"title": "t", "content": "c"}, headers=user["headers"]).json()["data"]["id"]
+
+    assert client.get(f"/posts/{post_id}").status_code == 200
+    assert client.get(f"/votes/post/{post_id}/score").status_code == 200
+    assert client.get(f"/comments/post/{post_id}").status_code == 200
+    assert probes == []
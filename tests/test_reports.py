@@ -0,0 +1,111 @@
+from app.config import settings
+from tests.conftest import register_and_login, unique
+
+
+def _make_post(client, headers):
+    resp = client.post("/posts/", json={
+        "title": f"Post {unique()}", "content": "Content", "is_anonymous": False
+    }, headers=headers)
+    return resp.json()["data"]["id"]
+
+
+def test_create_report(client):
+    user = register_and_login(client)
+    post_id = _make_post(client, user["headers"])
+    resp = client.post("/reports/", json={"post_id": post_id, "reason": "spam"}, headers=user["headers"])
+    assert resp.status_code == 201
+    assert resp.json()["data"]["status"] == "pending"
+
+
+def test_report_requires_target(client):
+    user = register_and_login(client)
+    resp = client.post("/reports/", json={"reason": "spam"}, headers=user["headers"])
+    assert resp.status_code == 400
+
+
+def test_moderation_queue_and_bulk_review(client):
+    author = register_and_login(client)
+    post_id = _make_post(client, author["headers"])
+    for _ in range(2):
+        reporter = register_and_login(client)
+        client.post("/reports/", json={"post_id": post_id, "reason": "spam"}, headers=reporter["headers"])
+
+    queue = client.get("/reports/queue", params={"limit": 200}).json()
+    entry = next(item for item in queue if item["post_id"] == post_id and item["comment_id"] is None)
+    assert entry["report_count"] == 2
+
+    resp = client.put("/reports/review", json={"post_id": post_id, "new_status": "resolved"},
+                      headers=author["headers"])
+    assert resp.status_code == 200
+    assert resp.json()["data"]["updated"] == 2
+
+    queue = client.get("/reports/queue", params={"limit": 200}).json()
+    assert all(item["post_id"] != post_id for item in queue)
+
+
+def test_moderation_queue_pages_each_target_once(client):
+    author = register_and_login(client)
+    post_ids = [_make_post(client, author["headers"]) for _ in range(3)]
+    for post_id in post_ids:
+        for _ in range(2):
+            reporter = register_and_login(client)
+            client.post("/reports/", json={"post_id": post_id, "reason": "spam"}, headers=reporter["headers"])
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 1, **({"cursor": cursor} if cursor else {})}
+        resp = client.get("/reports/queue", params=params)
+        assert resp.status_code == 200
+        seen += [(item["post_id"], item["comment_id"], item["report_count"]) for item in resp.json()]
+        cursor = resp.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen))
+    assert [(post_id, None, 2) for post_id in post_ids] == [entry for entry in seen if entry[0] in post_ids]
+
+def test_list_reports_paginates(client):
+    user = register_and_login(client)
+    for _ in range(2):
+        post_id = _make_post(client, user["headers"])
+        client.post("/reports/", json={"post_id": post_id, "reason": "spam"}, headers=user["headers"])
+
+    resp = client.get("/reports/", params={"limit": 1})
+    assert resp.status_code == 200
+    assert len(resp.json()) == 1
+    cursor = resp.headers["X-Next-Cursor"]
+    next_page = client.get("/reports/", params={"limit": 1, "cursor": cursor}).json()
+    assert next_page[0]["id"] != resp.json()[0]["id"]
+
+
+def test_repeat_report_is_deduplicated(client):
+    user = register_and_login(client)
+    post_id = _make_post(client, user["headers"])
+    first = client.post("/reports/", json={"post_id": post_id, "reason": "spam"}, headers=user["headers"])
+    second = client.post("/reports/", json={"post_id": post_id, "reason": "abuse"}, headers=user["headers"])
+    assert second.status_code == 201
+    assert second.json()["data"]["id"] == first.json()["data"]["id"]
+    assert second.json()["data"]["reason"] == "abuse"
+
+
+def test_report_threshold_hides_post(client):
+    author = register_and_login(client)
+    post_id = _make_post(client, author["headers"])
+    etag = client.get(f"/posts/{post_id}").headers["etag"]
+    for _ in range(settings.report_hide_threshold):
+        reporter = register_and_login(client)
+        client.post("/reports/", json={"post_id": post_id, "reason": "spam"}, headers=reporter["headers"])
+
+    listed = [p["id"] for p in client.get("/posts/").json()]
+    assert post_id not in listed
+    assert client.get(f"/posts/{post_id}", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_report_rate_limit(client):
+    user = register_and_login(client)
+    post_ids = [_make_post(client, user["headers"]) for _ in range(settings.report_rate_limit + 1)]
+    statuses = [
+        client.post("/reports/", json={"post_id": pid, "reason": "spam"}, headers=user["headers"]).status_code
+        for pid in post_ids
+    ]
+    assert statuses[:-1] == [201] * settings.report_rate_limit
+    assert statuses[-1] == 429
@@ -0,0 +1,82 @@
+from fastapi import Response
+from starlette.requests import Request
+
+from app.database import DATABASE_URL
+from app.utils import response_cache
+from app.utils.replicas import ReplicaRouter
+from app.utils.response_cache import ResponseCache, etag_matches
+
+
+def _request(path: str, if_none_match: str | None = None) -> Request:
+    headers = [(b"if-none-match", if_none_match.encode())] if if_none_match else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"", "headers": headers})
+
+
+def test_etag_matching():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"b"')
+    assert not etag_matches('"a"', '"b"')
+    assert not etag_matches(None, '"b"')
+
+
+def test_entry_invalidated_while_building_is_not_stored():
+    cache = ResponseCache(maxsize=10, ttl=60, max_age=0)
+
+    def build():
+        cache.invalidate(("post", 1))
+        return {"title": "old"}, [("post", 1)]
+
+    cache.respond(_request("/posts/1"), Response(), build)
+    assert cache.stats()["size"] == 0
+
+    cache.respond(_request("/posts/1"), Response(), lambda: ({"title": "new"}, [("post", 1)]))
+    assert cache.stats()["size"] == 1
+    cache.invalidate(("post", 2))
+    assert cache.stats()["size"] == 1
+    cache.invalidate(("post", 1))
+    assert cache.stats()["size"] == 0
+
+
+def test_conditional_hit_returns_not_modified():
+    cache = ResponseCache(maxsize=10, ttl=60, max_age=0)
+    first = cache.respond(_request("/users/1"), Response(), lambda: ({"id": 1}, [("user", 1)]))
+    again = cache.respond(_request("/users/1", first.headers["etag"]), Response(), lambda: 1 / 0)
+    assert again.status_code == 304
+    assert again.headers["etag"] == first.headers["etag"]
+
+
+def test_versioned_conditional_miss_skips_building():
+    cache = ResponseCache(maxsize=10, ttl=60, max_age=0)
+    first = cache.respond(_request("/posts/1"), Response(), lambda: ({"id": 1}, [("post", 1)]), lambda: 7)
+    assert first.headers["etag"] == '"v7"'
+
+    cache.clear()
+    again = cache.respond(_request("/posts/1", '"v7"'), Response(), lambda: 1 / 0, lambda: 7)
+    assert again.status_code == 304
+    changed = cache.respond(_request("/posts/1", '"v7"'), Response(), lambda: ({"id": 1}, [("post", 1)]), lambda: 8)
+    assert changed.status_code == 200
+    assert changed.headers["etag"] == '"v8"'
+
+
+def test_recently_invalidated_entry_is_not_stored_with_replicas():
+    cache = ResponseCache(maxsize=10, ttl=60, max_age=0, settle_seconds=60)
+    cache.invalidate(("post", 1))
+    cache.respond(_request("/posts/1"), Response(), lambda: ({"title": "maybe old"}, [("post", 1)]))
+    assert cache.stats()["size"] == 0
+
+    cache.respond(_request("/posts/2"), Response(), lambda: ({"title": "t"}, [("post", 2)]))
+    assert cache.stats()["size"] == 1
+
+
+def test_sticky_user_bypasses_cache(monkeypatch):
+    router = ReplicaRouter([DATABASE_URL], max_lag_seconds=5, sticky_seconds=5, health_check_seconds=60)
+    monkeypatch.setattr(response_cache, "replica_router", router)
+    monkeypatch.setattr(response_cache, "request_user_id", lambda request: 1)
+    cache = ResponseCache(maxsize=10, ttl=60, max_age=0)
+    cache.respond(_request("/posts/1"), Response(), lambda: ({"title": "old"}, [("post", 1)]))
+
+    router.mark_write(1)
+    fresh = cache.respond(_request("/posts/1"), Response(), lambda: ({"title": "new"}, [("post", 1)]))
+    assert fresh.body == b'{"title":"new"}'
+    assert cache.stats()["size"] == 1
+    assert cache.stats()["hits"] == 0
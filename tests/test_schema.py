@@ -0,0 +1,33 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.commands.migrate import detect_revisions, migration_heads
+from app.database import get_engine
+from app.utils import schema
+
+
+def test_schema_revision_matches_migration_head():
+    assert migration_heads() == {schema.SCHEMA_REVISION}
+
+
+def test_schema_matches_migration_head(client):
+    schema.verify_schema(get_engine())
+
+
+def test_out_of_date_schema_refuses_to_start(client, monkeypatch):
+    monkeypatch.setattr(schema, "SCHEMA_REVISION", "0000deadbeef")
+    with pytest.raises(schema.SchemaOutOfDate):
+        schema.verify_schema(get_engine())
+
+
+def test_unstamped_schema_is_recognised(client):
+    # The newest KNOWN_SCHEMAS entry has to follow every new migration.
+    with get_engine().connect() as connection:
+        assert detect_revisions(connection) == (schema.SCHEMA_REVISION,)
+
+
+def test_unrelated_tables_are_not_recognised():
+    engine = create_engine("sqlite://")
+    with engine.connect() as connection:
+        connection.execute(text("CREATE TABLE users (id INTEGER PRIMARY KEY)"))
+        assert detect_revisions(connection) is None
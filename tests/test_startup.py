@@ -0,0 +1,14 @@
+import subprocess
+import sys
+
+from benchmarks.import_time import DEFERRED_MODULES
+
+
+def test_importing_app_defers_heavy_modules():
+    output = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(' '.join(sorted(sys.modules)))"],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    eager = [name for name in output if name.split(".")[0] in DEFERRED_MODULES]
+    assert eager == []
+
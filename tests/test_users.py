@@ -50,3 +50,11 @@ def test_update_another_user_forbidden(client):
     me_b = client.get("/users/me", headers=user_b["headers"]).json()
     resp = client.put(f"/users/{me_b['id']}", json={"username": f"x_{unique()}"}, headers=user_a["headers"])
     assert resp.status_code == 403
+
+
+def test_user_presence_offline(client):
+    user = register_and_login(client)
+    user_id = client.get("/users/me", headers=user["headers"]).json()["id"]
+    resp = client.get(f"/users/{user_id}/presence", headers=user["headers"])
+    assert resp.status_code == 200
+    assert resp.json() == {"user_id": user_id, "online": False}
@@ -1,3 +1,10 @@
+import threading
+
+import pytest
+
+from app.database import SessionLocal
+from app.models.vote import VoteType
+from app.utils.vote_buffer import VoteBuffer, VoteBufferFull, vote_buffer
 from tests.conftest import register_and_login, unique
 
 
@@ -79,3 +86,96 @@ def test_unvote_comment(client):
     client.post(f"/votes/comment/{comment_id}", json={"vote_type": "upvote"}, headers=user["headers"])
     resp = client.delete(f"/votes/comment/{comment_id}", headers=user["headers"])
     assert resp.status_code == 200
+
+
+def test_repeat_vote_keeps_single_row(client):
+    user = register_and_login(client)
+    post_id = _make_post(client, user["headers"])
+    first = client.post(f"/votes/post/{post_id}", json={"vote_type": "upvote"}, headers=user["headers"])
+    second = client.post(f"/votes/post/{post_id}", json={"vote_type": "upvote"}, headers=user["headers"])
+    assert first.json()["message"] == "Successfully voted on post"
+    assert second.json()["message"] == "Successfully updated vote"
+    assert second.json()["data"]["id"] == first.json()["data"]["id"]
+    assert client.get(f"/votes/post/{post_id}/score").json()["upvotes"] == 1
+
+
+def test_vote_nonexistent_comment(client):
+    user = register_and_login(client)
+    resp = client.post("/votes/comment/9999999", json={"vote_type": "upvote"}, headers=user["headers"])
+    assert resp.status_code == 404
+
+
+def test_buffered_vote_is_flushed(client):
+    user = register_and_login(client)
+    post_id = _make_post(client, user["headers"])
+    vote_buffer.start()
+    try:
+        resp = client.post(f"/votes/post/{post_id}", json={"vote_type": "upvote"}, headers=user["headers"])
+        assert resp.status_code == 202
+        client.post(f"/votes/post/{post_id}", json={"vote_type": "downvote"}, headers=user["headers"])
+    finally:
+        vote_buffer.stop()
+    score = client.get(f"/votes/post/{post_id}/score").json()
+    assert (score["upvotes"], score["downvotes"]) == (0, 1)
+
+
+def _user_id(client, user):
+    return client.get("/users/me", headers=user["headers"]).json()["id"]
+
+
+def test_buffer_drops_only_votes_that_break_constraints(client):
+    user = register_and_login(client)
+    post_id = _make_post(client, user["headers"])
+    buffer = VoteBuffer(SessionLocal)
+    buffer.add("post", post_id, _user_id(client, user), VoteType.UPVOTE)
+    buffer.add("post", post_id, 2**31 - 1, VoteType.UPVOTE)
+    assert buffer.flush() == 1
+    assert client.get(f"/votes/post/{post_id}/score").json()["upvotes"] == 1
+
+
+def test_buffer_keeps_votes_when_flush_fails(client):
+    user = register_and_login(client)
+    post_id = _make_post(client, user["headers"])
+
+    def unavailable():
+        raise ConnectionError("database is down")
+
+    buffer = VoteBuffer(unavailable, max_pending=1)
+    buffer.add("post", post_id, _user_id(client, user), VoteType.UPVOTE)
+    assert buffer.flush() == 0
+    with pytest.raises(VoteBufferFull):
+        buffer.add("post", post_id, 2**31 - 1, VoteType.UPVOTE)
+
+    buffer.session_factory = SessionLocal
+    assert buffer.flush() == 1
+    assert client.get(f"/votes/post/{post_id}/score").json()["upvotes"] == 1
+
+
+def test_discard_waits_for_flush_in_progress(client):
+    user = register_and_login(client)
+    post_id = _make_post(client, user["headers"])
+    writing, release = threading.Event(), threading.Event()
+
+    class SlowBuffer(VoteBuffer):
+        def _write(self, pending):
+            writing.set()
+            release.wait(5)
+            return super()._write(pending)
+
+    buffer = SlowBuffer(SessionLocal)
+    buffer.add("post", post_id, _user_id(client, user), VoteType.UPVOTE)
+    flusher = threading.Thread(target=buffer.flush)
+    flusher.start()
+    writing.wait(5)
+
+    discarded = []
+    unvote = threading.Thread(target=lambda: discarded.append(buffer.discard("post", post_id, _user_id(client, user))))
+    unvote.start()
+    unvote.join(0.2)
+    assert unvote.is_alive()
+    release.set()
+    flusher.join()
+    unvote.join()
+    # The flush committed the vote, so the endpoint's DELETE will find it.
+    assert discarded == [False]
+    assert client.get(f"/votes/post/{post_id}/score").json()["upvotes"] == 1